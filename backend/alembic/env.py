@@ -0,0 +1,71 @@
+"""
+Alembic 迁移环境
+命令行运行时按 settings.DATABASE_URL 连接；应用启动时由 app.db.migrations 传入已有连接
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool, text
+
+from app.core.config import settings
+from app.db.base import Base
+import app.models  # noqa: F401  注册全部模型到 Base.metadata
+
+config = context.config
+connection = config.attributes.get("connection")
+
+# 应用内调用时沿用应用自己的日志配置
+if config.config_file_name is not None and connection is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        compare_type=True,
+        # SQLite 不支持大部分 ALTER，用批量模式重建表
+        render_as_batch=True,
+        **kwargs
+    )
+
+
+def _run_without_statement_timeout(migration_connection) -> None:
+    """
+    在事务内执行迁移；PostgreSQL 连接带有 DB_STATEMENT_TIMEOUT，
+    建索引、回填等长语句不应被中断，用 SET LOCAL 仅对本次迁移事务取消超时，提交后连接恢复原设置
+    """
+    with context.begin_transaction():
+        if migration_connection.dialect.name == "postgresql":
+            migration_connection.execute(text("SET LOCAL statement_timeout = 0"))
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    """生成 SQL 脚本而不连接数据库"""
+    _configure(url=settings.DATABASE_URL, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    if connection is not None:
+        _configure(connection=connection)
+        _run_without_statement_timeout(connection)
+        return
+
+    connectable = engine_from_config(
+        {"sqlalchemy.url": settings.DATABASE_URL},
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as online_connection:
+        _configure(connection=online_connection)
+        _run_without_statement_timeout(online_connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
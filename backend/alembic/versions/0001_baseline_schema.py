@@ -0,0 +1,250 @@
+"""基线表结构（引入 Alembic 前由 create_all 建立的表）
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:01:19.316493
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('departments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False, comment='部门名称'),
+    sa.Column('parent_id', sa.Integer(), nullable=True, comment='父部门ID'),
+    sa.Column('description', sa.String(length=500), nullable=True, comment='部门描述'),
+    sa.Column('is_active', sa.Boolean(), nullable=True, comment='是否启用'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['departments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('departments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_departments_id'), ['id'], unique=False)
+
+    op.create_table('llm_configs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False, comment='模型名称'),
+    sa.Column('provider', sa.String(length=50), nullable=False, comment='提供商：deepseek, openai, etc'),
+    sa.Column('api_key', sa.String(length=255), nullable=False, comment='API密钥'),
+    sa.Column('api_base', sa.String(length=255), nullable=True, comment='API基础URL'),
+    sa.Column('model_name', sa.String(length=100), nullable=False, comment='模型名称：deepseek-chat等'),
+    sa.Column('is_active', sa.Boolean(), nullable=True, comment='是否启用（全局只有一个生效）'),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True, comment='是否删除（软删除）'),
+    sa.Column('max_tokens', sa.Integer(), nullable=True, comment='最大token数'),
+    sa.Column('temperature', sa.String(length=10), nullable=True, comment='温度参数'),
+    sa.Column('description', sa.Text(), nullable=True, comment='描述'),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('llm_configs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_llm_configs_id'), ['id'], unique=False)
+
+    op.create_table('roles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False, comment='岗位名称'),
+    sa.Column('name_en', sa.String(length=100), nullable=True, comment='岗位英文名/缩写'),
+    sa.Column('description', sa.String(length=500), nullable=True, comment='岗位描述'),
+    sa.Column('is_active', sa.Boolean(), nullable=True, comment='是否启用（停用后不在创建计划时出现）'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_roles_id'), ['id'], unique=False)
+
+    op.create_table('responsibilities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=False, comment='所属岗位ID'),
+    sa.Column('name', sa.String(length=200), nullable=False, comment='职责名称'),
+    sa.Column('description', sa.String(length=500), nullable=True, comment='职责描述'),
+    sa.Column('sort_order', sa.Integer(), nullable=True, comment='排序序号'),
+    sa.Column('is_active', sa.Boolean(), nullable=True, comment='是否启用'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('responsibilities', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_responsibilities_id'), ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False, comment='用户名'),
+    sa.Column('email', sa.String(length=100), nullable=False, comment='邮箱'),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False, comment='密码哈希'),
+    sa.Column('full_name', sa.String(length=100), nullable=False, comment='姓名'),
+    sa.Column('department_id', sa.Integer(), nullable=True),
+    sa.Column('manager_id', sa.Integer(), nullable=True, comment='直属上级ID'),
+    sa.Column('user_type', sa.String(length=20), nullable=True, comment='用户类型: admin/manager/employee'),
+    sa.Column('is_active', sa.Boolean(), nullable=True, comment='是否激活'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ),
+    sa.ForeignKeyConstraint(['manager_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('report_comments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False, comment='被评论者ID'),
+    sa.Column('week_number', sa.Integer(), nullable=False, comment='周次'),
+    sa.Column('year', sa.Integer(), nullable=False, comment='年份'),
+    sa.Column('manager_id', sa.Integer(), nullable=False, comment='评论者（管理者）ID'),
+    sa.Column('content', sa.Text(), nullable=False, comment='评论/辅导建议'),
+    sa.Column('is_reviewed', sa.Boolean(), nullable=True, comment='是否已标记为已审阅'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['manager_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('report_comments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_report_comments_id'), ['id'], unique=False)
+
+    op.create_table('task_types',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('responsibility_id', sa.Integer(), nullable=False, comment='所属职责ID'),
+    sa.Column('name', sa.String(length=200), nullable=False, comment='任务类型名称'),
+    sa.Column('description', sa.String(length=500), nullable=True, comment='任务类型描述'),
+    sa.Column('sort_order', sa.Integer(), nullable=True, comment='排序序号'),
+    sa.Column('is_active', sa.Boolean(), nullable=True, comment='是否启用'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['responsibility_id'], ['responsibilities.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('task_types', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_task_types_id'), ['id'], unique=False)
+
+    op.create_table('user_role_links',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_role_links', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_role_links_id'), ['id'], unique=False)
+
+    op.create_table('weekly_tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False, comment='所属用户ID'),
+    sa.Column('week_number', sa.Integer(), nullable=False, comment='周次（如：202447）'),
+    sa.Column('year', sa.Integer(), nullable=False, comment='年份'),
+    sa.Column('title', sa.String(length=500), nullable=False, comment='任务标题'),
+    sa.Column('description', sa.Text(), nullable=True, comment='任务详细描述'),
+    sa.Column('planned_start_time', sa.DateTime(timezone=True), nullable=False, comment='计划开始时间'),
+    sa.Column('planned_end_time', sa.DateTime(timezone=True), nullable=False, comment='计划结束时间'),
+    sa.Column('planned_duration', sa.Integer(), nullable=False, comment='计划持续时间（分钟）'),
+    sa.Column('actual_start_time', sa.DateTime(timezone=True), nullable=True, comment='实际开始时间'),
+    sa.Column('actual_end_time', sa.DateTime(timezone=True), nullable=True, comment='实际结束时间'),
+    sa.Column('actual_duration', sa.Integer(), nullable=True, comment='实际持续时间（分钟）'),
+    sa.Column('source_type', sa.Enum('RESPONSIBILITY', 'MANAGER_ASSIGNED', 'PERSONAL', name='tasksource'), nullable=False, comment='任务来源'),
+    sa.Column('linked_task_type_id', sa.Integer(), nullable=False, comment='关联的标准任务类型ID（必须可追溯职责）'),
+    sa.Column('assigned_by_manager_id', sa.Integer(), nullable=True, comment='指派该任务的管理者ID'),
+    sa.Column('is_key_task', sa.Boolean(), nullable=True, comment='是否为重点工作'),
+    sa.Column('status', sa.Enum('TODO', 'IN_PROGRESS', 'COMPLETED', 'DELAYED', 'CANCELLED', name='taskstatus'), nullable=False, comment='任务状态'),
+    sa.Column('is_delayed_from_previous', sa.Boolean(), nullable=True, comment='是否为上周延期任务'),
+    sa.Column('original_week', sa.Integer(), nullable=True, comment='原始周次（延期任务）'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True, comment='完成时间'),
+    sa.ForeignKeyConstraint(['assigned_by_manager_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['linked_task_type_id'], ['task_types.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('weekly_tasks', schema=None) as batch_op:
+        batch_op.create_index('idx_planned_time', ['planned_start_time', 'planned_end_time'], unique=False)
+        batch_op.create_index('idx_status_key', ['status', 'is_key_task'], unique=False)
+        batch_op.create_index('idx_user_status', ['user_id', 'status'], unique=False)
+        batch_op.create_index('idx_user_week', ['user_id', 'year', 'week_number'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_tasks_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_tasks_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_tasks_week_number'), ['week_number'], unique=False)
+
+    op.create_table('task_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False, comment='任务ID'),
+    sa.Column('is_completed', sa.Boolean(), nullable=False, comment='是否完成'),
+    sa.Column('incomplete_reason', sa.String(length=500), nullable=True, comment='未完成原因（未完成时必填）'),
+    sa.Column('follow_up_action', sa.Enum('DELAY_TO_NEXT_WEEK', 'CANCEL', name='followupaction'), nullable=True, comment='后续动作（未完成时必填）'),
+    sa.Column('notes', sa.Text(), nullable=True, comment='复盘备注'),
+    sa.Column('reviewed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='复盘时间'),
+    sa.ForeignKeyConstraint(['task_id'], ['weekly_tasks.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id')
+    )
+    with op.batch_alter_table('task_reviews', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_task_reviews_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('task_reviews', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_task_reviews_id'))
+
+    op.drop_table('task_reviews')
+    with op.batch_alter_table('weekly_tasks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weekly_tasks_week_number'))
+        batch_op.drop_index(batch_op.f('ix_weekly_tasks_user_id'))
+        batch_op.drop_index(batch_op.f('ix_weekly_tasks_id'))
+        batch_op.drop_index('idx_user_week')
+        batch_op.drop_index('idx_user_status')
+        batch_op.drop_index('idx_status_key')
+        batch_op.drop_index('idx_planned_time')
+
+    op.drop_table('weekly_tasks')
+    with op.batch_alter_table('user_role_links', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_role_links_id'))
+
+    op.drop_table('user_role_links')
+    with op.batch_alter_table('task_types', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_task_types_id'))
+
+    op.drop_table('task_types')
+    with op.batch_alter_table('report_comments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_report_comments_id'))
+
+    op.drop_table('report_comments')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('responsibilities', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_responsibilities_id'))
+
+    op.drop_table('responsibilities')
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_roles_id'))
+
+    op.drop_table('roles')
+    with op.batch_alter_table('llm_configs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_llm_configs_id'))
+
+    op.drop_table('llm_configs')
+    with op.batch_alter_table('departments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_departments_id'))
+
+    op.drop_table('departments')
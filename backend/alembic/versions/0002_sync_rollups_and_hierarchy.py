@@ -0,0 +1,158 @@
+"""增量同步、统计汇总与汇报关系闭包表
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:01:26.075018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 hierarchy_service.rebuild_user_hierarchy 一致：递归展开上级链，层级上限 32
+HIERARCHY_BACKFILL = """
+INSERT INTO user_hierarchy (ancestor_id, descendant_id, depth)
+WITH RECURSIVE manager_chain (ancestor_id, descendant_id, depth) AS (
+    SELECT manager_id, id, 1 FROM users WHERE manager_id IS NOT NULL
+    UNION ALL
+    SELECT parent.manager_id, chain.descendant_id, chain.depth + 1
+    FROM users AS parent JOIN manager_chain AS chain ON parent.id = chain.ancestor_id
+    WHERE parent.manager_id IS NOT NULL AND chain.depth < 32
+)
+SELECT ancestor_id, descendant_id, MIN(depth) FROM manager_chain
+WHERE ancestor_id != descendant_id
+GROUP BY ancestor_id, descendant_id
+"""
+
+# 与 weekly_stats_service.rebuild_weekly_stats 一致的全量聚合
+WEEKLY_STATS_BACKFILL = """
+INSERT INTO weekly_user_stats (
+    user_id, year, week_number, total_tasks, todo_tasks, in_progress_tasks, completed_tasks,
+    delayed_tasks, cancelled_tasks, key_tasks, key_completed_tasks, reviewed_tasks,
+    planned_duration_total, actual_duration_total
+)
+SELECT
+    t.user_id, t.year, t.week_number,
+    COUNT(t.id),
+    SUM(CASE WHEN t.status = 'TODO' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN t.status = 'IN_PROGRESS' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN t.status = 'COMPLETED' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN t.status = 'DELAYED' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN t.status = 'CANCELLED' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN t.is_key_task THEN 1 ELSE 0 END),
+    SUM(CASE WHEN t.is_key_task AND t.status = 'COMPLETED' THEN 1 ELSE 0 END),
+    COUNT(r.id),
+    COALESCE(SUM(t.planned_duration), 0),
+    COALESCE(SUM(t.actual_duration), 0)
+FROM weekly_tasks AS t
+LEFT OUTER JOIN task_reviews AS r ON r.task_id = t.id
+WHERE NOT t.is_deleted
+GROUP BY t.user_id, t.year, t.week_number
+"""
+
+
+def upgrade() -> None:
+    op.create_table('review_fallback_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False, comment='处理的年份'),
+    sa.Column('week_number', sa.Integer(), nullable=False, comment='处理的周次'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='状态: running/completed/failed'),
+    sa.Column('last_user_id', sa.Integer(), nullable=False, comment='断点：已处理的最大用户ID'),
+    sa.Column('total_users', sa.Integer(), nullable=False, comment='待处理用户总数'),
+    sa.Column('processed_users', sa.Integer(), nullable=False, comment='已处理用户数'),
+    sa.Column('processed_chunks', sa.Integer(), nullable=False, comment='已提交批次数'),
+    sa.Column('created_tasks', sa.Integer(), nullable=False, comment='滚动到下周的新任务数'),
+    sa.Column('elapsed_seconds', sa.Float(), nullable=False, comment='累计处理耗时（秒）'),
+    sa.Column('error', sa.Text(), nullable=True, comment='最近一次失败原因'),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True, comment='开始时间'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True, comment='最近一次批次提交时间'),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True, comment='完成时间'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('year', 'week_number', name='uq_review_fallback_run_week')
+    )
+    with op.batch_alter_table('review_fallback_runs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_review_fallback_runs_id'), ['id'], unique=False)
+
+    op.create_table('user_hierarchy',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False, comment='上级用户ID'),
+    sa.Column('descendant_id', sa.Integer(), nullable=False, comment='下属用户ID'),
+    sa.Column('depth', sa.Integer(), nullable=False, comment='层级距离'),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['descendant_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    with op.batch_alter_table('user_hierarchy', schema=None) as batch_op:
+        batch_op.create_index('idx_hierarchy_descendant', ['descendant_id', 'depth'], unique=False)
+
+    op.create_table('weekly_user_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False, comment='用户ID'),
+    sa.Column('year', sa.Integer(), nullable=False, comment='年份'),
+    sa.Column('week_number', sa.Integer(), nullable=False, comment='周次'),
+    sa.Column('total_tasks', sa.Integer(), nullable=False, comment='任务总数'),
+    sa.Column('todo_tasks', sa.Integer(), nullable=False, comment='待办任务数'),
+    sa.Column('in_progress_tasks', sa.Integer(), nullable=False, comment='进行中任务数'),
+    sa.Column('completed_tasks', sa.Integer(), nullable=False, comment='已完成任务数'),
+    sa.Column('delayed_tasks', sa.Integer(), nullable=False, comment='延期任务数'),
+    sa.Column('cancelled_tasks', sa.Integer(), nullable=False, comment='已取消任务数'),
+    sa.Column('key_tasks', sa.Integer(), nullable=False, comment='重点任务数'),
+    sa.Column('key_completed_tasks', sa.Integer(), nullable=False, comment='已完成重点任务数'),
+    sa.Column('reviewed_tasks', sa.Integer(), nullable=False, comment='已复盘任务数'),
+    sa.Column('planned_duration_total', sa.Integer(), nullable=False, comment='计划时长合计'),
+    sa.Column('actual_duration_total', sa.Integer(), nullable=False, comment='实际时长合计'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'year', 'week_number', name='uq_weekly_user_stats')
+    )
+    with op.batch_alter_table('weekly_user_stats', schema=None) as batch_op:
+        batch_op.create_index('idx_weekly_stats_week', ['year', 'week_number'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_user_stats_id'), ['id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False, comment='数据版本号'))
+
+    with op.batch_alter_table('weekly_tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_deleted', sa.Boolean(), server_default=sa.false(), nullable=False, comment='是否删除（软删除）'))
+        batch_op.add_column(sa.Column('change_seq', sa.Integer(), nullable=True, comment='变更序号'))
+        batch_op.create_index('idx_user_change_seq', ['user_id', 'change_seq'], unique=False)
+        batch_op.create_index('idx_user_key_created', ['user_id', 'is_key_task', 'created_at', 'id'], unique=False)
+        batch_op.create_index('idx_user_planned_start', ['user_id', 'planned_start_time'], unique=False)
+
+    # 回填：已有库按 manager_id 建立闭包表，按现有任务聚合用户-周统计
+    op.execute(HIERARCHY_BACKFILL)
+    op.execute(WEEKLY_STATS_BACKFILL)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('weekly_tasks', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_planned_start')
+        batch_op.drop_index('idx_user_key_created')
+        batch_op.drop_index('idx_user_change_seq')
+        batch_op.drop_column('change_seq')
+        batch_op.drop_column('is_deleted')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
+
+    with op.batch_alter_table('weekly_user_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weekly_user_stats_id'))
+        batch_op.drop_index('idx_weekly_stats_week')
+
+    op.drop_table('weekly_user_stats')
+    with op.batch_alter_table('user_hierarchy', schema=None) as batch_op:
+        batch_op.drop_index('idx_hierarchy_descendant')
+
+    op.drop_table('user_hierarchy')
+    with op.batch_alter_table('review_fallback_runs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_review_fallback_runs_id'))
+
+    op.drop_table('review_fallback_runs')
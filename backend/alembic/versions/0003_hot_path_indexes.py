@@ -0,0 +1,48 @@
+"""热点查询索引：周报评论、汇报关系、用户-岗位关联
+
+task_reviews.task_id 自基线起已有唯一约束（即索引），无需新增
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:01:54.631452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('report_comments', schema=None) as batch_op:
+        batch_op.create_index('idx_comment_user_week_manager', ['user_id', 'year', 'week_number', 'manager_id'], unique=False)
+
+    # 建唯一索引前清理重复的用户-岗位关联，保留最早的一条
+    op.execute(
+        "DELETE FROM user_role_links WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM user_role_links GROUP BY user_id, role_id) AS keep)"
+    )
+    with op.batch_alter_table('user_role_links', schema=None) as batch_op:
+        batch_op.create_index('idx_role_user', ['role_id', 'user_id'], unique=False)
+        batch_op.create_index('uq_user_role_link', ['user_id', 'role_id'], unique=True)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_manager_id'), ['manager_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_manager_id'))
+
+    with op.batch_alter_table('user_role_links', schema=None) as batch_op:
+        batch_op.drop_index('uq_user_role_link')
+        batch_op.drop_index('idx_role_user')
+
+    with op.batch_alter_table('report_comments', schema=None) as batch_op:
+        batch_op.drop_index('idx_comment_user_week_manager')
@@ -0,0 +1,44 @@
+"""weekly_tasks 增加 ISO 周键 iso_week_key（year*100+week_number 存储生成列）及索引
+
+SQLite 不能用 ALTER TABLE 添加存储生成列，批量模式下重建表（其他数据库直接 ALTER）；已有数据在建列时即生成
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:05:47.760842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate() -> str:
+    return 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('weekly_tasks', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.alter_column('week_number', existing_type=sa.Integer(), existing_nullable=False,
+                              comment='ISO周次（1-53）', existing_comment='周次（如：202447）')
+        batch_op.alter_column('year', existing_type=sa.Integer(), existing_nullable=False,
+                              comment='ISO年份', existing_comment='年份')
+        batch_op.add_column(sa.Column('iso_week_key', sa.Integer(), sa.Computed('year * 100 + week_number', persisted=True), nullable=True, comment='ISO周键'))
+        batch_op.create_index('idx_user_iso_week', ['user_id', 'iso_week_key'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('weekly_tasks', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.drop_index('idx_user_iso_week')
+        batch_op.drop_column('iso_week_key')
+        batch_op.alter_column('year', existing_type=sa.Integer(), existing_nullable=False,
+                              comment='年份', existing_comment='ISO年份')
+        batch_op.alter_column('week_number', existing_type=sa.Integer(), existing_nullable=False,
+                              comment='周次（如：202447）', existing_comment='ISO周次（1-53）')
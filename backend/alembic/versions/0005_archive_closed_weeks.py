@@ -0,0 +1,113 @@
+"""冷热数据归档：weekly_tasks_archive / task_reviews_archive
+
+归档表保留原任务ID，不自增；SQLite 下热表改为 AUTOINCREMENT，
+避免删除（归档）最大ID后新任务复用已归档任务的ID（PostgreSQL 序列本身不复用）
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:11:23.942108
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _set_sqlite_autoincrement(enabled: bool) -> None:
+    """SQLite 下重建热表以切换 AUTOINCREMENT；生成列不能随表复制写入，先删后建"""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('weekly_tasks', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': enabled}) as batch_op:
+        batch_op.drop_index('idx_user_iso_week')
+        batch_op.drop_column('iso_week_key')
+        batch_op.add_column(sa.Column('iso_week_key', sa.Integer(), sa.Computed('year * 100 + week_number', persisted=True), nullable=True, comment='ISO周键'))
+        batch_op.create_index('idx_user_iso_week', ['user_id', 'iso_week_key'], unique=False)
+    with op.batch_alter_table('task_reviews', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': enabled}):
+        pass
+
+
+def upgrade() -> None:
+    op.create_table('weekly_tasks_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False, comment='所属用户ID'),
+    sa.Column('week_number', sa.Integer(), nullable=False, comment='ISO周次（1-53）'),
+    sa.Column('year', sa.Integer(), nullable=False, comment='ISO年份'),
+    sa.Column('iso_week_key', sa.Integer(), sa.Computed('year * 100 + week_number', persisted=True), nullable=True, comment='ISO周键'),
+    sa.Column('title', sa.String(length=500), nullable=False, comment='任务标题'),
+    sa.Column('description', sa.Text(), nullable=True, comment='任务详细描述'),
+    sa.Column('planned_start_time', sa.DateTime(timezone=True), nullable=False, comment='计划开始时间'),
+    sa.Column('planned_end_time', sa.DateTime(timezone=True), nullable=False, comment='计划结束时间'),
+    sa.Column('planned_duration', sa.Integer(), nullable=False, comment='计划持续时间（分钟）'),
+    sa.Column('actual_start_time', sa.DateTime(timezone=True), nullable=True, comment='实际开始时间'),
+    sa.Column('actual_end_time', sa.DateTime(timezone=True), nullable=True, comment='实际结束时间'),
+    sa.Column('actual_duration', sa.Integer(), nullable=True, comment='实际持续时间（分钟）'),
+    sa.Column('source_type', postgresql.ENUM('RESPONSIBILITY', 'MANAGER_ASSIGNED', 'PERSONAL', name='tasksource', create_type=False), nullable=False, comment='任务来源'),
+    sa.Column('linked_task_type_id', sa.Integer(), nullable=False, comment='关联的标准任务类型ID（必须可追溯职责）'),
+    sa.Column('assigned_by_manager_id', sa.Integer(), nullable=True, comment='指派该任务的管理者ID'),
+    sa.Column('is_key_task', sa.Boolean(), nullable=True, comment='是否为重点工作'),
+    sa.Column('status', postgresql.ENUM('TODO', 'IN_PROGRESS', 'COMPLETED', 'DELAYED', 'CANCELLED', name='taskstatus', create_type=False), nullable=False, comment='任务状态'),
+    sa.Column('is_delayed_from_previous', sa.Boolean(), nullable=True, comment='是否为上周延期任务'),
+    sa.Column('original_week', sa.Integer(), nullable=True, comment='原始周次（延期任务）'),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False, comment='是否删除（软删除）'),
+    sa.Column('change_seq', sa.Integer(), nullable=True, comment='变更序号'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True, comment='完成时间'),
+    sa.ForeignKeyConstraint(['assigned_by_manager_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['linked_task_type_id'], ['task_types.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('weekly_tasks_archive', schema=None) as batch_op:
+        batch_op.create_index('idx_archive_iso_week', ['iso_week_key'], unique=False)
+        batch_op.create_index('idx_archive_user_iso_week', ['user_id', 'iso_week_key'], unique=False)
+        batch_op.create_index('idx_archive_user_planned_start', ['user_id', 'planned_start_time'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_tasks_archive_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_tasks_archive_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_weekly_tasks_archive_week_number'), ['week_number'], unique=False)
+
+    op.create_table('task_reviews_archive',
+    sa.Column('task_id', sa.Integer(), nullable=False, comment='任务ID'),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('is_completed', sa.Boolean(), nullable=False, comment='是否完成'),
+    sa.Column('incomplete_reason', sa.String(length=500), nullable=True, comment='未完成原因（未完成时必填）'),
+    sa.Column('follow_up_action', postgresql.ENUM('DELAY_TO_NEXT_WEEK', 'CANCEL', name='followupaction', create_type=False), nullable=True, comment='后续动作（未完成时必填）'),
+    sa.Column('notes', sa.Text(), nullable=True, comment='复盘备注'),
+    sa.Column('reviewed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True, comment='复盘时间'),
+    sa.ForeignKeyConstraint(['task_id'], ['weekly_tasks_archive.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id')
+    )
+    with op.batch_alter_table('task_reviews_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_task_reviews_archive_id'), ['id'], unique=False)
+
+    _set_sqlite_autoincrement(True)
+
+
+def downgrade() -> None:
+    _set_sqlite_autoincrement(False)
+
+    with op.batch_alter_table('task_reviews_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_task_reviews_archive_id'))
+
+    op.drop_table('task_reviews_archive')
+    with op.batch_alter_table('weekly_tasks_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weekly_tasks_archive_week_number'))
+        batch_op.drop_index(batch_op.f('ix_weekly_tasks_archive_user_id'))
+        batch_op.drop_index(batch_op.f('ix_weekly_tasks_archive_id'))
+        batch_op.drop_index('idx_archive_user_planned_start')
+        batch_op.drop_index('idx_archive_user_iso_week')
+        batch_op.drop_index('idx_archive_iso_week')
+
+    op.drop_table('weekly_tasks_archive')
@@ -0,0 +1,52 @@
+"""report_comments / weekly_user_stats 增加 ISO 周键 iso_week_key，按周过滤的索引改用周键
+
+与 weekly_tasks.iso_week_key 相同：存储生成列，SQLite 批量模式下重建表，已有数据在建列时即生成
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:20:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate() -> str:
+    return 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+
+
+def _iso_week_key_column() -> sa.Column:
+    return sa.Column('iso_week_key', sa.Integer(), sa.Computed('year * 100 + week_number', persisted=True), nullable=True, comment='ISO周键')
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('report_comments', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.drop_index('idx_comment_user_week_manager')
+        batch_op.add_column(_iso_week_key_column())
+        batch_op.create_index('idx_comment_user_iso_week_manager', ['user_id', 'iso_week_key', 'manager_id'], unique=False)
+
+    with op.batch_alter_table('weekly_user_stats', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.drop_index('idx_weekly_stats_week')
+        batch_op.add_column(_iso_week_key_column())
+        batch_op.create_index('idx_weekly_stats_iso_week', ['iso_week_key', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('weekly_user_stats', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.drop_index('idx_weekly_stats_iso_week')
+        batch_op.drop_column('iso_week_key')
+        batch_op.create_index('idx_weekly_stats_week', ['year', 'week_number'], unique=False)
+
+    with op.batch_alter_table('report_comments', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.drop_index('idx_comment_user_iso_week_manager')
+        batch_op.drop_column('iso_week_key')
+        batch_op.create_index('idx_comment_user_week_manager', ['user_id', 'year', 'week_number', 'manager_id'], unique=False)
@@ -8,7 +8,7 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from ..core.config import settings
-from ..db.base import get_db
+from ..db.base import get_async_db, get_db
 from ..models.user import User
 from ..schemas.auth import TokenData
 
@@ -2,10 +2,11 @@
 AI分析相关API端点
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user, get_db
 from app.models.user import User
 from app.models.llm_config import LLMConfig
 from app.schemas.llm_config import (
@@ -16,6 +17,7 @@ from app.schemas.llm_config import (
     AIAnalysisResponse
 )
 from app.services.ai_service import AIAnalysisService
+from app.services.hierarchy_service import is_subordinate
 
 router = APIRouter()
 
@@ -128,12 +130,13 @@ def delete_llm_config(
 
 
 # ==================== AI分析 ====================
+# 以下为 async 路由，数据库访问使用 AsyncSession；先完成认证再取异步连接
 
 @router.post("/analyze", response_model=AIAnalysisResponse)
 async def analyze_work_performance(
     request: AIAnalysisRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     AI分析员工工作计划执行情况（仅管理员和管理者）
@@ -148,11 +151,10 @@ async def analyze_work_performance(
     if current_user.user_type not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="仅管理员和管理者可以使用AI分析功能")
 
-    # 如果是管理者，只能分析自己下属的员工
+    # 如果是管理者，只能分析自己下属（含跨级）的员工
     if current_user.user_type == "manager" and request.user_id:
-        target_user = db.query(User).filter(User.id == request.user_id).first()
-        if not target_user or target_user.manager_id != current_user.id:
-            raise HTTPException(status_code=403, detail="只能分析直属下属的数据")
+        if not await db.run_sync(is_subordinate, current_user.id, request.user_id):
+            raise HTTPException(status_code=403, detail="只能分析下属的数据")
 
     # 创建AI服务
     ai_service = AIAnalysisService(db)
@@ -175,8 +177,8 @@ async def analyze_work_performance(
 
 @router.get("/analyze/test")
 async def test_llm_connection(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """测试大模型连接（仅管理员）"""
     if current_user.user_type != "admin":
@@ -185,7 +187,7 @@ async def test_llm_connection(
     ai_service = AIAnalysisService(db)
 
     try:
-        config = ai_service.get_active_llm_config()
+        config = await ai_service.get_active_llm_config()
         if not config:
             raise HTTPException(status_code=400, detail="未配置可用的大模型")
 
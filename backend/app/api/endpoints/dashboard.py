@@ -2,16 +2,32 @@
 仪表盘API端点 - REQ-3.3, REQ-5.1, REQ-5.2, REQ-5.3
 """
 from typing import List, Optional
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-
-from ...api.deps import get_db, get_current_user, get_current_manager
+from datetime import datetime
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, and_, or_, select
+
+from ...api.deps import get_db, get_current_user, get_current_manager, get_current_admin
+from ...core.cache import cache_stats, report_cache
+from ...core.etag import make_etag, is_not_modified, not_modified, set_etag
+from ...db.base import engine
+from ...db.pool import pool_stats
 from ...models.user import User
-from ...models.task import WeeklyTask, TaskReview, ReportComment, TaskStatus
+from ...models.task import ReportComment, TaskStatus, WeeklyUserStats
 from ...models.role import TaskType, Responsibility
-from ...schemas.task import ReportComment as ReportCommentSchema, ReportCommentCreate
+from ...schemas.task import (
+    ReportComment as ReportCommentSchema, ReportCommentCreate, TaskReview as ReviewSchema,
+    MemberDetail, MemberInfo, MemberRole, MemberTask
+)
+from ...services.archive_service import combined_sources, week_sources
+from ...services.data_version import bump_data_version
+from ...services.hierarchy_service import DEPTH_ALL, DEPTH_DIRECT, is_subordinate, subordinate_tree
+from ...services.duration_stats_service import DurationStatsService
+from ...services.report_export_service import EXPORT_FORMATS, ReportExportService
+from ...services.report_service import ReportService
+from ...utils.iso_week import week_key
 
 router = APIRouter()
 
@@ -21,16 +37,27 @@ router = APIRouter()
 def get_employee_dashboard(
     week_number: int,
     year: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """员工仪表盘 - REQ-3.3"""
-    # 获取本周任务
-    tasks = db.query(WeeklyTask).filter(
-        WeeklyTask.user_id == current_user.id,
-        WeeklyTask.week_number == week_number,
-        WeeklyTask.year == year
-    ).all()
+    # 数据版本未变化时直接返回304
+    etag = make_etag("employee", current_user.id, current_user.data_version, year, week_number)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # 获取本周任务（已归档的周从归档表读取）
+    key = week_key(year, week_number)
+    tasks = []
+    for Task, _ in week_sources(db, key):
+        tasks.extend(db.query(Task).filter(
+            Task.user_id == current_user.id,
+            Task.iso_week_key == key,
+            Task.is_deleted == False
+        ).all())
 
     # 统计数据
     total_tasks = len(tasks)
@@ -66,49 +93,74 @@ def get_employee_dashboard(
 def get_team_dashboard(
     week_number: int,
     year: int,
+    request: Request,
+    response: Response,
+    depth: str = Query(DEPTH_DIRECT, pattern="^(direct|all)$", description="下属范围：direct 直属 / all 整个下属树"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_manager)
 ):
-    """团队仪表盘（管理者）- REQ-5.1"""
-    # 获取所有直属下属 - REQ-5.1.1
-    subordinates = db.query(User).filter(
+    """
+    团队仪表盘（管理者）- REQ-5.1
+
+    depth=all 时通过递归CTE解析整个下属树，并按直属下属所在分支（子团队）在数据库内分组汇总
+    """
+    # 获取所有直属下属 - REQ-5.1.1；同时取数据版本用于生成ETag，未变化时直接返回304
+    subordinates = db.query(User.id, User.full_name, User.data_version).filter(
         User.manager_id == current_user.id,
         User.is_active == True
-    ).all()
+    ).order_by(User.id).all()
+    versions = [(member.id, member.data_version) for member in subordinates]
+
+    tree = None
+    if depth == DEPTH_ALL:
+        tree = subordinate_tree(current_user.id)
+        versions = db.query(User.id, User.data_version).join(
+            tree, tree.c.user_id == User.id
+        ).filter(User.is_active == True).order_by(User.id).all()
+        versions = [tuple(row) for row in versions]
+
+    etag = make_etag("team", current_user.id, current_user.data_version, year, week_number, depth, versions)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    member_ids = [member.id for member in subordinates]
+    key = week_key(year, week_number)
+
+    # 成员本周任务统计直接读取用户-周汇总表（随任务写入在同一事务内维护）
+    week_stats = {
+        row.user_id: row
+        for row in db.query(WeeklyUserStats).filter(
+            WeeklyUserStats.user_id.in_(member_ids),
+            WeeklyUserStats.iso_week_key == key
+        )
+    } if member_ids else {}
+
+    # 一次取出管理者对各成员本周的评论（同一成员取最早一条）
+    comments = {}
+    if member_ids:
+        for comment in db.query(ReportComment).filter(
+            ReportComment.user_id.in_(member_ids),
+            ReportComment.iso_week_key == key,
+            ReportComment.manager_id == current_user.id
+        ).order_by(ReportComment.id):
+            comments.setdefault(comment.user_id, comment)
 
     team_overview = []
 
     for member in subordinates:
-        # 获取成员本周任务
-        tasks = db.query(WeeklyTask).filter(
-            WeeklyTask.user_id == member.id,
-            WeeklyTask.week_number == week_number,
-            WeeklyTask.year == year
-        ).all()
-
-        total_tasks = len(tasks)
-        completed_tasks = len([t for t in tasks if t.status == TaskStatus.COMPLETED])
-        delayed_tasks = len([t for t in tasks if t.status == TaskStatus.DELAYED])
-        key_tasks = [t for t in tasks if t.is_key_task]
-
-        # 检查复盘状态
-        reviewed_tasks = db.query(TaskReview).join(WeeklyTask).filter(
-            WeeklyTask.user_id == member.id,
-            WeeklyTask.week_number == week_number,
-            WeeklyTask.year == year
-        ).count()
-
-        # 检查管理者是否已审阅
-        comments = db.query(ReportComment).filter(
-            ReportComment.user_id == member.id,
-            ReportComment.week_number == week_number,
-            ReportComment.year == year,
-            ReportComment.manager_id == current_user.id
-        ).first()
-
+        stats = week_stats.get(member.id)
+        total_tasks = stats.total_tasks if stats else 0
+        completed_tasks = stats.completed_tasks if stats else 0
+        delayed_tasks = stats.delayed_tasks if stats else 0
+        key_total = stats.key_tasks if stats else 0
+        key_completed = stats.key_completed_tasks if stats else 0
+
+        # 检查复盘状态及管理者是否已审阅
+        comment = comments.get(member.id)
         review_status = "未提交"
-        if reviewed_tasks > 0:
-            if comments and comments.is_reviewed:
+        if stats and stats.reviewed_tasks > 0:
+            if comment and comment.is_reviewed:
                 review_status = "已审阅"
             else:
                 review_status = "已提交"
@@ -123,14 +175,15 @@ def get_team_dashboard(
             "review_status": review_status,
             # REQ-5.1.3: 重点任务概览
             "key_tasks_summary": {
-                "total": len(key_tasks),
-                "completed": len([t for t in key_tasks if t.status == TaskStatus.COMPLETED])
+                "total": key_total,
+                "completed": key_completed
             }
         })
 
-    return {
+    result = {
         "week_number": week_number,
         "year": year,
+        "depth": depth,
         "manager": {
             "id": current_user.id,
             "name": current_user.full_name
@@ -138,10 +191,73 @@ def get_team_dashboard(
         "team_size": len(subordinates),
         "team_members": team_overview
     }
+    if tree is not None:
+        result.update(_sub_team_rollup(db, tree, subordinates, year, week_number))
+    return result
+
+
+def _sub_team_rollup(db: Session, tree, subordinates, year: int, week_number: int) -> dict:
+    """按子团队（直属下属所在分支）分组汇总整个下属树的本周任务统计"""
+    rows = db.query(
+        tree.c.team_id,
+        func.count(User.id).label("member_count"),
+        func.coalesce(func.sum(WeeklyUserStats.total_tasks), 0).label("total_tasks"),
+        func.coalesce(func.sum(WeeklyUserStats.completed_tasks), 0).label("completed_tasks"),
+        func.coalesce(func.sum(WeeklyUserStats.delayed_tasks), 0).label("delayed_tasks"),
+        func.coalesce(func.sum(WeeklyUserStats.key_tasks), 0).label("key_tasks"),
+        func.coalesce(func.sum(WeeklyUserStats.key_completed_tasks), 0).label("key_completed_tasks"),
+    ).select_from(tree).join(
+        User, User.id == tree.c.user_id
+    ).outerjoin(
+        WeeklyUserStats, and_(
+            WeeklyUserStats.user_id == User.id,
+            WeeklyUserStats.iso_week_key == week_key(year, week_number)
+        )
+    ).filter(User.is_active == True).group_by(tree.c.team_id).all()
+    by_team = {row.team_id: row for row in rows}
+
+    # 在职直属下属即使本周无数据也列出；负责人已停用的分支仍有在职成员时同样列出，
+    # 使各子团队之和与整个下属树的汇总一致
+    leaders = {leader.id: leader.full_name for leader in subordinates}
+    inactive_leader_ids = [team_id for team_id in by_team if team_id not in leaders]
+    if inactive_leader_ids:
+        leaders.update(db.query(User.id, User.full_name).filter(User.id.in_(inactive_leader_ids)).all())
+
+    sub_teams = []
+    for leader_id in sorted(leaders):
+        row = by_team.get(leader_id)
+        total = int(row.total_tasks) if row else 0
+        completed = int(row.completed_tasks) if row else 0
+        sub_teams.append({
+            "leader_id": leader_id,
+            "leader_name": leaders[leader_id],
+            "member_count": row.member_count if row else 0,
+            "total_tasks": total,
+            "completed_tasks": completed,
+            "completion_rate": (completed / total * 100) if total > 0 else 0,
+            "delayed_tasks": int(row.delayed_tasks) if row else 0,
+            "key_tasks_summary": {
+                "total": int(row.key_tasks) if row else 0,
+                "completed": int(row.key_completed_tasks) if row else 0
+            }
+        })
+
+    total = sum(int(row.total_tasks) for row in rows)
+    completed = sum(int(row.completed_tasks) for row in rows)
+    return {
+        "division_size": sum(row.member_count for row in rows),
+        "division_summary": {
+            "total_tasks": total,
+            "completed_tasks": completed,
+            "completion_rate": (completed / total * 100) if total > 0 else 0,
+            "delayed_tasks": sum(int(row.delayed_tasks) for row in rows)
+        },
+        "sub_teams": sub_teams
+    }
 
 
 # 成员详情 - REQ-5.2
-@router.get("/team/member/{user_id}")
+@router.get("/team/member/{user_id}", response_model=MemberDetail)
 def get_member_detail(
     user_id: int,
     week_number: int,
@@ -152,73 +268,91 @@ def get_member_detail(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_manager)
 ):
-    """查看团队成员详情（管理者）- REQ-5.2"""
-    # 验证成员是否是当前用户的下属
-    member = db.query(User).filter(User.id == user_id).first()
+    """
+    查看团队成员详情（管理者）- REQ-5.2
+
+    任务按响应字段显式选列，并外连接复盘记录一次取回，不加载ORM实体
+    """
+    # 验证成员是否是当前用户的下属，岗位一并预加载
+    member = db.query(User).options(selectinload(User.roles)).filter(User.id == user_id).first()
     if not member:
         raise HTTPException(status_code=404, detail="用户不存在")
 
-    # 可选：严格检查汇报关系
-    # if member.manager_id != current_user.id:
-    #     raise HTTPException(status_code=403, detail="只能查看直属下属的信息")
-
-    # 获取成员任务
-    query = db.query(WeeklyTask)
+    # 管理者只能查看自己汇报链下的成员（含跨级下属）
+    if current_user.user_type != "admin" and not is_subordinate(db, current_user.id, user_id):
+        raise HTTPException(status_code=403, detail="只能查看下属的信息")
+
+    # 获取成员任务及复盘（已归档的周读取热表与归档表的并集）
+    key = week_key(year, week_number)
+    Task, Review = combined_sources(db, key)
+    task_columns = _member_task_columns(Task)
+    query = db.query(*task_columns, *_member_review_columns(Review)).outerjoin(
+        Review, Review.task_id == Task.id
+    ).filter(
+        Task.user_id == user_id,
+        Task.iso_week_key == key,
+        Task.is_deleted == False
+    )
 
-    # 按岗位过滤（通过任务类型关联的职责→岗位）
+    # 按岗位过滤（任务类型所属职责属于该岗位）
     if role_id:
-        query = query.join(TaskType, WeeklyTask.linked_task_type_id == TaskType.id)\
-            .join(Responsibility, Responsibility.id == TaskType.responsibility_id)\
-            .filter(Responsibility.role_id == role_id)
-
-    query = query.filter(
-        WeeklyTask.user_id == user_id,
-        WeeklyTask.week_number == week_number,
-        WeeklyTask.year == year
-    )
+        query = query.filter(Task.linked_task_type_id.in_(
+            select(TaskType.id).join(
+                Responsibility, Responsibility.id == TaskType.responsibility_id
+            ).where(Responsibility.role_id == role_id)
+        ))
 
     # REQ-5.2.3: 过滤重点任务
     if is_key_task is not None:
-        query = query.filter(WeeklyTask.is_key_task == is_key_task)
+        query = query.filter(Task.is_key_task == is_key_task)
     if source_type:
-        query = query.filter(WeeklyTask.source_type == source_type)
-
-    tasks = query.all()
-
-    # 获取复盘信息
-    reviews = {
-        r.task_id: r
-        for r in db.query(TaskReview).join(WeeklyTask).filter(
-            WeeklyTask.user_id == user_id,
-            WeeklyTask.week_number == week_number,
-            WeeklyTask.year == year
-        ).all()
-    }
+        query = query.filter(Task.source_type == source_type)
+
+    tasks = []
+    for row in query.order_by(Task.id):
+        task = MemberTask.model_validate({column.key: getattr(row, column.key) for column in task_columns})
+        if row.review_id is not None:
+            task.review = ReviewSchema(
+                id=row.review_id,
+                task_id=row.id,
+                is_completed=row.review_is_completed,
+                incomplete_reason=row.review_incomplete_reason,
+                follow_up_action=row.review_follow_up_action,
+                notes=row.review_notes,
+                reviewed_at=row.review_reviewed_at
+            )
+        tasks.append(task)
 
     # 获取管理者评论
     comments = db.query(ReportComment).filter(
         ReportComment.user_id == user_id,
-        ReportComment.week_number == week_number,
-        ReportComment.year == year
+        ReportComment.iso_week_key == key
     ).all()
 
-    return {
-        "member": {
-            "id": member.id,
-            "name": member.full_name,
-            "roles": [{"id": r.id, "name": r.name} for r in member.roles]
-        },
-        "week_number": week_number,
-        "year": year,
-        "tasks": [
-            {
-                **t.__dict__,
-                "review": reviews.get(t.id)
-            }
-            for t in tasks
-        ],
-        "comments": comments
-    }
+    return MemberDetail(
+        member=MemberInfo(
+            id=member.id,
+            name=member.full_name,
+            roles=[MemberRole(id=r.id, name=r.name) for r in member.roles]
+        ),
+        week_number=week_number,
+        year=year,
+        tasks=tasks,
+        comments=[ReportCommentSchema.model_validate(c) for c in comments]
+    )
+
+
+# 成员详情任务的查询列，与 MemberTask 响应字段一一对应
+_MEMBER_TASK_FIELDS = tuple(name for name in MemberTask.model_fields if name != "review")
+_MEMBER_REVIEW_FIELDS = ("id", "is_completed", "incomplete_reason", "follow_up_action", "notes", "reviewed_at")
+
+
+def _member_task_columns(Task) -> tuple:
+    return tuple(getattr(Task, name) for name in _MEMBER_TASK_FIELDS)
+
+
+def _member_review_columns(Review) -> tuple:
+    return tuple(getattr(Review, name).label(f"review_{name}") for name in _MEMBER_REVIEW_FIELDS)
 
 
 # 周报评论 - REQ-5.3
@@ -239,6 +373,7 @@ def add_comment(
         manager_id=current_user.id
     )
     db.add(comment)
+    bump_data_version(db, [comment_in.user_id])
     db.commit()
     db.refresh(comment)
     return comment
@@ -259,6 +394,7 @@ def mark_as_reviewed(
         raise HTTPException(status_code=403, detail="只能操作自己的评论")
 
     comment.is_reviewed = True
+    bump_data_version(db, [comment.user_id])
     db.commit()
     return {"message": "已标记为已审阅"}
 
@@ -272,225 +408,196 @@ def get_comments(
     current_user: User = Depends(get_current_user)
 ):
     """获取周报评论"""
+    key = week_key(year, week_number)
     comments = db.query(ReportComment).filter(
         ReportComment.user_id == user_id,
-        ReportComment.week_number == week_number,
-        ReportComment.year == year
+        ReportComment.iso_week_key == key
     ).all()
     return comments
 
 
+def _report_scope(db: Session, current_user: User, depth: str):
+    """
+    确定报表统计范围
+
+    Returns:
+        (范围内用户行, 子团队 {(负责人ID, 姓名): [用户ID]} 或 None, 是否管理者视角)
+    """
+    # 确定查询范围 - 根据当前用户角色
+    is_manager = current_user.user_type == "admin" or any("manager" in role.name.lower() for role in current_user.roles)
+    teams = None
+    if is_manager and depth == DEPTH_ALL:
+        # 管理者查看整个下属树：本人 + 递归CTE解析出的全部下属，带上所属子团队
+        tree = subordinate_tree(current_user.id)
+        scope = db.query(
+            User.id, User.full_name, User.is_active, User.data_version, tree.c.team_id
+        ).outerjoin(
+            tree, tree.c.user_id == User.id
+        ).filter(
+            or_(
+                tree.c.user_id.isnot(None),
+                User.id == current_user.id
+            )
+        ).order_by(User.id).all()
+        names = {user.id: user.full_name for user in scope}
+        teams = {}
+        for user in scope:
+            if user.team_id is not None:
+                teams.setdefault((user.team_id, names.get(user.team_id)), []).append(user.id)
+    elif is_manager:
+        # 管理者查看团队数据
+        scope = db.query(User.id, User.full_name, User.is_active, User.data_version).filter(
+            or_(
+                User.manager_id == current_user.id,
+                User.id == current_user.id
+            )
+        ).order_by(User.id).all()
+    else:
+        # 普通用户只看自己的数据
+        scope = [current_user]
+    return scope, teams, is_manager
+
+
+def _report_cache_key(kind: str, current_user: User, depth: str, scope, start_dt: datetime, end_dt: datetime) -> tuple:
+    """范围内用户的数据版本参与缓存key，任一用户任务变更后旧结果不再命中"""
+    return (
+        kind,
+        current_user.id,
+        depth,
+        tuple((user.id, user.data_version) for user in scope),
+        start_dt.date(),
+        end_dt.date()
+    )
+
+
+def _resolve_report(db: Session, current_user: User, start_dt: datetime, end_dt: datetime, depth: str):
+    """
+    生成（或从缓存取出）报表
+
+    Returns:
+        (报表, 范围内用户ID列表, 是否管理者视角)
+    """
+    scope, teams, is_manager = _report_scope(db, current_user, depth)
+    user_ids = [user.id for user in scope]
+
+    cache_key = _report_cache_key("summary", current_user, depth, scope, start_dt, end_dt)
+    report = report_cache.get(cache_key)
+    if report is None:
+        # 团队成员绩效（仅管理者）
+        members = None
+        if is_manager:
+            members = [(user.id, user.full_name) for user in scope if user.is_active]
+
+        # 汇总、周趋势、成员绩效、任务类型统计由固定数量的分组查询得出
+        report = ReportService(db).build(user_ids, start_dt, end_dt, members, teams)
+        report_cache.set(cache_key, report)
+    return report, user_ids, is_manager
+
+
 # 数据统计报表 - REQ-5.5
 @router.get("/reports")
 def get_reports(
     start_date: str = Query(..., description="开始日期 YYYY-MM-DD"),
     end_date: str = Query(..., description="结束日期 YYYY-MM-DD"),
+    depth: str = Query(DEPTH_DIRECT, pattern="^(direct|all)$", description="管理者的下属范围：direct 直属 / all 整个下属树"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """获取数据统计报表"""
+    """获取数据统计报表（depth=all 时统计整个下属树，并按子团队汇总）"""
     try:
         # 解析日期
         start_dt = datetime.strptime(start_date, "%Y-%m-%d")
         end_dt = datetime.strptime(end_date, "%Y-%m-%d")
 
-        # 确定查询范围 - 根据当前用户角色
-        if current_user.user_type == "admin" or any("manager" in role.name.lower() for role in current_user.roles):
-            # 管理者查看团队数据
-            user_ids = db.query(User.id).filter(
-                or_(
-                    User.manager_id == current_user.id,
-                    User.id == current_user.id
-                )
-            ).subquery()
-        else:
-            # 普通用户只看自己的数据
-            user_ids = db.query(User.id).filter(User.id == current_user.id).subquery()
-
-        # 基础统计查询
-        base_query = db.query(WeeklyTask).filter(
-            WeeklyTask.user_id.in_(user_ids),
-            WeeklyTask.planned_start_time >= start_dt,
-            WeeklyTask.planned_start_time <= end_dt
-        )
-
-        # 计算基础统计数据
-        total_tasks = base_query.count()
-        completed_tasks = base_query.filter(WeeklyTask.status == TaskStatus.COMPLETED).count()
-        in_progress_tasks = base_query.filter(WeeklyTask.status == TaskStatus.IN_PROGRESS).count()
-        todo_tasks = base_query.filter(WeeklyTask.status == TaskStatus.TODO).count()
-        delayed_tasks = base_query.filter(WeeklyTask.status == TaskStatus.DELAYED).count()
-        key_tasks = base_query.filter(WeeklyTask.is_key_task == True).count()
-        key_completed_tasks = base_query.filter(
-            WeeklyTask.is_key_task == True,
-            WeeklyTask.status == TaskStatus.COMPLETED
-        ).count()
-
-        # 计算比率
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        key_completion_rate = (key_completed_tasks / key_tasks * 100) if key_tasks > 0 else 0
-        delay_rate = (delayed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-
-        # 状态分布
-        status_distribution = {
-            "completed": completed_tasks,
-            "in_progress": in_progress_tasks,
-            "todo": todo_tasks,
-            "delayed": delayed_tasks
-        }
-
-        # 周趋势数据
-        weekly_trend = []
-        current_week = start_dt.isocalendar().week
-        current_year = start_dt.year
-        end_week = end_dt.isocalendar().week
-        end_year = end_dt.year
-
-        while (current_year < end_year) or (current_year == end_year and current_week <= end_week):
-            week_total = base_query.filter(
-                WeeklyTask.week_number == current_week,
-                WeeklyTask.year == current_year
-            ).count()
-
-            week_completed = base_query.filter(
-                WeeklyTask.week_number == current_week,
-                WeeklyTask.year == current_year,
-                WeeklyTask.status == TaskStatus.COMPLETED
-            ).count()
-
-            week_rate = (week_completed / week_total * 100) if week_total > 0 else 0
-
-            weekly_trend.append({
-                "week": current_week,
-                "year": current_year,
-                "total": week_total,
-                "completed": week_completed,
-                "rate": round(week_rate, 1)
-            })
-
-            # 移动到下一周
-            if current_week >= 52:
-                current_week = 1
-                current_year += 1
-            else:
-                current_week += 1
-
-        # 团队成员绩效（仅管理者）
-        member_performance = []
-        if current_user.user_type == "admin" or any("manager" in role.name.lower() for role in current_user.roles):
-            subordinates = db.query(User).filter(
-                or_(
-                    User.manager_id == current_user.id,
-                    User.id == current_user.id
-                ),
-                User.is_active == True
-            ).all()
-
-            for member in subordinates:
-                member_tasks = base_query.filter(WeeklyTask.user_id == member.id).all()
-                member_total = len(member_tasks)
-                member_completed = len([t for t in member_tasks if t.status == TaskStatus.COMPLETED])
-                member_key_tasks = len([t for t in member_tasks if t.is_key_task])
-                member_completion_rate = (member_completed / member_total * 100) if member_total > 0 else 0
-
-                # 计算平均完成时间（简化版）
-                avg_days = 0
-                completed_with_time = [t for t in member_tasks if t.status == TaskStatus.COMPLETED and t.actual_start_time and t.actual_end_time]
-                if completed_with_time:
-                    total_days = sum([(t.actual_end_time - t.actual_start_time).days + 1 for t in completed_with_time])
-                    avg_days = round(total_days / len(completed_with_time), 1)
-
-                # 计算已复盘周数
-                reviewed_weeks = db.query(TaskReview).join(WeeklyTask).filter(
-                    WeeklyTask.user_id == member.id,
-                    WeeklyTask.planned_start_time >= start_dt,
-                    WeeklyTask.planned_start_time <= end_dt
-                ).distinct(WeeklyTask.week_number, WeeklyTask.year).count()
-
-                # 简单的绩效评分（基于完成率）
-                performance_score = min(5, int(member_completion_rate / 20))
-
-                member_performance.append({
-                    "member_name": member.full_name,
-                    "total_tasks": member_total,
-                    "completed_tasks": member_completed,
-                    "key_tasks": member_key_tasks,
-                    "completion_rate": round(member_completion_rate, 1),
-                    "avg_completion_days": avg_days,
-                    "reviewed_weeks": reviewed_weeks,
-                    "performance_score": performance_score
-                })
-
-        # 任务类型统计 - 简化版本避免复杂的SQL case语句
-        task_type_stats = []
-        all_tasks = base_query.all()
-
-        # 按任务类型分组统计
-        task_type_groups = {}
-        for task in all_tasks:
-            if task.task_type:
-                task_type_name = task.task_type.name
-                responsibility_name = task.task_type.responsibility.name if task.task_type.responsibility else "未分类"
-
-                if task_type_name not in task_type_groups:
-                    task_type_groups[task_type_name] = {
-                        "task_type": task_type_name,
-                        "responsibility": responsibility_name,
-                        "count": 0,
-                        "completed": 0,
-                        "in_progress": 0,
-                        "todo": 0,
-                        "total_days": 0,
-                        "completed_with_days": 0
-                    }
-
-                group = task_type_groups[task_type_name]
-                group["count"] += 1
-
-                if task.status == TaskStatus.COMPLETED:
-                    group["completed"] += 1
-                    if task.actual_start_time and task.actual_end_time:
-                        days = (task.actual_end_time - task.actual_start_time).days + 1
-                        group["total_days"] += days
-                        group["completed_with_days"] += 1
-                elif task.status == TaskStatus.IN_PROGRESS:
-                    group["in_progress"] += 1
-                elif task.status == TaskStatus.TODO:
-                    group["todo"] += 1
-
-        # 计算完成率和平均天数
-        for group in task_type_groups.values():
-            completion_rate = (group["completed"] / group["count"] * 100) if group["count"] > 0 else 0
-            avg_days = (group["total_days"] / group["completed_with_days"]) if group["completed_with_days"] > 0 else 0
-
-            task_type_stats.append({
-                "task_type": group["task_type"],
-                "responsibility": group["responsibility"],
-                "count": group["count"],
-                "completed": group["completed"],
-                "in_progress": group["in_progress"],
-                "todo": group["todo"],
-                "completion_rate": round(completion_rate, 1),
-                "avg_days": round(avg_days, 1)
-            })
-
-        return {
-            "summary": {
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-                "key_tasks": key_tasks,
-                "delayed_tasks": delayed_tasks,
-                "completion_rate": round(completion_rate, 1),
-                "key_completion_rate": round(key_completion_rate, 1),
-                "delay_rate": round(delay_rate, 1)
-            },
-            "status_distribution": status_distribution,
-            "weekly_trend": weekly_trend,
-            "member_performance": member_performance,
-            "task_type_stats": task_type_stats
-        }
+        report, _, _ = _resolve_report(db, current_user, start_dt, end_dt, depth)
+        return report
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取报表数据失败: {str(e)}")
+
+
+@router.get("/reports/export")
+def export_reports(
+    start_date: str = Query(..., description="开始日期 YYYY-MM-DD"),
+    end_date: str = Query(..., description="结束日期 YYYY-MM-DD"),
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="导出格式：xlsx / csv"),
+    depth: str = Query(DEPTH_DIRECT, pattern="^(direct|all)$", description="管理者的下属范围：direct 直属 / all 整个下属树"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    导出数据统计报表 - REQ-5.5
+
+    数据概要、任务类型统计、团队绩效（管理者）和任务明细以流式响应写出，
+    任务明细边从游标读取边写出，不在内存中生成完整文件
+    """
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
+
+    report, user_ids, is_manager = _resolve_report(db, current_user, start_dt, end_dt, depth)
+    exporter = ReportExportService(db)
+    sheets = exporter.sheets(report, user_ids, start_dt, end_dt, include_members=is_manager)
+
+    def content():
+        # 依赖的会话在响应发送前即已关闭，这里读完任务明细后再释放连接
+        try:
+            yield from exporter.stream(format, sheets)
+        finally:
+            db.close()
+
+    media_type, _ = EXPORT_FORMATS[format]
+    filename = f"工作报表_{start_date}_{end_date}.{format}"
+    return StreamingResponse(content(), media_type=media_type, headers={
+        "Content-Disposition": f"attachment; filename=\"report_{start_date}_{end_date}.{format}\"; "
+                               f"filename*=UTF-8''{quote(filename)}"
+    })
+
+
+@router.get("/reports/durations")
+def get_duration_stats(
+    start_date: str = Query(..., description="开始日期 YYYY-MM-DD"),
+    end_date: str = Query(..., description="结束日期 YYYY-MM-DD"),
+    depth: str = Query(DEPTH_DIRECT, pattern="^(direct|all)$", description="管理者的下属范围：direct 直属 / all 整个下属树"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    计划/实际时长分布 - REQ-5.5
+
+    按任务类型、按用户返回已完成任务的计划/实际时长及偏差比（实际/计划）的 P50/P90、
+    偏差比直方图（分桶边界见 ratio_bucket_edges）和估算偏差比（实际合计/计划合计）
+    """
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日期格式错误，请使用 YYYY-MM-DD 格式")
+
+    scope, _, _ = _report_scope(db, current_user, depth)
+    cache_key = _report_cache_key("durations", current_user, depth, scope, start_dt, end_dt)
+    stats = report_cache.get(cache_key)
+    if stats is None:
+        stats = DurationStatsService(db).build([user.id for user in scope], start_dt, end_dt)
+        report_cache.set(cache_key, stats)
+    return stats
+
+
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """进程内缓存命中统计（管理员），用于调整缓存容量和过期时间"""
+    return cache_stats()
+
+
+@router.get("/pool-stats")
+def get_pool_stats(
+    current_user: User = Depends(get_current_admin)
+):
+    """数据库连接池占用与取连接等待统计（管理员），用于调整连接池参数"""
+    return pool_stats(engine)
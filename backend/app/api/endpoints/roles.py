@@ -6,12 +6,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ...api.deps import get_db, get_current_admin, get_current_user
-from ...models.role import Role, Responsibility, TaskType
+from ...models.role import Role, Responsibility, TaskType, UserRoleLink
 from ...schemas import role as schemas
+from ...services.data_version import bump_data_version
 
 router = APIRouter()
 
 
+def _bump_role_users(db: Session, role_id: int) -> None:
+    """岗位职责库变更后递增关联该岗位的用户的数据版本，使其任务类型授权缓存失效（不提交事务）"""
+    user_ids = [user_id for (user_id,) in db.query(UserRoleLink.user_id).filter(UserRoleLink.role_id == role_id)]
+    bump_data_version(db, user_ids)
+
+
 # 岗位管理 - REQ-2.1
 @router.post("/", response_model=schemas.Role, status_code=status.HTTP_201_CREATED)
 def create_role(
@@ -69,6 +76,7 @@ def deactivate_role(
         raise HTTPException(status_code=404, detail="岗位不存在")
 
     role.is_active = False
+    _bump_role_users(db, role.id)
     db.commit()
     return {"message": "岗位已停用"}
 
@@ -88,6 +96,7 @@ def create_responsibility(
 
     resp = Responsibility(**resp_in.model_dump())
     db.add(resp)
+    _bump_role_users(db, role.id)
     db.commit()
     db.refresh(resp)
     return resp
@@ -121,6 +130,7 @@ def deactivate_responsibility(
         raise HTTPException(status_code=404, detail="职责不存在")
 
     resp.is_active = False
+    _bump_role_users(db, resp.role_id)
     db.commit()
     return {"message": "职责已停用"}
 
@@ -140,6 +150,7 @@ def create_task_type(
 
     task_type = TaskType(**task_type_in.model_dump())
     db.add(task_type)
+    _bump_role_users(db, resp.role_id)
     db.commit()
     db.refresh(task_type)
     return task_type
@@ -173,5 +184,6 @@ def deactivate_task_type(
         raise HTTPException(status_code=404, detail="任务类型不存在")
 
     task_type.is_active = False
+    _bump_role_users(db, task_type.responsibility.role_id)
     db.commit()
     return {"message": "任务类型已停用"}
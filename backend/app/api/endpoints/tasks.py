@@ -2,16 +2,30 @@
 任务管理API端点 - REQ-3.1, REQ-3.3, REQ-4
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Integer, and_, case, false, func, insert, literal, or_, select
+from sqlalchemy.orm import Session, joinedload, sessionmaker
 from datetime import datetime, timedelta
+import base64
+import json
 import logging
 
-from ...api.deps import get_db, get_current_user, get_current_manager
+from ...api.deps import get_db, get_current_user, get_current_manager, get_current_admin
+from ...core.cache import weekly_report_cache, allowed_task_type_cache
+from ...core.etag import make_etag, is_not_modified, not_modified, set_etag
 from ...models.user import User
-from ...models.task import WeeklyTask, TaskReview, TaskStatus, FollowUpAction
-from ...models.role import TaskType, Responsibility, Role
+from ...models.task import (
+    WeeklyTask, WeeklyTaskArchive, TaskReview, TaskStatus, TaskSource, FollowUpAction, ReviewFallbackRun
+)
+from ...models.role import TaskType, Responsibility, Role, UserRoleLink
 from ...schemas import task as schemas
+from ...services.carry_over_service import CarryOverService
+from ...services.archive_service import week_sources
+from ...services.data_version import bump_data_version
+from ...services.hierarchy_service import is_subordinate
+from ...services.weekly_stats_service import refresh_weekly_stats
+from ...services.review_fallback_job import ReviewFallbackJob
+from ...utils.iso_week import week_key
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -26,9 +40,9 @@ def create_weekly_task(
     current_user: User = Depends(get_current_user)
 ):
     """创建周计划任务（员工）- 优化版：强制岗责关联，增加时间属性"""
-    
-    # 验证任务类型存在且属于当前用户的岗位职责
-    if task_in.linked_task_type_id:
+
+    # 验证任务类型属于当前用户的岗位职责（命中缓存时无需查询数据库）
+    if task_in.linked_task_type_id not in get_allowed_task_type_ids(db, current_user):
         # 检查任务类型是否存在
         task_type = db.query(TaskType).filter(TaskType.id == task_in.linked_task_type_id).first()
         if not task_type:
@@ -36,22 +50,10 @@ def create_weekly_task(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="关联的任务类型不存在"
             )
-        
-        # 验证该任务类型属于用户的某个岗位
-        user_roles = db.query(Role).join(User.roles).filter(User.id == current_user.id).all()
-        user_role_ids = [role.id for role in user_roles]
-        
-        # 检查任务类型是否属于用户的岗位职责
-        responsibility = db.query(Responsibility).join(Responsibility.task_types).filter(
-            Responsibility.role_id.in_(user_role_ids),
-            TaskType.id == task_in.linked_task_type_id
-        ).first()
-        
-        if not responsibility:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="该任务类型不属于您的岗位职责范围"
-            )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="该任务类型不属于您的岗位职责范围"
+        )
     
     # 验证时间逻辑
     if task_in.planned_start_time >= task_in.planned_end_time:
@@ -69,49 +71,385 @@ def create_weekly_task(
         planned_duration=planned_duration
     )
     db.add(task)
+    bump_data_version(db, [current_user.id])
+    refresh_weekly_stats(db, [(current_user.id, task.year, task.week_number)])
     db.commit()
     db.refresh(task)
     
-    logger.info(f"用户 {current_user.id} 创建了任务 '{task.title}'，关联职责: {task_type.name if task_type else '无'}")
+    logger.info(f"用户 {current_user.id} 创建了任务 '{task.title}'，关联任务类型: {task.linked_task_type_id}")
     return task
 
 
+@router.post("/week-plan", response_model=schemas.WeeklyPlanResult, status_code=status.HTTP_201_CREATED)
+def submit_week_plan(
+    plan_in: schemas.WeeklyPlanSubmit,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    整周计划一次提交：统一校验岗责归属与时间，所有有效任务在一个事务中写入
+
+    默认跳过无效条目并逐条返回错误；atomic=True 时任一条目无效则整体拒绝
+    """
+    allowed = get_allowed_task_type_ids(db, current_user)
+
+    # 不在授权集合中的任务类型，一次查询区分“不存在”与“无权限”
+    unknown_ids = {item.linked_task_type_id for item in plan_in.tasks} - allowed
+    existing_ids = set()
+    if unknown_ids:
+        existing_ids = {
+            task_type_id for (task_type_id,) in
+            db.query(TaskType.id).filter(TaskType.id.in_(unknown_ids)).all()
+        }
+
+    results: List[schemas.WeeklyPlanItemResult] = []
+    valid_items = []
+    for index, item in enumerate(plan_in.tasks):
+        detail = None
+        if item.linked_task_type_id not in allowed:
+            detail = "该任务类型不属于您的岗位职责范围" if item.linked_task_type_id in existing_ids \
+                else "关联的任务类型不存在"
+        elif item.planned_start_time >= item.planned_end_time:
+            detail = "计划开始时间必须早于结束时间"
+
+        if detail:
+            results.append(schemas.WeeklyPlanItemResult(index=index, success=False, detail=detail))
+        else:
+            valid_items.append((index, item))
+
+    if plan_in.atomic and len(valid_items) < len(plan_in.tasks):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[r.model_dump() for r in results]
+        )
+
+    tasks = [
+        WeeklyTask(
+            **item.model_dump(exclude={'planned_duration'}),
+            user_id=current_user.id,
+            planned_duration=int((item.planned_end_time - item.planned_start_time).total_seconds() / 60)
+        )
+        for _, item in valid_items
+    ]
+    if tasks:
+        db.add_all(tasks)
+        db.flush()
+        # 提交前取出ID，避免提交后逐个刷新对象
+        for (index, _), task in zip(valid_items, tasks):
+            results.append(schemas.WeeklyPlanItemResult(index=index, success=True, task_id=task.id))
+        bump_data_version(db, [current_user.id])
+        refresh_weekly_stats(db, {(current_user.id, item.year, item.week_number) for _, item in valid_items})
+        db.commit()
+    results.sort(key=lambda r: r.index)
+
+    logger.info(f"用户 {current_user.id} 提交整周计划，成功 {len(tasks)} 条，失败 {len(results) - len(tasks)} 条")
+    return schemas.WeeklyPlanResult(
+        created_count=len(tasks),
+        failed_count=len(results) - len(tasks),
+        results=results
+    )
+
+
+@router.post("/clone-week", response_model=schemas.WeekCloneResult, status_code=status.HTTP_201_CREATED)
+def clone_week(
+    clone_in: schemas.WeekCloneRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    按上周（或任意周）计划复制到目标周：单条 INSERT ... SELECT 完成
+
+    计划时间按周差平移，状态重置为待办；仅复制仍在岗责范围内的任务类型
+    """
+    try:
+        source_monday = datetime.strptime(f"{clone_in.source_year}-W{clone_in.source_week_number}-1", "%G-W%V-%u")
+        target_monday = datetime.strptime(f"{clone_in.target_year}-W{clone_in.target_week_number}-1", "%G-W%V-%u")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的年份或周次")
+    if source_monday.isocalendar()[:2] != (clone_in.source_year, clone_in.source_week_number) or \
+            target_monday.isocalendar()[:2] != (clone_in.target_year, clone_in.target_week_number):
+        raise HTTPException(status_code=400, detail="无效的年份或周次")
+    day_offset = (target_monday - source_monday).days
+    if day_offset == 0:
+        raise HTTPException(status_code=400, detail="源周与目标周不能相同")
+
+    allowed = get_allowed_task_type_ids(db, current_user)
+    dialect_name = db.get_bind().dialect.name
+
+    source = select(
+        WeeklyTask.user_id,
+        literal(clone_in.target_year, Integer),
+        literal(clone_in.target_week_number, Integer),
+        WeeklyTask.title,
+        WeeklyTask.description,
+        _shift_days(WeeklyTask.planned_start_time, day_offset, dialect_name),
+        _shift_days(WeeklyTask.planned_end_time, day_offset, dialect_name),
+        WeeklyTask.planned_duration,
+        WeeklyTask.source_type,
+        WeeklyTask.linked_task_type_id,
+        WeeklyTask.assigned_by_manager_id,
+        WeeklyTask.is_key_task,
+        literal(TaskStatus.TODO, WeeklyTask.status.type),
+        false(),
+        false(),
+    ).where(
+        WeeklyTask.user_id == current_user.id,
+        WeeklyTask.year == clone_in.source_year,
+        WeeklyTask.week_number == clone_in.source_week_number,
+        WeeklyTask.is_deleted == False,
+        WeeklyTask.linked_task_type_id.in_(allowed)
+    ).order_by(WeeklyTask.id)
+    if clone_in.only_key_tasks:
+        source = source.where(WeeklyTask.is_key_task == True)
+    if clone_in.only_responsibility:
+        source = source.where(WeeklyTask.source_type == TaskSource.RESPONSIBILITY)
+
+    stmt = insert(WeeklyTask).from_select([
+        WeeklyTask.user_id,
+        WeeklyTask.year,
+        WeeklyTask.week_number,
+        WeeklyTask.title,
+        WeeklyTask.description,
+        WeeklyTask.planned_start_time,
+        WeeklyTask.planned_end_time,
+        WeeklyTask.planned_duration,
+        WeeklyTask.source_type,
+        WeeklyTask.linked_task_type_id,
+        WeeklyTask.assigned_by_manager_id,
+        WeeklyTask.is_key_task,
+        WeeklyTask.status,
+        WeeklyTask.is_delayed_from_previous,
+        WeeklyTask.is_deleted,
+    ], source)
+    created_count = db.execute(stmt).rowcount
+    bump_data_version(db, [current_user.id])
+    refresh_weekly_stats(db, [(current_user.id, clone_in.target_year, clone_in.target_week_number)])
+    db.commit()
+
+    logger.info(
+        f"用户 {current_user.id} 将 {clone_in.source_year}-W{clone_in.source_week_number} 的 {created_count} 个任务"
+        f"复制到 {clone_in.target_year}-W{clone_in.target_week_number}"
+    )
+    return schemas.WeekCloneResult(created_count=created_count, day_offset=day_offset)
+
+
+def _shift_days(column, days: int, dialect_name: str):
+    """
+    在SQL中将时间列平移指定天数
+
+    SQLite 无 interval 类型，用 strftime 平移；结果需与 ORM 写入的文本格式
+    （YYYY-MM-DD HH:MM:SS.ffffff）一致，否则与报表区间按字符串比较时会漏掉这些行，
+    因此秒以下部分沿用原值的 6 位小数（原值无小数时补 .000000）
+    """
+    if dialect_name == "sqlite":
+        fraction = case((func.length(column) > 19, func.substr(column, 20, 7)), else_=literal(".000000"))
+        return func.strftime("%Y-%m-%d %H:%M:%S", column, f"{days:+d} days").op("||")(fraction)
+    return column + timedelta(days=days)
+
+
+def get_allowed_task_type_ids(db: Session, user: User) -> frozenset:
+    """
+    获取用户可使用的任务类型ID集合（用户岗位下启用的职责与任务类型）
+
+    结果按 (用户, data_version) 缓存，岗位关联变更或岗位职责库停用/新增时递增版本号
+    """
+    user_id = user.id
+    cache_key = (user_id, user.data_version)
+    allowed = allowed_task_type_cache.get(cache_key)
+    if allowed is None:
+        rows = db.query(TaskType.id).join(
+            Responsibility, Responsibility.id == TaskType.responsibility_id
+        ).join(
+            Role, Role.id == Responsibility.role_id
+        ).join(
+            UserRoleLink, UserRoleLink.role_id == Role.id
+        ).filter(
+            UserRoleLink.user_id == user_id,
+            Role.is_active == True,
+            Responsibility.is_active == True,
+            TaskType.is_active == True
+        ).all()
+        allowed = frozenset(task_type_id for (task_type_id,) in rows)
+        allowed_task_type_cache.set(cache_key, allowed)
+    return allowed
+
+
 @router.get("/my-tasks", response_model=List[schemas.WeeklyTask])
 def get_my_tasks(
+    request: Request,
+    response: Response,
     week_number: int = None,
     year: int = None,
     is_key_task: bool = None,
     source_type: Optional[str] = None,
+    task_status: Optional[TaskStatus] = Query(None, alias="status", description="按状态过滤"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="每页条数，不传则返回全部"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 X-Next-Cursor"),
+    with_total: bool = Query(False, description="是否在 X-Total-Count 中返回总数"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取我的任务列表 - REQ-3.3
 
-    使用joinedload优化关联查询，避免N+1问题
+    使用joinedload优化关联查询，避免N+1问题；
+    传入limit时按 (is_key_task desc, created_at, id) 做游标分页，
+    下一页游标通过 X-Next-Cursor 响应头返回，总数按需通过 X-Total-Count 返回；
+    ETag 由用户数据版本和查询参数生成，If-None-Match 匹配时返回304
     """
     logger.info(f"Fetching tasks for user {current_user.id}, week={week_number}, year={year}")
 
-    # 使用joinedload预加载关联数据，避免N+1查询
-    query = db.query(WeeklyTask).options(
-        joinedload(WeeklyTask.task_type),
-        joinedload(WeeklyTask.assigner),
-        joinedload(WeeklyTask.review)
-    ).filter(WeeklyTask.user_id == current_user.id)
+    etag = make_etag(
+        "my-tasks", current_user.id, current_user.data_version,
+        sorted(request.query_params.multi_items())
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # 已归档的周从归档表读取，按 (is_key_task desc, created_at, id) 合并
+    key = _decode_task_cursor(cursor) if cursor else None
+    sources = week_sources(db, _from_week_key(year, week_number))
+    queries = []
+    for Task, _ in sources:
+        query = db.query(Task).filter(
+            Task.user_id == current_user.id,
+            Task.is_deleted == False
+        )
+        if week_number:
+            query = query.filter(Task.week_number == week_number)
+        if year:
+            query = query.filter(Task.year == year)
+        if is_key_task is not None:
+            query = query.filter(Task.is_key_task == is_key_task)
+        if source_type:
+            query = query.filter(Task.source_type == source_type)
+        if task_status:
+            query = query.filter(Task.status == task_status)
+        queries.append((Task, query))
+
+    # 总数使用独立的COUNT查询，不带预加载和游标条件
+    if with_total:
+        total = sum(query.with_entities(func.count(Task.id)).scalar() for Task, query in queries)
+        response.headers["X-Total-Count"] = str(total)
+
+    tasks = []
+    for Task, query in queries:
+        if key:
+            query = query.filter(_keyset_after(key, Task))
+        # 使用joinedload预加载关联数据，避免N+1查询
+        query = query.options(
+            joinedload(Task.task_type),
+            joinedload(Task.assigner),
+            joinedload(Task.review)
+        ).order_by(Task.is_key_task.desc(), Task.created_at, Task.id)
+        # 传入limit时每个来源多取一条用于判断是否还有下一页
+        tasks.extend(query.limit(limit + 1).all() if limit else query.all())
+    if len(queries) > 1:
+        tasks.sort(key=lambda t: (not t.is_key_task, t.created_at, t.id))
+
+    if limit and len(tasks) > limit:
+        tasks = tasks[:limit]
+        response.headers["X-Next-Cursor"] = _encode_task_cursor(tasks[-1])
+    logger.info(f"Found {len(tasks)} tasks for user {current_user.id}")
 
-    if week_number:
-        query = query.filter(WeeklyTask.week_number == week_number)
+    return tasks
+
+
+def _from_week_key(year: Optional[int], week_number: Optional[int]) -> int:
+    """按年份/周次过滤时涉及的最早周键，用于判断是否需要读取归档表"""
+    if year and week_number:
+        return week_key(year, week_number)
     if year:
-        query = query.filter(WeeklyTask.year == year)
-    if is_key_task is not None:
-        query = query.filter(WeeklyTask.is_key_task == is_key_task)
-    if source_type:
-        query = query.filter(WeeklyTask.source_type == source_type)
+        return week_key(year, 1)
+    return 0
 
-    tasks = query.order_by(WeeklyTask.is_key_task.desc(), WeeklyTask.created_at).all()
-    logger.info(f"Found {len(tasks)} tasks for user {current_user.id}")
 
-    return tasks
+def _encode_task_cursor(task: WeeklyTask) -> str:
+    """将游标位置 (is_key_task, id) 编码为不透明字符串"""
+    payload = {"k": bool(task.is_key_task), "i": task.id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_task_cursor(cursor: str) -> dict:
+    """解析游标，格式错误时返回400"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return {"k": bool(payload["k"]), "i": int(payload["i"])}
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+
+def _keyset_after(key: dict, Task=WeeklyTask):
+    """
+    构造 (is_key_task desc, created_at, id) 顺序下位于游标之后的过滤条件
+
+    created_at 通过子查询取游标行的库内值，避免不同数据库的时间精度/格式差异；
+    游标行可能已被归档（归档保留原ID），热表中查不到时从归档表取
+    """
+    cursor_created_at = func.coalesce(
+        select(WeeklyTask.created_at).where(WeeklyTask.id == key["i"]).scalar_subquery(),
+        select(WeeklyTaskArchive.created_at).where(WeeklyTaskArchive.id == key["i"]).scalar_subquery()
+    )
+    after_in_group = and_(
+        Task.is_key_task == key["k"],
+        or_(
+            Task.created_at > cursor_created_at,
+            and_(Task.created_at == cursor_created_at, Task.id > key["i"])
+        )
+    )
+    if key["k"]:
+        # 重点任务排在前面，之后是全部非重点任务
+        return or_(after_in_group, Task.is_key_task == False)
+    return after_in_group
+
+
+@router.get("/changes", response_model=schemas.TaskChanges)
+def get_task_changes(
+    since: Optional[int] = Query(None, ge=0, description="上次同步返回的 cursor，不传表示全量"),
+    week_number: int = None,
+    year: int = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    任务增量同步
+
+    返回变更序号大于 since 的任务：未删除的放在 changes，软删除的（墓碑）只返回ID；
+    新 cursor 为当前用户的数据版本，since 大于该版本（如数据被重置）时退回全量并标记 reset
+    """
+    cursor = current_user.data_version
+    reset = since is not None and since > cursor
+    full = since is None or reset
+
+    # 归档保留原ID和变更序号，已归档的任务（含墓碑）同样按变更序号返回
+    tasks, deleted_ids = [], []
+    for Task, _ in week_sources(db, _from_week_key(year, week_number)):
+        query = db.query(Task).filter(Task.user_id == current_user.id)
+        if week_number:
+            query = query.filter(Task.week_number == week_number)
+        if year:
+            query = query.filter(Task.year == year)
+
+        if full:
+            changed = query.filter(Task.is_deleted == False)
+        else:
+            query = query.filter(Task.change_seq > since)
+            changed = query.filter(Task.is_deleted == False)
+            deleted_ids.extend(
+                task_id for (task_id,) in
+                query.filter(Task.is_deleted == True).with_entities(Task.id)
+            )
+
+        tasks.extend(changed.options(
+            joinedload(Task.task_type),
+            joinedload(Task.assigner),
+            joinedload(Task.review)
+        ).all())
+    tasks.sort(key=lambda t: t.id)
+    deleted_ids.sort()
+
+    return schemas.TaskChanges(cursor=cursor, reset=reset, changes=tasks, deleted_ids=deleted_ids)
 
 
 @router.get("/delayed-tasks", response_model=List[schemas.WeeklyTask])
@@ -131,12 +469,16 @@ def get_delayed_tasks(
         year = prev_dt.isocalendar()[0]
         week_number = prev_dt.isocalendar()[1]
 
-    tasks = db.query(WeeklyTask).filter(
-        WeeklyTask.user_id == current_user.id,
-        WeeklyTask.status == TaskStatus.DELAYED,
-        WeeklyTask.week_number == week_number,
-        WeeklyTask.year == year,
-    ).all()
+    # 已归档的周从归档表读取
+    key = week_key(year, week_number)
+    tasks = []
+    for Task, _ in week_sources(db, key):
+        tasks.extend(db.query(Task).filter(
+            Task.user_id == current_user.id,
+            Task.status == TaskStatus.DELAYED,
+            Task.iso_week_key == key,
+            Task.is_deleted == False,
+        ).order_by(Task.id).all())
     return tasks
 
 
@@ -148,7 +490,10 @@ def update_task(
     current_user: User = Depends(get_current_user)
 ):
     """更新任务 - 支持时间属性更新，智能计算持续时间"""
-    task = db.query(WeeklyTask).filter(WeeklyTask.id == task_id).first()
+    task = db.query(WeeklyTask).filter(
+        WeeklyTask.id == task_id,
+        WeeklyTask.is_deleted == False
+    ).first()
     if not task:
         raise HTTPException(status_code=404, detail="任务不存在")
 
@@ -213,6 +558,9 @@ def update_task(
     for field, value in update_data.items():
         setattr(task, field, value)
 
+    task.change_seq = None
+    bump_data_version(db, [current_user.id])
+    refresh_weekly_stats(db, [(task.user_id, task.year, task.week_number)])
     db.commit()
     db.refresh(task)
     
@@ -220,6 +568,104 @@ def update_task(
     return task
 
 
+@router.post("/bulk", response_model=schemas.TaskBulkResult)
+def bulk_update_tasks(
+    bulk_in: schemas.TaskBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    批量操作任务：批量更新状态 / 批量标记重点 / 批量删除（软删除）
+
+    一次权限校验查询 + 每种操作一条UPDATE + 一次提交，返回逐项结果
+    """
+    if bulk_in.operation == schemas.BulkOperation.SET_STATUS and bulk_in.status is None:
+        raise HTTPException(status_code=400, detail="批量更新状态时必须指定目标状态")
+    if bulk_in.operation == schemas.BulkOperation.SET_KEY_TASK and bulk_in.is_key_task is None:
+        raise HTTPException(status_code=400, detail="批量标记重点时必须指定is_key_task")
+
+    # 去重并保持请求顺序
+    task_ids = list(dict.fromkeys(bulk_in.task_ids))
+    if not task_ids:
+        raise HTTPException(status_code=400, detail="请至少选择一个任务")
+
+    # 一次查询完成存在性与归属校验
+    rows = db.query(
+        WeeklyTask.id, WeeklyTask.user_id, WeeklyTask.year, WeeklyTask.week_number,
+        WeeklyTask.is_deleted, WeeklyTask.actual_start_time
+    ).filter(WeeklyTask.id.in_(task_ids)).all()
+    found = {row.id: row for row in rows}
+
+    results: dict = {}
+    owned_ids: List[int] = []
+    for task_id in task_ids:
+        row = found.get(task_id)
+        if row is None or row.is_deleted:
+            results[task_id] = schemas.TaskBulkItemResult(task_id=task_id, success=False, detail="任务不存在")
+        elif row.user_id != current_user.id:
+            results[task_id] = schemas.TaskBulkItemResult(task_id=task_id, success=False, detail="无权限修改此任务")
+        else:
+            owned_ids.append(task_id)
+
+    if owned_ids:
+        values = {}
+        if bulk_in.operation == schemas.BulkOperation.SET_STATUS:
+            values = _bulk_status_values(bulk_in.status, [found[i] for i in owned_ids])
+        elif bulk_in.operation == schemas.BulkOperation.SET_KEY_TASK:
+            values = {WeeklyTask.is_key_task: bulk_in.is_key_task}
+        elif bulk_in.operation == schemas.BulkOperation.DELETE:
+            values = {WeeklyTask.is_deleted: True}
+        # 清空变更序号，由 bump_data_version 统一盖上新序号
+        values[WeeklyTask.change_seq] = None
+
+        db.query(WeeklyTask).filter(
+            WeeklyTask.id.in_(owned_ids)
+        ).update(values, synchronize_session=False)
+        bump_data_version(db, [current_user.id])
+        refresh_weekly_stats(db, {(current_user.id, found[i].year, found[i].week_number) for i in owned_ids})
+        db.commit()
+
+        for task_id in owned_ids:
+            results[task_id] = schemas.TaskBulkItemResult(task_id=task_id, success=True)
+
+    logger.info(
+        f"用户 {current_user.id} 批量操作任务 {bulk_in.operation.value}，"
+        f"成功 {len(owned_ids)} 个，失败 {len(task_ids) - len(owned_ids)} 个"
+    )
+    return schemas.TaskBulkResult(
+        operation=bulk_in.operation,
+        succeeded_count=len(owned_ids),
+        failed_count=len(task_ids) - len(owned_ids),
+        results=[results[task_id] for task_id in task_ids]
+    )
+
+
+def _bulk_status_values(target_status: TaskStatus, rows) -> dict:
+    """
+    构造批量状态变更的UPDATE赋值，与 update_task 的状态副作用保持一致：
+    - 已完成：记录完成时间、实际结束时间，有实际开始时间的按行计算实际持续时间
+    - 进行中：未记录实际开始时间的补记为当前时间
+    """
+    now = datetime.now()
+    values = {WeeklyTask.status: target_status}
+
+    if target_status == TaskStatus.COMPLETED:
+        values[WeeklyTask.completed_at] = now
+        values[WeeklyTask.actual_end_time] = now
+        durations = {
+            row.id: int((now - row.actual_start_time.replace(tzinfo=None)).total_seconds() / 60)
+            for row in rows if row.actual_start_time
+        }
+        if durations:
+            values[WeeklyTask.actual_duration] = case(
+                durations, value=WeeklyTask.id, else_=WeeklyTask.actual_duration
+            )
+    elif target_status == TaskStatus.IN_PROGRESS:
+        values[WeeklyTask.actual_start_time] = func.coalesce(WeeklyTask.actual_start_time, now)
+
+    return values
+
+
 # 周复盘 - REQ-4
 @router.post("/reviews/", response_model=schemas.TaskReview, status_code=status.HTTP_201_CREATED)
 def create_task_review(
@@ -229,7 +675,10 @@ def create_task_review(
 ):
     """创建任务复盘 - REQ-4.1 ~ REQ-4.4"""
     # 验证任务存在且属于当前用户
-    task = db.query(WeeklyTask).filter(WeeklyTask.id == review_in.task_id).first()
+    task = db.query(WeeklyTask).filter(
+        WeeklyTask.id == review_in.task_id,
+        WeeklyTask.is_deleted == False
+    ).first()
     if not task:
         raise HTTPException(status_code=404, detail="任务不存在")
     if task.user_id != current_user.id:
@@ -257,6 +706,9 @@ def create_task_review(
         elif review_in.follow_up_action == FollowUpAction.CANCEL:
             task.status = TaskStatus.CANCELLED
 
+    task.change_seq = None
+    bump_data_version(db, [task.user_id])
+    refresh_weekly_stats(db, [(task.user_id, task.year, task.week_number)])
     db.commit()
     db.refresh(review)
     return review
@@ -277,65 +729,40 @@ def apply_review_fallback(
     """
     未复盘兜底：将未复盘且未完成的任务标记为延期并自动滚动到下一周
     """
-    tasks = db.query(WeeklyTask).filter(
-        WeeklyTask.user_id == current_user.id,
-        WeeklyTask.week_number == fallback_in.week_number,
-        WeeklyTask.year == fallback_in.year,
-        WeeklyTask.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS])
-    ).all()
-
-    created_ids: List[int] = []
-    failed_ids: List[int] = []
-
-    def _next_week(year: int, week: int):
-        base = datetime.strptime(f"{year}-W{week}-1", "%G-W%V-%u")
-        nxt = base + timedelta(days=7)
-        return nxt.isocalendar()[0], nxt.isocalendar()[1]
-
-    next_year, next_week = _next_week(fallback_in.year, fallback_in.week_number)
-
-    for task in tasks:
-        # 创建复盘记录，标记为未完成超时
-        if db.query(TaskReview).filter(TaskReview.task_id == task.id).first():
-            continue
-        review = TaskReview(
-            task_id=task.id,
-            is_completed=False,
-            incomplete_reason="超时未复盘",
-            follow_up_action=FollowUpAction.DELAY_TO_NEXT_WEEK,
-            notes=None
-        )
-        task.status = TaskStatus.DELAYED
-        task.is_delayed_from_previous = True
-        task.original_week = task.week_number
-        db.add(review)
-
-        try:
-            new_task = WeeklyTask(
-                title=task.title,
-                description=task.description,
-                user_id=task.user_id,
-                week_number=next_week,
-                year=next_year,
-                status=TaskStatus.TODO,
-                is_key_task=task.is_key_task,
-                source_type=task.source_type,
-                linked_task_type_id=task.linked_task_type_id,
-                assigned_by_manager_id=task.assigned_by_manager_id,
-                planned_start_time=task.planned_start_time + timedelta(days=7),
-                planned_end_time=task.planned_end_time + timedelta(days=7),
-                planned_duration=task.planned_duration,
-                is_delayed_from_previous=True,
-                original_week=task.week_number,
-            )
-            db.add(new_task)
-            db.flush()
-            created_ids.append(new_task.id)
-        except Exception:
-            failed_ids.append(task.id)
-
+    outcome = CarryOverService(db).apply_review_fallback(
+        [current_user.id], fallback_in.year, fallback_in.week_number
+    )
     db.commit()
-    return schemas.CarryOverResult(created_task_ids=created_ids, failed_task_ids=failed_ids)
+    return schemas.CarryOverResult(
+        created_task_ids=outcome.created_task_ids,
+        failed_task_ids=outcome.failed_task_ids
+    )
+
+
+@router.post("/reviews/fallback/runs", status_code=status.HTTP_202_ACCEPTED)
+def trigger_review_fallback_job(
+    fallback_in: ReviewFallbackRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """手动触发（或从断点续跑）全员未复盘兜底（管理员）"""
+    job = ReviewFallbackJob(sessionmaker(bind=db.get_bind()))
+    background_tasks.add_task(job.run, fallback_in.year, fallback_in.week_number)
+    logger.info(f"管理员 {current_user.id} 触发了 {fallback_in.year}年第{fallback_in.week_number}周的全员兜底")
+    return {"message": "全员兜底任务已提交", "year": fallback_in.year, "week_number": fallback_in.week_number}
+
+
+@router.get("/reviews/fallback/runs", response_model=List[schemas.ReviewFallbackRun])
+def list_review_fallback_runs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """查看全员兜底运行记录：进度、断点与吞吐（管理员）"""
+    return db.query(ReviewFallbackRun).order_by(
+        ReviewFallbackRun.year.desc(), ReviewFallbackRun.week_number.desc()
+    ).limit(limit).all()
 
 
 @router.get("/weekly-report")
@@ -345,19 +772,33 @@ def get_weekly_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """生成周报 - REQ-4.5"""
-    # 获取本周所有任务
-    tasks = db.query(WeeklyTask).filter(
-        WeeklyTask.user_id == current_user.id,
-        WeeklyTask.week_number == week_number,
-        WeeklyTask.year == year
-    ).all()
+    """生成周报 - REQ-4.5（按用户-数据版本-周缓存，任务或复盘写入递增版本后不再命中）"""
+    cache_key = (current_user.id, current_user.data_version, year, week_number)
+    report = weekly_report_cache.get(cache_key)
+    if report is not None:
+        return report
+
+    # 获取本周所有任务，复盘记录随任务一次加载（已归档的周从归档表读取）
+    key = week_key(year, week_number)
+    tasks = []
+    for Task, _ in week_sources(db, key):
+        tasks.extend(db.query(Task).options(joinedload(Task.review)).filter(
+            Task.user_id == current_user.id,
+            Task.iso_week_key == key,
+            Task.is_deleted == False
+        ).all())
+    tasks.sort(key=lambda t: t.id)
 
     # 统计数据
     completed_tasks = [t for t in tasks if t.status == TaskStatus.COMPLETED]
     incomplete_tasks = [t for t in tasks if t.status in [TaskStatus.DELAYED, TaskStatus.CANCELLED]]
     key_tasks = [t for t in tasks if t.is_key_task]
 
+    def _review(task):
+        if task.review is None:
+            return None
+        return schemas.TaskReview.model_validate(task.review).model_dump(mode="json")
+
     # 构建周报
     report = {
         "week_number": week_number,
@@ -380,7 +821,7 @@ def get_weekly_report(
                 "title": t.title,
                 "status": t.status.value,
                 "is_completed": t.status == TaskStatus.COMPLETED,
-                "review": db.query(TaskReview).filter(TaskReview.task_id == t.id).first()
+                "review": _review(t)
             }
             for t in key_tasks
         ],
@@ -390,12 +831,13 @@ def get_weekly_report(
                 "id": t.id,
                 "title": t.title,
                 "status": t.status.value,
-                "review": db.query(TaskReview).filter(TaskReview.task_id == t.id).first()
+                "review": _review(t)
             }
             for t in incomplete_tasks
         ]
     }
 
+    weekly_report_cache.set(cache_key, report)
     return report
 
 
@@ -408,14 +850,11 @@ def assign_task(
     current_user: User = Depends(get_current_manager)
 ):
     """管理者为下属指派任务 - REQ-5.4"""
-    # 验证被指派者存在且是当前用户的下属
-    target_user = db.query(User).filter(User.id == user_id).first()
-    if not target_user:
-        raise HTTPException(status_code=404, detail="用户不存在")
-
-    # 检查汇报关系（严格模式）
-    if target_user.manager_id != current_user.id:
-        raise HTTPException(status_code=403, detail="只能为直属下属指派任务")
+    # 验证被指派者是当前用户的下属（含跨级），闭包表一次主键查找
+    if not is_subordinate(db, current_user.id, user_id):
+        if not db.query(User.id).filter(User.id == user_id).first():
+            raise HTTPException(status_code=404, detail="用户不存在")
+        raise HTTPException(status_code=403, detail="只能为下属指派任务")
 
     payload = task_in.model_dump()
     # 确保来源被覆盖为领导安排，防止请求体篡改
@@ -438,6 +877,8 @@ def assign_task(
         assigned_by_manager_id=current_user.id
     )
     db.add(task)
+    bump_data_version(db, [user_id])
+    refresh_weekly_stats(db, [(user_id, task.year, task.week_number)])
     db.commit()
     db.refresh(task)
     return task
@@ -452,42 +893,11 @@ def carry_over_tasks(
     """
     将上周延期任务自动带入新周计划
     """
-    tasks = db.query(WeeklyTask).filter(
-        WeeklyTask.id.in_(payload.task_ids),
-        WeeklyTask.user_id == current_user.id
-    ).all()
-
-    created_task_ids: List[int] = []
-    failed_task_ids: List[int] = []
-
-    for task in tasks:
-        if task.status != TaskStatus.DELAYED:
-            failed_task_ids.append(task.id)
-            continue
-
-        try:
-            new_task = WeeklyTask(
-                title=task.title,
-                description=task.description,
-                user_id=current_user.id,
-                week_number=payload.target_week_number,
-                year=payload.target_year,
-                status=TaskStatus.TODO,
-                is_key_task=task.is_key_task,
-                source_type=task.source_type,
-                linked_task_type_id=task.linked_task_type_id,
-                assigned_by_manager_id=task.assigned_by_manager_id,
-                planned_start_time=task.planned_start_time + timedelta(days=7),
-                planned_end_time=task.planned_end_time + timedelta(days=7),
-                planned_duration=task.planned_duration,
-                is_delayed_from_previous=True,
-                original_week=task.week_number
-            )
-            db.add(new_task)
-            db.flush()
-            created_task_ids.append(new_task.id)
-        except Exception:
-            failed_task_ids.append(task.id)
-
+    outcome = CarryOverService(db).carry_over(
+        current_user.id, payload.task_ids, payload.target_year, payload.target_week_number
+    )
     db.commit()
-    return schemas.CarryOverResult(created_task_ids=created_task_ids, failed_task_ids=failed_task_ids)
+    return schemas.CarryOverResult(
+        created_task_ids=outcome.created_task_ids,
+        failed_task_ids=outcome.failed_task_ids
+    )
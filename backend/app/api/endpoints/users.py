@@ -10,6 +10,8 @@ from ...core.security import get_password_hash
 from ...models.user import User, Department
 from ...models.role import UserRoleLink
 from ...schemas import user as schemas
+from ...services.data_version import bump_data_version
+from ...services.hierarchy_service import set_manager
 
 router = APIRouter()
 
@@ -47,6 +49,12 @@ def create_user(
         user_type=user_in.user_type
     )
     db.add(db_user)
+    if user_in.manager_id is not None:
+        db.flush()
+        try:
+            set_manager(db, db_user.id, user_in.manager_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     db.commit()
     db.refresh(db_user)
 
@@ -170,9 +178,17 @@ def update_user(
     if "password" in update_data:
         update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
 
+    # 调整上级时同步更新汇报关系闭包表（连同其下属整体迁移）
+    if "manager_id" in update_data and update_data["manager_id"] != user.manager_id:
+        try:
+            set_manager(db, user_id, update_data["manager_id"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     for field, value in update_data.items():
         setattr(user, field, value)
 
+    bump_data_version(db, [user_id])
     db.commit()
     db.refresh(user)
     return user
@@ -204,6 +220,7 @@ def link_user_role(
     # 创建关联
     link = UserRoleLink(user_id=user_id, role_id=role_id)
     db.add(link)
+    bump_data_version(db, [user_id])
     db.commit()
 
     return {"message": "岗位关联成功"}
@@ -226,6 +243,7 @@ def unlink_user_role(
         raise HTTPException(status_code=404, detail="未找到该关联关系")
 
     db.delete(link)
+    bump_data_version(db, [user_id])
     db.commit()
 
     return {"message": "岗位解除关联成功"}
@@ -0,0 +1,131 @@
+"""
+进程内缓存
+提供带容量上限（LRU淘汰）和可选过期时间的线程安全缓存，用于热点只读数据
+注意：缓存仅在单个进程内有效，多进程部署时各worker独立维护
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .config import settings
+
+# 已创建的缓存实例，便于统一清空（如测试环境）
+_registry: List["LRUCache"] = []
+
+
+class LRUCache:
+    """线程安全的LRU缓存，支持TTL过期，并统计命中/未命中次数"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，未命中或已过期时返回default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """删除指定缓存条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """删除所有key满足条件的条目，返回删除数量"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """清空缓存并重置命中统计"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计，用于调整容量和过期时间"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def clear_all_caches() -> None:
+    """清空所有缓存实例"""
+    for cache in _registry:
+        cache.clear()
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """所有缓存实例的命中统计"""
+    return [cache.stats() for cache in _registry]
+
+
+# 周报缓存：key 为 (user_id, data_version, year, week_number)
+# 任务、复盘写入（含延期带入、未复盘兜底）都会递增该用户的 data_version，旧key不再命中，
+# 多进程部署下其他worker也不会返回过期周报
+weekly_report_cache = LRUCache(
+    maxsize=settings.WEEKLY_REPORT_CACHE_SIZE,
+    ttl=settings.WEEKLY_REPORT_CACHE_TTL,
+    name="weekly_report"
+)
+
+
+# 用户可用任务类型缓存：key 为 (user_id, data_version)，value 为 frozenset(task_type_id)
+# 岗位关联变更、所关联岗位下的岗位/职责/任务类型停用或新增都会递增该用户的 data_version，
+# 旧key不再命中，多进程部署下其他worker也不会沿用过期的授权集合
+allowed_task_type_cache = LRUCache(
+    maxsize=settings.ALLOWED_TASK_TYPE_CACHE_SIZE,
+    ttl=settings.ALLOWED_TASK_TYPE_CACHE_TTL,
+    name="allowed_task_type"
+)
+
+
+# 统计报表缓存：key 为 (请求用户ID, ((范围内用户ID, data_version), ...), 开始日期, 结束日期)
+# 范围内任一用户的任务变更都会递增其 data_version，旧key自然不再命中，由LRU/TTL淘汰；
+# 下属范围变化同样改变key，多进程部署下也不会读到其他worker写入后的过期结果
+report_cache = LRUCache(
+    maxsize=settings.REPORT_CACHE_SIZE,
+    ttl=settings.REPORT_CACHE_TTL,
+    name="report"
+)
@@ -17,6 +17,22 @@ class Settings(BaseSettings):
 
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./weekly_plan.db"
+    DB_POOL_SIZE: int = 10  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 超出常驻连接数后允许临时创建的连接数
+    DB_POOL_TIMEOUT: int = 30  # 连接池耗尽时等待空闲连接的最长时间（秒）
+    DB_POOL_RECYCLE: int = 1800  # 连接最长复用时间（秒），-1 为不回收
+    DB_POOL_PRE_PING: bool = True  # 取出连接前先探测，丢弃数据库重启/主备切换后失效的连接
+    DB_STATEMENT_TIMEOUT: int = 30000  # 单条语句超时（毫秒，PostgreSQL），0 为不限制
+
+    # SQLite 文件库连接参数（每个新连接执行 PRAGMA；内存库不适用）
+    SQLITE_PRAGMAS_ENABLED: bool = True  # 是否启用以下 PRAGMA
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL 模式下读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 下 NORMAL 只在检查点时 fsync
+    SQLITE_BUSY_TIMEOUT: int = 5000  # 等待写锁的最长时间（毫秒）
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取的最大字节数
+    SQLITE_CACHE_SIZE: int = -65536  # 页缓存大小，负数表示 KiB
+    SQLITE_TEMP_STORE: str = "MEMORY"  # 临时表和索引放在内存中
+    SQLITE_OPTIMIZE_INTERVAL: int = 3600  # 定期执行 PRAGMA optimize 的间隔（秒），0 为不执行
 
     # 安全配置
     SECRET_KEY: str
@@ -37,6 +53,29 @@ class Settings(BaseSettings):
     # 时区配置
     TIMEZONE: str = "Asia/Shanghai"
     
+    # 缓存配置
+    WEEKLY_REPORT_CACHE_SIZE: int = 2048  # 周报缓存条目上限
+    WEEKLY_REPORT_CACHE_TTL: int = 600  # 周报缓存过期时间（秒）
+    ALLOWED_TASK_TYPE_CACHE_SIZE: int = 4096  # 用户可用任务类型缓存条目上限
+    ALLOWED_TASK_TYPE_CACHE_TTL: int = 600  # 用户可用任务类型缓存过期时间（秒）
+    REPORT_CACHE_SIZE: int = 256  # 统计报表缓存条目上限
+    REPORT_CACHE_TTL: int = 900  # 统计报表缓存过期时间（秒）
+
+    # 报表导出
+    REPORT_EXPORT_FETCH_SIZE: int = 1000  # 任务明细每批从游标读取的行数
+
+    # 全员未复盘兜底定时任务
+    REVIEW_FALLBACK_JOB_ENABLED: bool = True  # 是否在应用内自动调度
+    REVIEW_FALLBACK_CHUNK_SIZE: int = 200  # 每批处理的用户数（每批一个事务）
+    REVIEW_FALLBACK_GRACE_HOURS: int = 2  # 周结束后延迟多少小时执行
+    REVIEW_FALLBACK_CHECK_INTERVAL: int = 600  # 调度检查间隔（秒）
+
+    # 冷热数据归档
+    ARCHIVE_JOB_ENABLED: bool = True  # 是否在应用内自动调度
+    ARCHIVE_HOT_WEEKS: int = 8  # 热表保留的最近周数（含本周），更早的周移入归档表
+    ARCHIVE_BATCH_SIZE: int = 1000  # 每批移动的任务数（每批一个事务）
+    ARCHIVE_CHECK_INTERVAL: int = 3600  # 调度检查间隔（秒）
+
     # 测试模式
     TESTING: bool = False
 
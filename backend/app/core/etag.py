@@ -0,0 +1,46 @@
+"""
+ETag条件请求工具
+根据轻量的版本戳生成弱ETag，请求携带匹配的 If-None-Match 时直接返回304
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# 允许浏览器缓存，但每次使用前必须携带ETag重新验证
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """由版本戳各组成部分生成弱ETag"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """判断请求的 If-None-Match 是否与当前ETag匹配（弱比较）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate == etag or candidate == opaque:
+            return True
+        if candidate.startswith("W/") and candidate[2:] == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """构造304响应"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """在正常响应上附加ETag"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -1,16 +1,53 @@
 """
 数据库基础配置
 """
+from typing import AsyncIterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..core.config import settings
+from .pool import InstrumentedQueuePool
+from .sqlite import install_sqlite_pragmas, is_sqlite_file
+
+
+def create_db_engine(database_url: str = settings.DATABASE_URL) -> Engine:
+    """
+    按配置创建数据库引擎
+
+    连接池大小、溢出、等待超时、回收时间和取出前探测均来自 Settings；
+    PostgreSQL 通过连接参数设置 statement_timeout；SQLite 文件库每个连接执行 PRAGMA（见 db/sqlite.py），
+    SQLite 内存库只有单个连接，使用默认连接池
+    """
+    url = make_url(database_url)
+    connect_args = {}
+    if url.get_backend_name() == "sqlite":
+        connect_args["check_same_thread"] = False
+        if not is_sqlite_file(url):
+            return create_engine(url, connect_args=connect_args)
+    elif url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT > 0:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT}"
+
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if is_sqlite_file(url):
+        install_sqlite_pragmas(engine)
+    return engine
+
 
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = create_db_engine()
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -28,3 +65,72 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 异步驱动：与 DATABASE_URL 指向同一数据库
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def create_async_db_engine(database_url: str = settings.DATABASE_URL) -> AsyncEngine:
+    """
+    按配置创建异步数据库引擎（asyncpg / aiosqlite），连接池参数与同步引擎一致
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    connect_args = {}
+    if backend == "sqlite":
+        if not is_sqlite_file(url):
+            return create_async_engine(url)
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)}
+
+    engine = create_async_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if is_sqlite_file(url):
+        install_sqlite_pragmas(engine.sync_engine)
+    return engine
+
+
+# 异步引擎在首次使用时创建，只使用同步接口的进程（脚本、迁移）不加载异步驱动
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """获取异步数据库引擎"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+        _async_session_factory = async_sessionmaker(
+            _async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """关闭异步引擎的连接池（应用退出时）"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine, _async_session_factory = None, None
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    获取异步数据库会话依赖（用于 async def 路由，查询不阻塞事件循环）
+    """
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
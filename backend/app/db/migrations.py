@@ -0,0 +1,34 @@
+"""
+数据库迁移
+表结构变更统一由 Alembic 迁移脚本（backend/alembic/versions）管理，应用启动时升级到最新版本；
+引入 Alembic 之前由 create_all 建立的库没有版本记录，先标记为基线版本再升级
+"""
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from .base import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# create_all 时期的表结构对应的迁移版本
+BASELINE_REVISION = "0001"
+
+
+def upgrade_database(engine: Engine = default_engine) -> None:
+    """把数据库升级到最新迁移版本"""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "users" in tables:
+            logger.info("检测到未纳入迁移管理的数据库，标记为基线版本 %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
@@ -0,0 +1,82 @@
+"""
+数据库连接池监控
+InstrumentedQueuePool 在 QueuePool 基础上记录取连接的等待耗时与超时次数，
+pool_stats 汇总连接池当前占用情况，供管理员接口查看
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class PoolWaitStats:
+    """取连接耗时统计（含连接池耗尽时的排队等待和新建连接的耗时）"""
+
+    def __init__(self):
+        self.count = 0
+        self.timeouts = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+                "max_wait_ms": round(self.max_seconds * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录取连接等待耗时的 QueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() 或连接失效后会重建连接池，统计延续到新连接池
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """连接池当前状态：常驻/空闲/占用/溢出连接数，以及取连接耗时统计"""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.wait_stats.stats())
+    stats["status"] = pool.status()
+    return stats
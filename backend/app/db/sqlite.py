@@ -0,0 +1,85 @@
+"""
+SQLite 文件库的连接配置与维护
+每个新连接通过 connect 事件执行 PRAGMA（WAL、同步级别、忙等待、内存映射、页缓存、临时存储），
+SqliteOptimizeScheduler 定期执行 PRAGMA optimize，让查询规划器使用最新的统计信息
+"""
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_sqlite_file(url: URL) -> bool:
+    """是否为 SQLite 文件库（内存库只有单个连接，不适用连接池参数和 PRAGMA）"""
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas() -> List[Tuple[str, object]]:
+    """每个新连接执行的 PRAGMA 及取值"""
+    return [
+        ("journal_mode", settings.SQLITE_JOURNAL_MODE),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS),
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("cache_size", settings.SQLITE_CACHE_SIZE),
+        ("temp_store", settings.SQLITE_TEMP_STORE),
+    ]
+
+
+def _apply_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine: Engine) -> None:
+    """为引擎注册 connect 事件（异步引擎传入 async_engine.sync_engine）"""
+    if settings.SQLITE_PRAGMAS_ENABLED:
+        event.listen(engine, "connect", _apply_pragmas)
+
+
+class SqliteOptimizeScheduler:
+    """应用内调度器：定期执行 PRAGMA optimize"""
+
+    def __init__(self, engine: Engine, interval: Optional[int] = None):
+        self.engine = engine
+        self.interval = interval or settings.SQLITE_OPTIMIZE_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sqlite-optimize", daemon=True)
+        self._thread.start()
+        logger.info("SQLite PRAGMA optimize 调度器已启动")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> bool:
+        try:
+            with self.engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA optimize")
+            return True
+        except Exception as e:
+            logger.error(f"PRAGMA optimize 执行失败: {e}", exc_info=True)
+            return False
+
+    def _loop(self) -> None:
+        # 启动后先等待一个间隔，统计信息基于运行期间的查询
+        while not self._stop.wait(self.interval):
+            self.run_once()
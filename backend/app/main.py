@@ -7,26 +7,55 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from slowapi.errors import RateLimitExceeded
+from contextlib import asynccontextmanager
 import logging
 
 from .core.config import settings
 from .core.logging_config import setup_logging
 from .core.rate_limit import limiter, rate_limit_exceeded_handler
-from .db.base import Base, engine
+from .db.base import dispose_async_engine, engine
+from .db.sqlite import SqliteOptimizeScheduler, is_sqlite_file
+from .db.migrations import upgrade_database
 from .api.endpoints import auth, users, roles, tasks, dashboard, ai_analysis
+from .services.archive_service import ArchiveScheduler
+from .services.review_fallback_job import ReviewFallbackScheduler
 
 # 初始化日志系统
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+# 后台任务：全员未复盘兜底（测试模式下不启动）
+review_fallback_scheduler = ReviewFallbackScheduler()
+# 后台任务：冷热数据归档
+archive_scheduler = ArchiveScheduler()
+# 后台任务：SQLite 文件库定期 PRAGMA optimize
+sqlite_optimize_scheduler = SqliteOptimizeScheduler(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：升级数据库结构，启动/停止后台定时任务"""
+    if not settings.TESTING:
+        upgrade_database()
+    if settings.REVIEW_FALLBACK_JOB_ENABLED and not settings.TESTING:
+        review_fallback_scheduler.start()
+    if settings.ARCHIVE_JOB_ENABLED and not settings.TESTING:
+        archive_scheduler.start()
+    if is_sqlite_file(engine.url) and settings.SQLITE_OPTIMIZE_INTERVAL > 0 and not settings.TESTING:
+        sqlite_optimize_scheduler.start()
+    yield
+    review_fallback_scheduler.stop()
+    archive_scheduler.stop()
+    sqlite_optimize_scheduler.stop()
+    await dispose_async_engine()
+
 
 # 创建FastAPI应用
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="岗责驱动的周工作计划管理系统 API",
+    lifespan=lifespan,
 )
 
 # 添加限流器到app state（测试模式下禁用）
@@ -40,6 +69,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
 
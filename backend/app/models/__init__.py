@@ -1,18 +1,27 @@
 """
 数据模型模块
 """
-from .user import User, Department
+from .user import User, Department, UserHierarchy
 from .role import Role, Responsibility, TaskType, UserRoleLink
-from .task import WeeklyTask, TaskReview, ReportComment
+from .task import (
+    WeeklyTask, TaskReview, WeeklyTaskArchive, TaskReviewArchive, ReportComment, ReviewFallbackRun, WeeklyUserStats
+)
+from .llm_config import LLMConfig
 
 __all__ = [
     "User",
     "Department",
+    "UserHierarchy",
     "Role",
     "Responsibility",
     "TaskType",
     "UserRoleLink",
     "WeeklyTask",
     "TaskReview",
+    "WeeklyTaskArchive",
+    "TaskReviewArchive",
     "ReportComment",
+    "ReviewFallbackRun",
+    "WeeklyUserStats",
+    "LLMConfig",
 ]
@@ -1,7 +1,7 @@
 """
 岗位职责模型
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Table
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.base import Base
@@ -10,6 +10,10 @@ from ..db.base import Base
 class UserRoleLink(Base):
     """用户-岗位关联表 - REQ-1.3 (多对多)"""
     __tablename__ = "user_role_links"
+    __table_args__ = (
+        Index('uq_user_role_link', 'user_id', 'role_id', unique=True),  # 一个用户同一岗位只关联一次
+        Index('idx_role_user', 'role_id', 'user_id'),  # 按岗位查用户
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,7 +1,9 @@
 """
 任务和复盘模型
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Enum as SQLEnum, Index
+from sqlalchemy import (
+    Column, Computed, Integer, String, Boolean, ForeignKey, DateTime, Text, Float, Enum as SQLEnum, Index, UniqueConstraint
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum
@@ -30,23 +32,17 @@ class FollowUpAction(str, Enum):
     CANCEL = "cancel"  # 取消任务
 
 
-class WeeklyTask(Base):
-    """周计划任务表 - REQ-3.1, REQ-3.3 - 优化版：增加时间属性，强制岗责关联"""
-    __tablename__ = "weekly_tasks"
-    __table_args__ = (
-        # 复合索引优化常见查询
-        Index('idx_user_week', 'user_id', 'year', 'week_number'),  # 按用户和周次查询
-        Index('idx_status_key', 'status', 'is_key_task'),  # 按状态和重点任务过滤
-        Index('idx_user_status', 'user_id', 'status'),  # 按用户和状态查询
-        Index('idx_planned_time', 'planned_start_time', 'planned_end_time'),  # 按时间查询
-    )
+class WeeklyTaskColumns:
+    """周计划任务的列定义，热表 weekly_tasks 与归档表 weekly_tasks_archive 共用"""
 
     id = Column(Integer, primary_key=True, index=True)
 
     # 基本信息
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True, comment="所属用户ID")
-    week_number = Column(Integer, nullable=False, index=True, comment="周次（如：202447）")
-    year = Column(Integer, nullable=False, comment="年份")
+    week_number = Column(Integer, nullable=False, index=True, comment="ISO周次（1-53）")
+    year = Column(Integer, nullable=False, comment="ISO年份")
+    # 周键 year*100+week_number（如：202447），由数据库按年份和周次生成，任何写入路径都会同步
+    iso_week_key = Column(Integer, Computed("year * 100 + week_number", persisted=True), comment="ISO周键")
 
     title = Column(String(500), nullable=False, comment="任务标题")
     description = Column(Text, comment="任务详细描述")
@@ -98,23 +94,44 @@ class WeeklyTask(Base):
     is_delayed_from_previous = Column(Boolean, default=False, comment="是否为上周延期任务")
     original_week = Column(Integer, nullable=True, comment="原始周次（延期任务）")
 
+    # 软删除
+    is_deleted = Column(Boolean, default=False, nullable=False, comment="是否删除（软删除）")
+
+    # 增量同步：变更所在事务中所属用户的 data_version；为空表示待在提交前盖上序号
+    change_seq = Column(Integer, nullable=True, comment="变更序号")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True, comment="完成时间")
 
+
+class WeeklyTask(WeeklyTaskColumns, Base):
+    """周计划任务表 - REQ-3.1, REQ-3.3 - 优化版：增加时间属性，强制岗责关联"""
+    __tablename__ = "weekly_tasks"
+    __table_args__ = (
+        # 复合索引优化常见查询
+        Index('idx_user_week', 'user_id', 'year', 'week_number'),  # 按用户和周次查询
+        Index('idx_status_key', 'status', 'is_key_task'),  # 按状态和重点任务过滤
+        Index('idx_user_status', 'user_id', 'status'),  # 按用户和状态查询
+        Index('idx_planned_time', 'planned_start_time', 'planned_end_time'),  # 按时间查询
+        Index('idx_user_key_created', 'user_id', 'is_key_task', 'created_at', 'id'),  # 我的任务游标分页
+        Index('idx_user_change_seq', 'user_id', 'change_seq'),  # 增量同步
+        Index('idx_user_planned_start', 'user_id', 'planned_start_time'),  # 报表按用户和时间区间扫描
+        Index('idx_user_iso_week', 'user_id', 'iso_week_key'),  # 按用户和周键（含跨年区间）查询
+        {"sqlite_autoincrement": True},  # 归档后不复用已移走的ID
+    )
+
     # 关系
-    user = relationship("User", back_populates="weekly_tasks", foreign_keys=[user_id])
-    assigner = relationship("User", back_populates="assigned_tasks", foreign_keys=[assigned_by_manager_id])
+    user = relationship("User", back_populates="weekly_tasks", foreign_keys="WeeklyTask.user_id")
+    assigner = relationship("User", back_populates="assigned_tasks", foreign_keys="WeeklyTask.assigned_by_manager_id")
     task_type = relationship("TaskType", back_populates="weekly_tasks")
     review = relationship("TaskReview", back_populates="task", uselist=False)
 
 
-class TaskReview(Base):
-    """任务复盘表 - REQ-4.1 ~ REQ-4.4"""
-    __tablename__ = "task_reviews"
+class TaskReviewColumns:
+    """复盘的列定义（不含 task_id），热表 task_reviews 与归档表 task_reviews_archive 共用"""
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("weekly_tasks.id"), nullable=False, unique=True, comment="任务ID")
 
     # 复盘信息
     is_completed = Column(Boolean, nullable=False, comment="是否完成")
@@ -131,13 +148,52 @@ class TaskReview(Base):
     notes = Column(Text, comment="复盘备注")
     reviewed_at = Column(DateTime(timezone=True), server_default=func.now(), comment="复盘时间")
 
+
+class TaskReview(TaskReviewColumns, Base):
+    """任务复盘表 - REQ-4.1 ~ REQ-4.4"""
+    __tablename__ = "task_reviews"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    task_id = Column(Integer, ForeignKey("weekly_tasks.id"), nullable=False, unique=True, comment="任务ID")
+
     # 关系
     task = relationship("WeeklyTask", back_populates="review")
 
 
+class WeeklyTaskArchive(WeeklyTaskColumns, Base):
+    """
+    周计划任务归档表：超出热数据窗口的已结束周由归档任务整批移入，保留原任务ID，只读
+    只建按周键和计划时间查询所需的索引
+    """
+    __tablename__ = "weekly_tasks_archive"
+    __table_args__ = (
+        Index('idx_archive_user_iso_week', 'user_id', 'iso_week_key'),  # 按用户和周键查询
+        Index('idx_archive_iso_week', 'iso_week_key'),  # 归档水位（最大周键）
+        Index('idx_archive_user_planned_start', 'user_id', 'planned_start_time'),  # 报表按时间区间扫描
+    )
+
+    # 关系（只读）
+    user = relationship("User", foreign_keys="WeeklyTaskArchive.user_id", viewonly=True)
+    assigner = relationship("User", foreign_keys="WeeklyTaskArchive.assigned_by_manager_id", viewonly=True)
+    task_type = relationship("TaskType", viewonly=True)
+    review = relationship("TaskReviewArchive", back_populates="task", uselist=False)
+
+
+class TaskReviewArchive(TaskReviewColumns, Base):
+    """任务复盘归档表：随所属任务一起归档，保留原复盘ID"""
+    __tablename__ = "task_reviews_archive"
+
+    task_id = Column(Integer, ForeignKey("weekly_tasks_archive.id"), nullable=False, unique=True, comment="任务ID")
+
+    task = relationship("WeeklyTaskArchive", back_populates="review")
+
+
 class ReportComment(Base):
     """周报评论表 - REQ-5.3"""
     __tablename__ = "report_comments"
+    __table_args__ = (
+        Index('idx_comment_user_iso_week_manager', 'user_id', 'iso_week_key', 'manager_id'),  # 团队视图逐人查评论
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -145,6 +201,8 @@ class ReportComment(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="被评论者ID")
     week_number = Column(Integer, nullable=False, comment="周次")
     year = Column(Integer, nullable=False, comment="年份")
+    # ISO 周键（year*100+week_number，存储生成列），按周过滤用单列比较
+    iso_week_key = Column(Integer, Computed("year * 100 + week_number", persisted=True), comment="ISO周键")
 
     # 评论者（管理者）
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="评论者（管理者）ID")
@@ -160,3 +218,64 @@ class ReportComment(Base):
 
     # 关系
     manager = relationship("User", back_populates="comments", foreign_keys=[manager_id])
+
+
+class ReviewFallbackRun(Base):
+    """全员未复盘兜底批处理记录（按周一条，保存断点以支持中断后续跑）"""
+    __tablename__ = "review_fallback_runs"
+    __table_args__ = (
+        UniqueConstraint('year', 'week_number', name='uq_review_fallback_run_week'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False, comment="处理的年份")
+    week_number = Column(Integer, nullable=False, comment="处理的周次")
+
+    status = Column(String(20), nullable=False, default="running", comment="状态: running/completed/failed")
+    last_user_id = Column(Integer, nullable=False, default=0, comment="断点：已处理的最大用户ID")
+
+    # 进度与吞吐计数
+    total_users = Column(Integer, nullable=False, default=0, comment="待处理用户总数")
+    processed_users = Column(Integer, nullable=False, default=0, comment="已处理用户数")
+    processed_chunks = Column(Integer, nullable=False, default=0, comment="已提交批次数")
+    created_tasks = Column(Integer, nullable=False, default=0, comment="滚动到下周的新任务数")
+    elapsed_seconds = Column(Float, nullable=False, default=0.0, comment="累计处理耗时（秒）")
+    error = Column(Text, nullable=True, comment="最近一次失败原因")
+
+    started_at = Column(DateTime(timezone=True), nullable=True, comment="开始时间")
+    updated_at = Column(DateTime(timezone=True), nullable=True, comment="最近一次批次提交时间")
+    finished_at = Column(DateTime(timezone=True), nullable=True, comment="完成时间")
+
+
+class WeeklyUserStats(Base):
+    """用户-周统计汇总表：随任务写入在同一事务内刷新，报表类查询直接读取"""
+    __tablename__ = "weekly_user_stats"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'year', 'week_number', name='uq_weekly_user_stats'),
+        Index('idx_weekly_stats_iso_week', 'iso_week_key', 'user_id'),  # 团队按周取成员、AI分析按周键区间汇总
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="用户ID")
+    year = Column(Integer, nullable=False, comment="年份")
+    week_number = Column(Integer, nullable=False, comment="周次")
+    iso_week_key = Column(Integer, Computed("year * 100 + week_number", persisted=True), comment="ISO周键")
+
+    # 按状态计数（不含已删除任务）
+    total_tasks = Column(Integer, nullable=False, default=0, comment="任务总数")
+    todo_tasks = Column(Integer, nullable=False, default=0, comment="待办任务数")
+    in_progress_tasks = Column(Integer, nullable=False, default=0, comment="进行中任务数")
+    completed_tasks = Column(Integer, nullable=False, default=0, comment="已完成任务数")
+    delayed_tasks = Column(Integer, nullable=False, default=0, comment="延期任务数")
+    cancelled_tasks = Column(Integer, nullable=False, default=0, comment="已取消任务数")
+
+    # 重点任务与复盘
+    key_tasks = Column(Integer, nullable=False, default=0, comment="重点任务数")
+    key_completed_tasks = Column(Integer, nullable=False, default=0, comment="已完成重点任务数")
+    reviewed_tasks = Column(Integer, nullable=False, default=0, comment="已复盘任务数")
+
+    # 时长合计（分钟）
+    planned_duration_total = Column(Integer, nullable=False, default=0, comment="计划时长合计")
+    actual_duration_total = Column(Integer, nullable=False, default=0, comment="实际时长合计")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,7 @@
 """
 用户和组织架构模型
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.base import Base
@@ -38,13 +38,17 @@ class User(Base):
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
 
     # 汇报关系 - REQ-1.4
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, comment="直属上级ID")
+    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True, comment="直属上级ID")
 
     # 用户角色
     user_type = Column(String(20), default="employee", comment="用户类型: admin/manager/employee")
 
     # 状态
     is_active = Column(Boolean, default=True, comment="是否激活")
+
+    # 数据版本：该用户的任务、复盘、评论、岗位等数据每次写入递增，用于ETag条件请求
+    data_version = Column(Integer, nullable=False, default=0, server_default="0", comment="数据版本号")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -59,3 +63,15 @@ class User(Base):
     weekly_tasks = relationship("WeeklyTask", back_populates="user", foreign_keys="WeeklyTask.user_id")
     assigned_tasks = relationship("WeeklyTask", back_populates="assigner", foreign_keys="WeeklyTask.assigned_by_manager_id")
     comments = relationship("ReportComment", back_populates="manager", foreign_keys="ReportComment.manager_id")
+
+
+class UserHierarchy(Base):
+    """汇报关系闭包表：记录每个上级（含跨级）与下属之间的层级距离，直属为1，不含自身"""
+    __tablename__ = "user_hierarchy"
+    __table_args__ = (
+        Index('idx_hierarchy_descendant', 'descendant_id', 'depth'),  # 查询某用户的上级链
+    )
+
+    ancestor_id = Column(Integer, ForeignKey("users.id"), primary_key=True, comment="上级用户ID")
+    descendant_id = Column(Integer, ForeignKey("users.id"), primary_key=True, comment="下属用户ID")
+    depth = Column(Integer, nullable=False, comment="层级距离")
@@ -1,9 +1,10 @@
 """
 任务和复盘Schemas
 """
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import Optional, List
 from datetime import datetime
+from enum import Enum
 from ..models.task import TaskStatus, TaskSource, FollowUpAction
 
 
@@ -66,6 +67,14 @@ class WeeklyTask(WeeklyTaskBase):
     actual_duration: Optional[int] = None
 
 
+class TaskChanges(BaseModel):
+    """任务增量同步结果"""
+    cursor: int
+    reset: bool = False
+    changes: List[WeeklyTask]
+    deleted_ids: List[int]
+
+
 class CarryOverRequest(BaseModel):
     """延期任务带入请求"""
     task_ids: List[int]
@@ -81,6 +90,113 @@ class CarryOverResult(BaseModel):
     failed_task_ids: List[int] = []
 
 
+class WeeklyPlanSubmit(BaseModel):
+    """整周计划提交请求"""
+    tasks: List[WeeklyTaskCreate] = Field(..., min_length=1, max_length=200)
+    atomic: bool = False  # 为True时任一条目校验失败则整体拒绝
+
+
+class WeeklyPlanItemResult(BaseModel):
+    """整周计划单条结果"""
+    index: int
+    success: bool
+    task_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class WeeklyPlanResult(BaseModel):
+    """整周计划提交结果"""
+    created_count: int
+    failed_count: int
+    results: List[WeeklyPlanItemResult]
+
+
+class WeekCloneRequest(BaseModel):
+    """按周复制计划请求"""
+    source_year: int
+    source_week_number: int
+    target_year: int
+    target_week_number: int
+    only_key_tasks: bool = False  # 仅复制重点任务
+    only_responsibility: bool = False  # 仅复制来自职责的任务
+
+
+class WeekCloneResult(BaseModel):
+    """按周复制计划结果"""
+    created_count: int
+    day_offset: int  # 计划时间平移的天数
+
+
+class BulkOperation(str, Enum):
+    """批量操作类型"""
+    SET_STATUS = "set_status"  # 批量更新状态
+    SET_KEY_TASK = "set_key_task"  # 批量标记/取消重点
+    DELETE = "delete"  # 批量删除（软删除）
+
+
+class TaskBulkRequest(BaseModel):
+    """批量任务操作请求"""
+    task_ids: List[int] = Field(..., max_length=200)
+    operation: BulkOperation
+    status: Optional[TaskStatus] = None  # operation=set_status 时必填
+    is_key_task: Optional[bool] = None  # operation=set_key_task 时必填
+
+
+class TaskBulkItemResult(BaseModel):
+    """批量操作单项结果"""
+    task_id: int
+    success: bool
+    detail: Optional[str] = None
+
+
+class TaskBulkResult(BaseModel):
+    """批量任务操作结果"""
+    operation: BulkOperation
+    succeeded_count: int
+    failed_count: int
+    results: List[TaskBulkItemResult]
+
+
+class ReviewFallbackRun(BaseModel):
+    """全员未复盘兜底运行记录（含进度与吞吐）"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    year: int
+    week_number: int
+    status: str
+    last_user_id: int
+    total_users: int
+    processed_users: int
+    processed_chunks: int
+    created_tasks: int
+    elapsed_seconds: float
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        """进度百分比"""
+        if self.total_users == 0:
+            return 100.0 if self.status == "completed" else 0.0
+        return round(self.processed_users / self.total_users * 100, 1)
+
+    @computed_field
+    @property
+    def users_per_second(self) -> float:
+        """用户处理吞吐"""
+        return round(self.processed_users / self.elapsed_seconds, 2) if self.elapsed_seconds > 0 else 0.0
+
+    @computed_field
+    @property
+    def tasks_per_second(self) -> float:
+        """任务结转吞吐"""
+        return round(self.created_tasks / self.elapsed_seconds, 2) if self.elapsed_seconds > 0 else 0.0
+
+
 # TaskReview Schemas
 class TaskReviewBase(BaseModel):
     """任务复盘基础Schema"""
@@ -128,3 +244,31 @@ class ReportComment(ReportCommentBase):
     manager_id: int
     is_reviewed: bool
     created_at: datetime
+
+
+# 成员详情 Schemas - REQ-5.2
+class MemberRole(BaseModel):
+    """成员岗位"""
+    id: int
+    name: str
+
+
+class MemberInfo(BaseModel):
+    """成员基本信息"""
+    id: int
+    name: str
+    roles: List[MemberRole]
+
+
+class MemberTask(WeeklyTask):
+    """成员详情中的任务（含复盘）"""
+    review: Optional[TaskReview] = None
+
+
+class MemberDetail(BaseModel):
+    """团队成员详情响应"""
+    member: MemberInfo
+    week_number: int
+    year: int
+    tasks: List[MemberTask]
+    comments: List[ReportComment]
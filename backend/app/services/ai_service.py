@@ -1,29 +1,34 @@
 """
 AI分析服务
 使用大模型API进行工作计划执行情况分析
+数据库访问使用 AsyncSession，查询期间不阻塞事件循环
 """
 import httpx
-import json
 from typing import Optional, Dict, List
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.llm_config import LLMConfig
-from app.models.task import WeeklyTask
+from app.models.task import WeeklyUserStats
+from app.services.archive_service import combined_sources
 from app.models.user import User
+from app.utils.iso_week import week_key_range
 
 
 class AIAnalysisService:
     """AI分析服务类"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_active_llm_config(self) -> Optional[LLMConfig]:
+    async def get_active_llm_config(self) -> Optional[LLMConfig]:
         """获取当前激活的大模型配置"""
-        return self.db.query(LLMConfig).filter(
+        result = await self.db.execute(select(LLMConfig).where(
             LLMConfig.is_active == True,
             LLMConfig.is_deleted == False
-        ).first()
+        ).limit(1))
+        return result.scalars().first()
 
     async def call_llm_api(self, prompt: str, system_prompt: str = None) -> str:
         """
@@ -36,7 +41,7 @@ class AIAnalysisService:
         Returns:
             模型生成的文本
         """
-        config = self.get_active_llm_config()
+        config = await self.get_active_llm_config()
         if not config:
             raise ValueError("未配置可用的大模型")
 
@@ -101,65 +106,14 @@ class AIAnalysisService:
             result = response.json()
             return result["choices"][0]["message"]["content"]
 
-    def prepare_analysis_data(
+    async def prepare_analysis_data(
         self,
         user_id: Optional[int],
         start_date: str,
         end_date: str
     ) -> Dict:
-        """
-        准备分析数据
-
-        Args:
-            user_id: 用户ID，None表示分析所有用户
-            start_date: 开始日期
-            end_date: 结束日期
-
-        Returns:
-            包含任务数据和统计信息的字典
-        """
-        # 查询任务 - 明确指定join条件
-        query = self.db.query(WeeklyTask).join(User, WeeklyTask.user_id == User.id)
-
-        if user_id:
-            query = query.filter(WeeklyTask.user_id == user_id)
-
-        # 根据日期筛选（简化处理，这里可以改进）
-        tasks = query.all()
-
-        # 统计数据
-        total_tasks = len(tasks)
-        completed_tasks = len([t for t in tasks if t.status == "completed"])
-        key_tasks = len([t for t in tasks if t.is_key_task])
-        key_completed = len([t for t in tasks if t.is_key_task and t.status == "completed"])
-        delayed_tasks = len([t for t in tasks if t.status == "delayed"])
-
-        # 任务详情
-        task_details = []
-        for task in tasks:
-            task_details.append({
-                "title": task.title,
-                "status": task.status,
-                "is_key_task": task.is_key_task,
-                "week": f"{task.year}年第{task.week_number}周",
-                "description": task.description or ""
-            })
-
-        return {
-            "user_name": tasks[0].user.full_name if tasks and user_id else "团队全体",
-            "period": f"{start_date} 至 {end_date}",
-            "statistics": {
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-                "completion_rate": round(completed_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0,
-                "key_tasks": key_tasks,
-                "key_completed": key_completed,
-                "key_completion_rate": round(key_completed / key_tasks * 100, 1) if key_tasks > 0 else 0,
-                "delayed_tasks": delayed_tasks,
-                "delay_rate": round(delayed_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0
-            },
-            "task_details": task_details[:50]  # 限制任务数量，避免token过多
-        }
+        """在异步会话上汇总指定员工和日期区间的统计数据与任务详情"""
+        return await self.db.run_sync(prepare_analysis_data, user_id, start_date, end_date)
 
     async def analyze_work_performance(
         self,
@@ -181,7 +135,7 @@ class AIAnalysisService:
             分析结果字典
         """
         # 准备数据
-        data = self.prepare_analysis_data(user_id, start_date, end_date)
+        data = await self.prepare_analysis_data(user_id, start_date, end_date)
 
         if data["statistics"]["total_tasks"] == 0:
             return {
@@ -303,3 +257,74 @@ class AIAnalysisService:
             analysis += "- ⚠️ 延期率较高，建议优化时间管理和任务规划\n"
 
         return analysis
+
+
+def prepare_analysis_data(
+    db: Session,
+    user_id: Optional[int],
+    start_date: str,
+    end_date: str
+) -> Dict:
+    """
+    准备分析数据（同步会话；异步会话通过 AsyncSession.run_sync 调用）
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID，None表示分析所有用户
+        start_date: 开始日期
+        end_date: 结束日期
+
+    Returns:
+        包含任务数据和统计信息的字典
+    """
+    # 日期区间换算为周键区间，跨年也是一次索引范围扫描
+    start_key, end_key = week_key_range(start_date, end_date)
+
+    # 统计数据取自用户-周汇总表（随任务写入维护，含已归档的周），不扫描任务明细
+    stats_query = db.query(*[
+        func.coalesce(func.sum(getattr(WeeklyUserStats, name)), 0)
+        for name in ("total_tasks", "completed_tasks", "key_tasks", "key_completed_tasks", "delayed_tasks")
+    ]).filter(
+        WeeklyUserStats.iso_week_key.between(start_key, end_key)
+    )
+    if user_id:
+        stats_query = stats_query.filter(WeeklyUserStats.user_id == user_id)
+    total_tasks, completed_tasks, key_tasks, key_completed, delayed_tasks = [int(v) for v in stats_query.one()]
+
+    # 任务详情只取提示词需要的前 50 条（区间早于归档水位时合并读取归档表）
+    Task, _ = combined_sources(db, start_key)
+    query = db.query(Task).join(User, Task.user_id == User.id).filter(
+        Task.iso_week_key.between(start_key, end_key),
+        Task.is_deleted == False
+    )
+
+    if user_id:
+        query = query.filter(Task.user_id == user_id)
+
+    tasks = query.order_by(Task.iso_week_key, Task.id).limit(50).all()
+
+    task_details = []
+    for task in tasks:
+        task_details.append({
+            "title": task.title,
+            "status": task.status,
+            "is_key_task": task.is_key_task,
+            "week": f"{task.year}年第{task.week_number}周",
+            "description": task.description or ""
+        })
+
+    return {
+        "user_name": tasks[0].user.full_name if tasks and user_id else "团队全体",
+        "period": f"{start_date} 至 {end_date}",
+        "statistics": {
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "completion_rate": round(completed_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0,
+            "key_tasks": key_tasks,
+            "key_completed": key_completed,
+            "key_completion_rate": round(key_completed / key_tasks * 100, 1) if key_tasks > 0 else 0,
+            "delayed_tasks": delayed_tasks,
+            "delay_rate": round(delayed_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0
+        },
+        "task_details": task_details
+    }
@@ -0,0 +1,160 @@
+"""
+冷热数据归档
+热数据窗口（最近 ARCHIVE_HOT_WEEKS 周）之前的任务连同复盘按批移入归档表，保留原ID：
+每批一个事务，INSERT ... SELECT 写入归档表后从热表删除；
+读取时以归档水位（归档表中最大的周键）判断是否需要同时读取归档表，
+不早于水位的周只读热表，更早的周读取热表与归档表的并集（归档进行中的周两边都可能有数据）
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.task import TaskReview, TaskReviewArchive, WeeklyTask, WeeklyTaskArchive
+from app.utils.iso_week import week_key_of
+
+logger = logging.getLogger(__name__)
+
+# 归档时复制的列（周键为生成列，由归档表自行计算）
+_TASK_COLUMNS = [column.name for column in WeeklyTask.__table__.columns if column.computed is None]
+_REVIEW_COLUMNS = [column.name for column in TaskReview.__table__.columns]
+
+
+def archive_cutoff_key(now: Optional[datetime] = None) -> int:
+    """热数据窗口第一周的周键，更早的周可以归档"""
+    now = now or datetime.now(pytz.timezone(settings.TIMEZONE))
+    return week_key_of(now - timedelta(weeks=settings.ARCHIVE_HOT_WEEKS - 1))
+
+
+def archived_through(db: Session) -> Optional[int]:
+    """归档水位：归档表中最大的周键，尚未归档过时为 None"""
+    return db.query(func.max(WeeklyTaskArchive.iso_week_key)).scalar()
+
+
+def week_sources(db: Session, from_key: int) -> List[Tuple[type, type]]:
+    """
+    读取周键 >= from_key 的任务时需要查询的 (任务, 复盘) 模型：
+    热表，以及 from_key 不晚于归档水位时的归档表
+    """
+    sources = [(WeeklyTask, TaskReview)]
+    watermark = archived_through(db)
+    if watermark is not None and from_key <= watermark:
+        sources.append((WeeklyTaskArchive, TaskReviewArchive))
+    return sources
+
+
+def combined_sources(db: Session, from_key: int):
+    """
+    同 week_sources，但合并为一对可直接用于分组/投影查询的实体：
+    不涉及归档时即 (WeeklyTask, TaskReview)，否则为热表与归档表 UNION ALL 的别名
+    """
+    sources = week_sources(db, from_key)
+    if len(sources) == 1:
+        return sources[0]
+    return (
+        _union_alias(WeeklyTask, WeeklyTaskArchive, "all_weekly_tasks"),
+        _union_alias(TaskReview, TaskReviewArchive, "all_task_reviews")
+    )
+
+
+def _union_alias(hot, archive, name: str):
+    names = [column.name for column in hot.__table__.columns]
+    union = union_all(
+        select(*[hot.__table__.c[column] for column in names]),
+        select(*[archive.__table__.c[column] for column in names])
+    ).subquery(name)
+    return aliased(hot, union, adapt_on_names=True)
+
+
+class ArchiveService:
+    """冷热数据归档服务类"""
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+
+    def archive(self, cutoff_key: int) -> int:
+        """
+        把周键小于 cutoff_key 的任务及其复盘移入归档表，按任务ID分批，每批提交一次
+
+        Returns:
+            移动的任务数
+        """
+        moved, last_id = 0, 0
+        while True:
+            task_ids = [
+                task_id for (task_id,) in self.db.query(WeeklyTask.id).filter(
+                    WeeklyTask.id > last_id,
+                    WeeklyTask.iso_week_key < cutoff_key
+                ).order_by(WeeklyTask.id).limit(self.batch_size).with_for_update()
+            ]
+            if not task_ids:
+                break
+            self._move(task_ids)
+            self.db.commit()
+            moved += len(task_ids)
+            last_id = task_ids[-1]
+        return moved
+
+    def _move(self, task_ids: List[int]) -> None:
+        self.db.execute(insert(WeeklyTaskArchive).from_select(
+            _TASK_COLUMNS,
+            select(*[WeeklyTask.__table__.c[name] for name in _TASK_COLUMNS]).where(WeeklyTask.id.in_(task_ids))
+        ))
+        self.db.execute(insert(TaskReviewArchive).from_select(
+            _REVIEW_COLUMNS,
+            select(*[TaskReview.__table__.c[name] for name in _REVIEW_COLUMNS]).where(TaskReview.task_id.in_(task_ids))
+        ))
+        self.db.execute(delete(TaskReview).where(TaskReview.task_id.in_(task_ids)))
+        self.db.execute(delete(WeeklyTask).where(WeeklyTask.id.in_(task_ids)))
+
+
+class ArchiveScheduler:
+    """应用内调度器：定期把移出热数据窗口的周归档"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, interval: Optional[int] = None):
+        self.session_factory = session_factory
+        self.interval = interval or settings.ARCHIVE_CHECK_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="archive-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("冷热数据归档调度器已启动")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> int:
+        db = self.session_factory()
+        try:
+            cutoff_key = archive_cutoff_key()
+            moved = ArchiveService(db).archive(cutoff_key)
+            if moved:
+                logger.info(f"已归档周键 {cutoff_key} 之前的任务 {moved} 条")
+            return moved
+        except Exception as e:
+            # 已提交的批次保留，下一轮从剩余任务继续
+            db.rollback()
+            logger.error(f"冷热数据归档失败: {e}", exc_info=True)
+            return 0
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
@@ -0,0 +1,181 @@
+"""
+延期任务结转服务
+以集合方式完成延期任务带入下周、未复盘兜底：
+克隆任务一次批量INSERT（支持时使用 RETURNING 取回新ID），兜底复盘记录一次批量INSERT，
+已复盘任务通过一次反连接排除
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, List, Set, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.task import WeeklyTask, TaskReview, TaskStatus, FollowUpAction
+from app.services.data_version import bump_data_version
+from app.services.weekly_stats_service import refresh_weekly_stats
+
+# 克隆任务时需要读取的源任务列
+_CLONE_COLUMNS = (
+    WeeklyTask.id,
+    WeeklyTask.user_id,
+    WeeklyTask.year,
+    WeeklyTask.week_number,
+    WeeklyTask.title,
+    WeeklyTask.description,
+    WeeklyTask.is_key_task,
+    WeeklyTask.source_type,
+    WeeklyTask.linked_task_type_id,
+    WeeklyTask.assigned_by_manager_id,
+    WeeklyTask.planned_start_time,
+    WeeklyTask.planned_end_time,
+    WeeklyTask.planned_duration,
+    WeeklyTask.status,
+)
+
+
+@dataclass
+class CarryOverOutcome:
+    """结转结果"""
+    created_task_ids: List[int] = field(default_factory=list)
+    failed_task_ids: List[int] = field(default_factory=list)
+    # 受影响的 (user_id, year, week_number)，用于缓存失效等后续处理
+    affected_weeks: Set[Tuple[int, int, int]] = field(default_factory=set)
+
+
+def next_iso_week(year: int, week_number: int) -> Tuple[int, int]:
+    """计算下一个ISO周"""
+    base = datetime.strptime(f"{year}-W{week_number}-1", "%G-W%V-%u")
+    nxt = base + timedelta(days=7)
+    return nxt.isocalendar()[0], nxt.isocalendar()[1]
+
+
+class CarryOverService:
+    """延期任务结转服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def carry_over(
+        self,
+        user_id: int,
+        task_ids: Iterable[int],
+        target_year: int,
+        target_week_number: int
+    ) -> CarryOverOutcome:
+        """将指定用户的延期任务带入目标周（不提交事务）"""
+        rows = self.db.query(*_CLONE_COLUMNS).filter(
+            WeeklyTask.id.in_(list(task_ids)),
+            WeeklyTask.user_id == user_id,
+            WeeklyTask.is_deleted == False
+        ).order_by(WeeklyTask.id).all()
+
+        outcome = CarryOverOutcome()
+        delayed = []
+        for row in rows:
+            if row.status == TaskStatus.DELAYED:
+                delayed.append(row)
+            else:
+                outcome.failed_task_ids.append(row.id)
+
+        outcome.created_task_ids = self._insert_clones(delayed, target_year, target_week_number)
+        if delayed:
+            outcome.affected_weeks.add((user_id, target_year, target_week_number))
+            bump_data_version(self.db, [user_id])
+            refresh_weekly_stats(self.db, outcome.affected_weeks)
+        return outcome
+
+    def apply_review_fallback(
+        self,
+        user_ids: Iterable[int],
+        year: int,
+        week_number: int
+    ) -> CarryOverOutcome:
+        """
+        未复盘兜底（不提交事务）：将指定用户该周未复盘且未完成的任务
+        记为“超时未复盘”、标记延期，并滚动到下一周
+        """
+        # 反连接一次性排除已有复盘记录的任务
+        rows = self.db.query(*_CLONE_COLUMNS).outerjoin(
+            TaskReview, TaskReview.task_id == WeeklyTask.id
+        ).filter(
+            WeeklyTask.user_id.in_(list(user_ids)),
+            WeeklyTask.year == year,
+            WeeklyTask.week_number == week_number,
+            WeeklyTask.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS]),
+            WeeklyTask.is_deleted == False,
+            TaskReview.id.is_(None)
+        ).order_by(WeeklyTask.id).all()
+
+        outcome = CarryOverOutcome()
+        if not rows:
+            return outcome
+
+        source_ids = [row.id for row in rows]
+        self.db.execute(insert(TaskReview), [
+            {
+                "task_id": task_id,
+                "is_completed": False,
+                "incomplete_reason": "超时未复盘",
+                "follow_up_action": FollowUpAction.DELAY_TO_NEXT_WEEK,
+                "notes": None,
+            }
+            for task_id in source_ids
+        ])
+
+        self.db.query(WeeklyTask).filter(
+            WeeklyTask.id.in_(source_ids)
+        ).update({
+            WeeklyTask.status: TaskStatus.DELAYED,
+            WeeklyTask.is_delayed_from_previous: True,
+            WeeklyTask.original_week: WeeklyTask.week_number,
+            WeeklyTask.change_seq: None,
+        }, synchronize_session=False)
+
+        next_year, next_week = next_iso_week(year, week_number)
+        outcome.created_task_ids = self._insert_clones(rows, next_year, next_week)
+        for row in rows:
+            outcome.affected_weeks.add((row.user_id, year, week_number))
+            outcome.affected_weeks.add((row.user_id, next_year, next_week))
+        bump_data_version(self.db, {row.user_id for row in rows})
+        refresh_weekly_stats(self.db, outcome.affected_weeks)
+        return outcome
+
+    def _insert_clones(self, rows, target_year: int, target_week_number: int) -> List[int]:
+        """批量插入克隆任务并按源任务顺序返回新任务ID"""
+        if not rows:
+            return []
+
+        values = [
+            {
+                "title": row.title,
+                "description": row.description,
+                "user_id": row.user_id,
+                "week_number": target_week_number,
+                "year": target_year,
+                "status": TaskStatus.TODO,
+                "is_key_task": row.is_key_task,
+                "source_type": row.source_type,
+                "linked_task_type_id": row.linked_task_type_id,
+                "assigned_by_manager_id": row.assigned_by_manager_id,
+                "planned_start_time": row.planned_start_time + timedelta(days=7),
+                "planned_end_time": row.planned_end_time + timedelta(days=7),
+                "planned_duration": row.planned_duration,
+                "is_delayed_from_previous": True,
+                "original_week": row.week_number,
+                "is_deleted": False,
+            }
+            for row in rows
+        ]
+
+        dialect = self.db.get_bind().dialect
+        if dialect.insert_executemany_returning_sort_by_parameter_order:
+            # PostgreSQL / SQLite 3.35+：单条批量INSERT ... RETURNING
+            stmt = insert(WeeklyTask).returning(WeeklyTask.id, sort_by_parameter_order=True)
+            return list(self.db.execute(stmt, values).scalars())
+
+        # 不支持批量RETURNING的数据库：由ORM合并为一次flush
+        tasks = [WeeklyTask(**value) for value in values]
+        self.db.add_all(tasks)
+        self.db.flush()
+        return [task.id for task in tasks]
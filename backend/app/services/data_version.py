@@ -0,0 +1,35 @@
+"""
+用户数据版本
+任务、复盘、评论、岗位关联等写入时在同一事务内递增相关用户的 data_version，
+读接口据此生成ETag，无需重新查询即可判断数据是否变化；
+同时把本事务新增/修改的任务（change_seq 为空）盖上新的版本号，作为增量同步的变更序号
+"""
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.task import WeeklyTask
+from app.models.user import User
+
+
+def bump_data_version(db: Session, user_ids: Iterable[int]) -> None:
+    """递增指定用户的数据版本，并为待盖序号的任务写入变更序号（不提交事务）"""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    # 先写入会话中挂起的任务新增/修改，保证下面的盖序号能覆盖到
+    db.flush()
+    # 用户行加锁递增，同一用户的写入按提交顺序获得递增的序号
+    db.query(User).filter(User.id.in_(user_ids)).update(
+        {User.data_version: User.data_version + 1},
+        synchronize_session=False
+    )
+    db.query(WeeklyTask).filter(
+        WeeklyTask.user_id.in_(user_ids),
+        WeeklyTask.change_seq.is_(None)
+    ).update({
+        WeeklyTask.change_seq: select(User.data_version).where(
+            User.id == WeeklyTask.user_id
+        ).scalar_subquery()
+    }, synchronize_session=False)
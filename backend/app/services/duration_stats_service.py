@@ -0,0 +1,162 @@
+"""
+计划/实际时长分布分析
+按任务类型、按用户统计已完成任务的实际与计划时长（分钟）：P50/P90、偏差比直方图，
+以及估算偏差比（实际合计 / 计划合计，>1 表示普遍低估）。
+计数、合计与直方图为一次分组查询；分位数在 PostgreSQL 上用 percentile_cont 在同一查询中算出，
+其他数据库一次取回范围内的 (用户, 任务类型, 计划, 实际) 列，在内存中排序插值
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import Float, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.role import TaskType
+from app.models.task import TaskStatus, WeeklyTask
+from app.models.user import User
+from app.services.report_service import report_sources, task_scope
+
+PERCENTILES = (("p50", 0.5), ("p90", 0.9))
+
+# 偏差比（实际 / 计划）直方图分桶边界，共 len + 1 个桶
+RATIO_BUCKET_EDGES = (0.5, 0.8, 1.0, 1.25, 1.5, 2.0)
+
+# 参与分位数计算的三个度量
+_MEASURES = ("planned", "actual", "ratio")
+
+
+class DurationStatsService:
+    """时长分布分析服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.use_sql_percentiles = db.get_bind().dialect.name == "postgresql"
+        self.Task = WeeklyTask
+
+    def build(self, user_ids, start_dt: datetime, end_dt: datetime) -> dict:
+        """
+        生成时长分布
+
+        Args:
+            user_ids: 统计范围内的用户ID（列表或查询）
+            start_dt, end_dt: 按计划开始时间过滤的区间
+        """
+        self.Task, _ = report_sources(self.db, start_dt)
+        scope = task_scope(user_ids, start_dt, end_dt, self.Task) + (
+            self.Task.status == TaskStatus.COMPLETED,
+            self.Task.actual_duration.isnot(None),
+            self.Task.planned_duration > 0
+        )
+
+        by_type = self._grouped(scope, self.Task.linked_task_type_id)
+        by_user = self._grouped(scope, self.Task.user_id)
+        if not self.use_sql_percentiles:
+            self._fill_percentiles(scope, by_type, by_user)
+
+        type_names = dict(self.db.query(TaskType.id, TaskType.name).filter(TaskType.id.in_(list(by_type))).all())
+        user_names = dict(self.db.query(User.id, User.full_name).filter(User.id.in_(list(by_user))).all())
+        return {
+            "ratio_bucket_edges": list(RATIO_BUCKET_EDGES),
+            "by_task_type": [
+                {"task_type_id": key, "task_type": type_names.get(key), **stats}
+                for key, stats in sorted(by_type.items())
+            ],
+            "by_user": [
+                {"user_id": key, "user_name": user_names.get(key), **stats}
+                for key, stats in sorted(by_user.items())
+            ]
+        }
+
+    def _ratio_expr(self):
+        return cast(self.Task.actual_duration, Float) / self.Task.planned_duration
+
+    def _grouped(self, scope, group_column) -> Dict[int, dict]:
+        """按一个维度分组：任务数、合计、直方图；PostgreSQL 上同时算出分位数"""
+        ratio = self._ratio_expr()
+        buckets = [
+            func.sum(case((condition, 1), else_=0))
+            for condition in _bucket_conditions(ratio)
+        ]
+        percentiles = []
+        if self.use_sql_percentiles:
+            for measure in (self.Task.planned_duration, self.Task.actual_duration, ratio):
+                for _, fraction in PERCENTILES:
+                    percentiles.append(func.percentile_cont(fraction).within_group(measure))
+
+        rows = self.db.query(
+            group_column,
+            func.count(self.Task.id),
+            func.sum(self.Task.planned_duration),
+            func.sum(self.Task.actual_duration),
+            *buckets,
+            *percentiles
+        ).filter(*scope).group_by(group_column).all()
+
+        grouped = {}
+        for row in rows:
+            key, count, planned_total, actual_total = row[:4]
+            histogram = [int(value or 0) for value in row[4:4 + len(buckets)]]
+            stats = {
+                "count": count,
+                "planned_total": int(planned_total or 0),
+                "actual_total": int(actual_total or 0),
+                "bias_ratio": round(actual_total / planned_total, 2) if planned_total else None,
+                "ratio_histogram": histogram
+            }
+            values = iter(row[4 + len(buckets):])
+            for measure in _MEASURES:
+                for name, _ in PERCENTILES:
+                    stats[f"{measure}_{name}"] = _round(next(values, None))
+            grouped[key] = stats
+        return grouped
+
+    def _fill_percentiles(self, scope, by_type: Dict[int, dict], by_user: Dict[int, dict]) -> None:
+        """无 percentile_cont 时：一次取回范围内的列，按两个维度分别排序插值"""
+        rows = self.db.query(
+            self.Task.user_id,
+            self.Task.linked_task_type_id,
+            self.Task.planned_duration,
+            self.Task.actual_duration
+        ).filter(*scope).all()
+
+        type_values: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        user_values: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for user_id, task_type_id, planned, actual in rows:
+            type_values[task_type_id].append((planned, actual))
+            user_values[user_id].append((planned, actual))
+
+        for grouped, values in ((by_type, type_values), (by_user, user_values)):
+            for key, pairs in values.items():
+                columns = {
+                    "planned": sorted(planned for planned, _ in pairs),
+                    "actual": sorted(actual for _, actual in pairs),
+                    "ratio": sorted(actual / planned for planned, actual in pairs)
+                }
+                for measure, ordered in columns.items():
+                    for name, fraction in PERCENTILES:
+                        grouped[key][f"{measure}_{name}"] = _round(_percentile_cont(ordered, fraction))
+
+
+def _bucket_conditions(ratio) -> list:
+    """直方图各桶条件：(-inf, e0), [e0, e1), ..., [e_last, +inf)"""
+    edges = RATIO_BUCKET_EDGES
+    conditions = [ratio < edges[0]]
+    for low, high in zip(edges, edges[1:]):
+        conditions.append((ratio >= low) & (ratio < high))
+    conditions.append(ratio >= edges[-1])
+    return conditions
+
+
+def _percentile_cont(ordered: Sequence[float], fraction: float):
+    """与 SQL percentile_cont 一致的线性插值分位数（输入需已排序）"""
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _round(value):
+    return round(float(value), 2) if value is not None else None
@@ -0,0 +1,125 @@
+"""
+汇报关系层级服务
+维护 user_hierarchy 闭包表（上级、下属、层级距离），
+“X 是否在 Y 的组织内”为一次主键查找，下属树查询为一次连接；
+闭包表随用户创建、调整上级时在同一事务内更新，历史数据通过递归CTE回填
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.user import User, UserHierarchy
+
+# 递归回填的层级上限，防止 manager_id 数据异常形成环时无限递归
+MAX_HIERARCHY_DEPTH = 32
+
+# 团队视图/报表的下属范围
+DEPTH_DIRECT = "direct"
+DEPTH_ALL = "all"
+
+
+def is_subordinate(db: Session, manager_id: int, user_id: int) -> bool:
+    """user_id 是否为 manager_id 的下属（含跨级）"""
+    return db.query(
+        select(UserHierarchy.depth).where(
+            UserHierarchy.ancestor_id == manager_id,
+            UserHierarchy.descendant_id == user_id
+        ).exists()
+    ).scalar()
+
+
+def _descendants(db: Session, user_id: int) -> List[Tuple[int, int]]:
+    return db.query(UserHierarchy.descendant_id, UserHierarchy.depth).filter(
+        UserHierarchy.ancestor_id == user_id
+    ).all()
+
+
+def _ancestors(db: Session, user_id: int) -> List[Tuple[int, int]]:
+    return db.query(UserHierarchy.ancestor_id, UserHierarchy.depth).filter(
+        UserHierarchy.descendant_id == user_id
+    ).all()
+
+
+def set_manager(db: Session, user_id: int, manager_id: Optional[int]) -> None:
+    """
+    将用户（连同其全部下属）挂到新的上级之下，更新闭包表（不提交事务）
+
+    Raises:
+        ValueError: 新上级是该用户本人或其下属（会形成环）
+    """
+    subtree = [(user_id, 0)] + _descendants(db, user_id)
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+    if manager_id is not None and manager_id in subtree_ids:
+        raise ValueError("不能将上级设置为本人或其下属")
+
+    # 断开子树与原上级链的关联，子树内部的关系保持不变
+    db.execute(delete(UserHierarchy).where(
+        UserHierarchy.descendant_id.in_(subtree_ids),
+        UserHierarchy.ancestor_id.notin_(subtree_ids)
+    ))
+    if manager_id is None:
+        return
+
+    # 新上级及其上级链 × 子树
+    ancestors = [(manager_id, 1)] + [(ancestor_id, depth + 1) for ancestor_id, depth in _ancestors(db, manager_id)]
+    db.execute(insert(UserHierarchy), [
+        {"ancestor_id": ancestor_id, "descendant_id": descendant_id, "depth": up + down}
+        for ancestor_id, up in ancestors
+        for descendant_id, down in subtree
+    ])
+
+
+def rebuild_user_hierarchy(db: Session) -> int:
+    """按 users.manager_id 递归重建闭包表，返回关系行数（不提交事务）"""
+    chain = select(
+        User.manager_id.label("ancestor_id"),
+        User.id.label("descendant_id"),
+        literal(1).label("depth")
+    ).where(
+        User.manager_id.isnot(None)
+    ).cte("manager_chain", recursive=True)
+
+    parent = aliased(User)
+    chain = chain.union_all(
+        select(parent.manager_id, chain.c.descendant_id, chain.c.depth + 1).where(
+            parent.id == chain.c.ancestor_id,
+            parent.manager_id.isnot(None),
+            chain.c.depth < MAX_HIERARCHY_DEPTH
+        )
+    )
+
+    db.execute(delete(UserHierarchy))
+    db.execute(insert(UserHierarchy).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(chain.c.ancestor_id, chain.c.descendant_id, func.min(chain.c.depth)).where(
+            chain.c.ancestor_id != chain.c.descendant_id
+        ).group_by(chain.c.ancestor_id, chain.c.descendant_id)
+    ))
+    return db.query(func.count()).select_from(UserHierarchy).scalar()
+
+
+def subordinate_tree(manager_id: int):
+    """
+    管理者的全部下属（不含本人），基于闭包表的一次连接
+
+    列：
+        user_id: 下属用户ID
+        team_id: 所属子团队，即该下属所在分支的直属下属ID（直属下属的 team_id 为自身）
+        depth: 与管理者相隔的层级，直属下属为1
+    """
+    member = aliased(UserHierarchy)
+    # 距该下属 depth-1 层的上级恰好是管理者的某位直属下属
+    leader = aliased(UserHierarchy)
+    return select(
+        member.descendant_id.label("user_id"),
+        func.coalesce(leader.ancestor_id, member.descendant_id).label("team_id"),
+        member.depth.label("depth")
+    ).outerjoin(
+        leader, and_(
+            leader.descendant_id == member.descendant_id,
+            leader.depth == member.depth - 1
+        )
+    ).where(
+        member.ancestor_id == manager_id
+    ).subquery("subordinate_tree")
@@ -0,0 +1,142 @@
+"""
+统计报表导出
+数据概要、任务类型统计、团队绩效三个工作表取自 ReportService 的分组结果；
+任务明细工作表通过服务端游标分批读取 weekly_tasks，边读边写，导出行数不影响内存占用
+"""
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.role import TaskType
+from app.models.task import TaskStatus
+from app.models.user import User
+from app.services.report_service import report_sources, task_scope
+from app.utils.table_stream import Sheet, stream_csv, stream_xlsx
+
+EXPORT_FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", stream_xlsx),
+    "csv": ("text/csv; charset=utf-8", stream_csv),
+}
+
+_STATUS_LABELS = {
+    TaskStatus.TODO: "待办",
+    TaskStatus.IN_PROGRESS: "进行中",
+    TaskStatus.COMPLETED: "已完成",
+    TaskStatus.DELAYED: "已延期",
+    TaskStatus.CANCELLED: "已取消",
+}
+
+
+class ReportExportService:
+    """统计报表导出服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sheets(
+        self,
+        report: dict,
+        user_ids: List[int],
+        start_dt: datetime,
+        end_dt: datetime,
+        include_members: bool
+    ) -> List[Sheet]:
+        """导出的工作表列表，任务明细的行在写出时才从数据库读取"""
+        sheets = [
+            ("数据概要", self._summary_rows(report, start_dt, end_dt)),
+            ("任务类型统计", self._task_type_rows(report["task_type_stats"])),
+        ]
+        if include_members:
+            sheets.append(("团队绩效", self._member_rows(report["member_performance"])))
+        sheets.append(("任务明细", self._task_rows(user_ids, start_dt, end_dt)))
+        return sheets
+
+    def stream(self, export_format: str, sheets: List[Sheet]) -> Iterator[bytes]:
+        _, writer = EXPORT_FORMATS[export_format]
+        return writer(sheets)
+
+    def _summary_rows(self, report: dict, start_dt: datetime, end_dt: datetime) -> List[list]:
+        summary = report["summary"]
+        return [
+            ["统计周期", f"{start_dt.date()} 至 {end_dt.date()}"],
+            ["核心指标", "数值"],
+            ["总任务数", summary["total_tasks"]],
+            ["已完成任务", summary["completed_tasks"]],
+            ["重点任务", summary["key_tasks"]],
+            ["延期任务", summary["delayed_tasks"]],
+            ["完成率", f"{summary['completion_rate']}%"],
+            ["重点任务完成率", f"{summary['key_completion_rate']}%"],
+            ["延期率", f"{summary['delay_rate']}%"],
+        ]
+
+    def _task_type_rows(self, stats: List[dict]) -> List[list]:
+        rows = [["任务类型", "所属职责", "任务数量", "已完成", "进行中", "待办", "完成率", "平均用时（天）"]]
+        for item in stats:
+            rows.append([
+                item["task_type"], item["responsibility"], item["count"], item["completed"],
+                item["in_progress"], item["todo"], f"{item['completion_rate']}%", item["avg_days"]
+            ])
+        return rows
+
+    def _member_rows(self, performance: List[dict]) -> List[list]:
+        rows = [["成员姓名", "总任务", "已完成", "重点任务", "完成率", "平均任务周期（天）", "已复盘周数", "绩效评分"]]
+        for item in performance:
+            rows.append([
+                item["member_name"], item["total_tasks"], item["completed_tasks"], item["key_tasks"],
+                f"{item['completion_rate']}%", item["avg_completion_days"], item["reviewed_weeks"],
+                item["performance_score"]
+            ])
+        return rows
+
+    def _task_rows(self, user_ids: List[int], start_dt: datetime, end_dt: datetime) -> Iterator[list]:
+        """任务明细：stream_results 使用服务端游标（PostgreSQL），每批 REPORT_EXPORT_FETCH_SIZE 行"""
+        yield ["成员", "年份", "周次", "任务标题", "状态", "重点任务", "任务类型",
+               "计划开始", "计划结束", "实际开始", "实际结束", "复盘结果"]
+        Task, Review = report_sources(self.db, start_dt)
+        query = self.db.query(
+            User.full_name,
+            Task.year,
+            Task.week_number,
+            Task.title,
+            Task.status,
+            Task.is_key_task,
+            TaskType.name,
+            Task.planned_start_time,
+            Task.planned_end_time,
+            Task.actual_start_time,
+            Task.actual_end_time,
+            Review.is_completed
+        ).join(
+            User, User.id == Task.user_id
+        ).outerjoin(
+            TaskType, TaskType.id == Task.linked_task_type_id
+        ).outerjoin(
+            Review, Review.task_id == Task.id
+        ).filter(
+            *task_scope(user_ids, start_dt, end_dt, Task)
+        ).order_by(
+            Task.user_id, Task.planned_start_time, Task.id
+        ).yield_per(settings.REPORT_EXPORT_FETCH_SIZE)
+
+        for row in query:
+            yield [
+                row.full_name, row.year, row.week_number, row.title, _status_label(row.status),
+                "是" if row.is_key_task else "否", row.name,
+                row.planned_start_time, row.planned_end_time, row.actual_start_time, row.actual_end_time,
+                _review_label(row.is_completed)
+            ]
+
+
+def _status_label(value) -> str:
+    try:
+        return _STATUS_LABELS[TaskStatus(value)]
+    except ValueError:
+        return value
+
+
+def _review_label(is_completed: Optional[bool]) -> str:
+    if is_completed is None:
+        return "未复盘"
+    return "已完成" if is_completed else "未完成"
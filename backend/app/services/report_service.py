@@ -0,0 +1,271 @@
+"""
+统计报表服务
+报表的汇总、周趋势、成员绩效和任务类型统计由固定的两次分组查询得出：
+按 (user_id, year, week_number) 分组（外连接复盘记录），以及按 linked_task_type_id 分组；
+Python 只负责把分组结果汇总成响应结构
+
+报表不读取用户-周汇总表 weekly_user_stats：报表按计划开始时间的日期区间取任务（区间不必与整周对齐），
+成员绩效还需要完成天数，二者汇总表都无法提供；团队仪表盘和 AI 分析按整周统计，读取汇总表
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, and_, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.role import Responsibility, TaskType
+from app.models.task import TaskReview, TaskStatus, WeeklyTask
+from app.services.archive_service import combined_sources
+from app.services.carry_over_service import next_iso_week
+from app.utils.iso_week import week_key_of
+
+# 分组统计中需要的计数列名
+_COUNT_FIELDS = ("total", "completed", "in_progress", "todo", "delayed", "key", "key_completed")
+
+
+class ReportService:
+    """统计报表服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        # 查询的任务/复盘实体，build 时按统计区间是否涉及归档数据确定
+        self.Task, self.Review = WeeklyTask, TaskReview
+
+    def build(
+        self,
+        user_ids,
+        start_dt: datetime,
+        end_dt: datetime,
+        members: Optional[List[Tuple[int, str]]] = None,
+        teams: Optional[Dict[Tuple[int, str], List[int]]] = None
+    ) -> dict:
+        """
+        生成报表
+
+        Args:
+            user_ids: 统计范围内的用户ID（列表或查询）
+            start_dt, end_dt: 按计划开始时间过滤的区间
+            members: 需要输出成员绩效的 (用户ID, 姓名) 列表，为空时不输出
+            teams: 子团队 {(负责人ID, 负责人姓名): [成员用户ID]}，传入时额外输出子团队汇总
+        """
+        self.Task, self.Review = report_sources(self.db, start_dt)
+        scope = task_scope(user_ids, start_dt, end_dt, self.Task)
+
+        week_rows = self._user_week_stats(scope)
+
+        summary = dict.fromkeys(_COUNT_FIELDS, 0)
+        by_week: Dict[Tuple[int, int], dict] = defaultdict(lambda: dict.fromkeys(_COUNT_FIELDS, 0))
+        by_user: Dict[int, dict] = defaultdict(_empty_user_stats)
+        for row in week_rows:
+            counts = {name: int(getattr(row, name) or 0) for name in _COUNT_FIELDS}
+            week = by_week[(row.year, row.week_number)]
+            user = by_user[row.user_id]
+            for name, value in counts.items():
+                summary[name] += value
+                week[name] += value
+                user[name] += value
+            if row.reviewed:
+                user["reviewed_weeks"] += 1
+            user["total_days"] += int(row.total_days or 0)
+            user["completed_with_days"] += int(row.completed_with_days or 0)
+
+        total = summary["total"]
+        report = {
+            "summary": {
+                "total_tasks": total,
+                "completed_tasks": summary["completed"],
+                "key_tasks": summary["key"],
+                "delayed_tasks": summary["delayed"],
+                "completion_rate": _rate(summary["completed"], total),
+                "key_completion_rate": _rate(summary["key_completed"], summary["key"]),
+                "delay_rate": _rate(summary["delayed"], total)
+            },
+            "status_distribution": {
+                "completed": summary["completed"],
+                "in_progress": summary["in_progress"],
+                "todo": summary["todo"],
+                "delayed": summary["delayed"]
+            },
+            "weekly_trend": self._weekly_trend(by_week, start_dt, end_dt),
+            "member_performance": self._member_performance(by_user, members) if members else [],
+            "task_type_stats": self._task_type_stats(scope)
+        }
+        if teams is not None:
+            report["sub_team_performance"] = self._sub_team_performance(by_user, teams)
+        return report
+
+    def _days_expr(self):
+        """完成天数：(实际结束 - 实际开始) 的整天数 + 1，与 timedelta.days + 1 一致"""
+        start, end = self.Task.actual_start_time, self.Task.actual_end_time
+        if self.db.get_bind().dialect.name == "sqlite":
+            return cast(func.julianday(end) - func.julianday(start), Integer) + 1
+        return cast(func.floor(func.extract("epoch", end - start) / 86400), Integer) + 1
+
+    def _completed_with_days(self):
+        return and_(
+            self.Task.status == TaskStatus.COMPLETED,
+            self.Task.actual_start_time.isnot(None),
+            self.Task.actual_end_time.isnot(None)
+        )
+
+    def _user_week_stats(self, scope):
+        """按 (user_id, year, week_number) 分组的条件计数，复盘记录外连接统计"""
+        is_completed = self.Task.status == TaskStatus.COMPLETED
+        is_key = self.Task.is_key_task == True
+        with_days = self._completed_with_days()
+        return self.db.query(
+            self.Task.user_id,
+            self.Task.year,
+            self.Task.week_number,
+            func.count(self.Task.id).label("total"),
+            func.sum(case((is_completed, 1), else_=0)).label("completed"),
+            func.sum(case((self.Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)).label("in_progress"),
+            func.sum(case((self.Task.status == TaskStatus.TODO, 1), else_=0)).label("todo"),
+            func.sum(case((self.Task.status == TaskStatus.DELAYED, 1), else_=0)).label("delayed"),
+            func.sum(case((is_key, 1), else_=0)).label("key"),
+            func.sum(case((and_(is_key, is_completed), 1), else_=0)).label("key_completed"),
+            func.count(self.Review.id).label("reviewed"),
+            func.sum(case((with_days, self._days_expr()), else_=0)).label("total_days"),
+            func.sum(case((with_days, 1), else_=0)).label("completed_with_days"),
+        ).outerjoin(
+            self.Review, self.Review.task_id == self.Task.id
+        ).filter(*scope).group_by(
+            self.Task.user_id, self.Task.year, self.Task.week_number
+        ).all()
+
+    def _weekly_trend(self, by_week: dict, start_dt: datetime, end_dt: datetime) -> List[dict]:
+        """按ISO周逐周输出区间内的趋势（无任务的周补0）"""
+        trend = []
+        year, week = start_dt.isocalendar()[0], start_dt.isocalendar()[1]
+        end_year, end_week = end_dt.isocalendar()[0], end_dt.isocalendar()[1]
+        while (year, week) <= (end_year, end_week):
+            stats = by_week.get((year, week))
+            week_total = stats["total"] if stats else 0
+            week_completed = stats["completed"] if stats else 0
+            trend.append({
+                "week": week,
+                "year": year,
+                "total": week_total,
+                "completed": week_completed,
+                "rate": _rate(week_completed, week_total)
+            })
+            year, week = next_iso_week(year, week)
+        return trend
+
+    def _member_performance(self, by_user: dict, members: List[Tuple[int, str]]) -> List[dict]:
+        """成员绩效：由按用户汇总的分组结果组装"""
+        performance = []
+        for member_id, member_name in members:
+            stats = by_user.get(member_id) or _empty_user_stats()
+            completion_rate = (stats["completed"] / stats["total"] * 100) if stats["total"] > 0 else 0
+            avg_days = 0
+            if stats["completed_with_days"]:
+                avg_days = round(stats["total_days"] / stats["completed_with_days"], 1)
+            performance.append({
+                "member_name": member_name,
+                "total_tasks": stats["total"],
+                "completed_tasks": stats["completed"],
+                "key_tasks": stats["key"],
+                "completion_rate": round(completion_rate, 1),
+                "avg_completion_days": avg_days,
+                "reviewed_weeks": stats["reviewed_weeks"],
+                # 简单的绩效评分（基于完成率）
+                "performance_score": min(5, int(completion_rate / 20))
+            })
+        return performance
+
+    def _sub_team_performance(self, by_user: dict, teams: dict) -> List[dict]:
+        """子团队汇总：把按用户分组的结果按所属子团队累加"""
+        performance = []
+        for (leader_id, leader_name), user_ids in sorted(teams.items()):
+            stats = _empty_user_stats()
+            for user_id in user_ids:
+                for name, value in by_user.get(user_id, {}).items():
+                    stats[name] += value
+            performance.append({
+                "leader_id": leader_id,
+                "leader_name": leader_name,
+                "member_count": len(user_ids),
+                "total_tasks": stats["total"],
+                "completed_tasks": stats["completed"],
+                "delayed_tasks": stats["delayed"],
+                "key_tasks": stats["key"],
+                "completion_rate": _rate(stats["completed"], stats["total"]),
+                "delay_rate": _rate(stats["delayed"], stats["total"])
+            })
+        return performance
+
+    def _task_type_stats(self, scope) -> List[dict]:
+        """按任务类型分组统计，同名任务类型合并展示"""
+        is_completed = self.Task.status == TaskStatus.COMPLETED
+        with_days = self._completed_with_days()
+        rows = self.db.query(
+            TaskType.name.label("task_type"),
+            Responsibility.name.label("responsibility"),
+            func.count(self.Task.id).label("count"),
+            func.sum(case((is_completed, 1), else_=0)).label("completed"),
+            func.sum(case((self.Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)).label("in_progress"),
+            func.sum(case((self.Task.status == TaskStatus.TODO, 1), else_=0)).label("todo"),
+            func.sum(case((with_days, self._days_expr()), else_=0)).label("total_days"),
+            func.sum(case((with_days, 1), else_=0)).label("completed_with_days"),
+        ).join(
+            TaskType, TaskType.id == self.Task.linked_task_type_id
+        ).outerjoin(
+            Responsibility, Responsibility.id == TaskType.responsibility_id
+        ).filter(*scope).group_by(
+            self.Task.linked_task_type_id, TaskType.name, Responsibility.name
+        ).order_by(self.Task.linked_task_type_id).all()
+
+        groups: Dict[str, dict] = {}
+        for row in rows:
+            group = groups.setdefault(row.task_type, {
+                "task_type": row.task_type,
+                "responsibility": row.responsibility or "未分类",
+                "count": 0, "completed": 0, "in_progress": 0, "todo": 0,
+                "total_days": 0, "completed_with_days": 0
+            })
+            for name in ("count", "completed", "in_progress", "todo", "total_days", "completed_with_days"):
+                group[name] += int(getattr(row, name) or 0)
+
+        stats = []
+        for group in groups.values():
+            avg_days = (group["total_days"] / group["completed_with_days"]) if group["completed_with_days"] > 0 else 0
+            stats.append({
+                "task_type": group["task_type"],
+                "responsibility": group["responsibility"],
+                "count": group["count"],
+                "completed": group["completed"],
+                "in_progress": group["in_progress"],
+                "todo": group["todo"],
+                "completion_rate": _rate(group["completed"], group["count"]),
+                "avg_days": round(avg_days, 1)
+            })
+        return stats
+
+
+def report_sources(db: Session, start_dt: datetime):
+    """
+    报表区间对应的 (任务, 复盘) 实体：区间早于归档水位时为热表与归档表的并集
+    任务按计划开始时间落在所属周内，多留一周余量
+    """
+    return combined_sources(db, week_key_of(start_dt - timedelta(days=7)))
+
+
+def task_scope(user_ids, start_dt: datetime, end_dt: datetime, task=WeeklyTask) -> tuple:
+    """报表统计范围：指定用户在区间内（按计划开始时间）的未删除任务"""
+    return (
+        task.user_id.in_(user_ids),
+        task.planned_start_time >= start_dt,
+        task.planned_start_time <= end_dt,
+        task.is_deleted == False
+    )
+
+
+def _empty_user_stats() -> dict:
+    return {**dict.fromkeys(_COUNT_FIELDS, 0), "reviewed_weeks": 0, "total_days": 0, "completed_with_days": 0}
+
+
+def _rate(part: int, whole: int) -> float:
+    """百分比，保留一位小数"""
+    return round(part / whole * 100, 1) if whole > 0 else 0
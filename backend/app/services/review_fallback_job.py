@@ -0,0 +1,197 @@
+"""
+全员未复盘兜底批处理
+周结束后对所有在职用户执行与 /api/tasks/reviews/fallback 相同的兜底逻辑：
+按用户ID分批处理，每批一个事务并同时写入断点，进程中断后可从断点续跑
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+import pytz
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.task import ReviewFallbackRun
+from app.models.user import User
+from app.services.carry_over_service import CarryOverService
+
+logger = logging.getLogger(__name__)
+
+# 运行中的记录超过该时长未提交新批次，视为原进程已中断，可被接管续跑
+STALE_RUN_TIMEOUT = timedelta(minutes=10)
+
+
+def closed_iso_week(now: Optional[datetime] = None) -> Tuple[int, int]:
+    """返回已结束（且超过宽限期）的最近一个ISO周"""
+    now = now or datetime.now(pytz.timezone(settings.TIMEZONE))
+    shifted = now - timedelta(hours=settings.REVIEW_FALLBACK_GRACE_HOURS) - timedelta(days=7)
+    iso = shifted.isocalendar()
+    return iso[0], iso[1]
+
+
+class ReviewFallbackJob:
+    """全员未复盘兜底批处理任务"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        chunk_size: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size or settings.REVIEW_FALLBACK_CHUNK_SIZE
+
+    def run(self, year: int, week_number: int) -> Optional[int]:
+        """
+        执行（或从断点续跑）指定周的兜底
+
+        Returns:
+            本次执行的运行记录ID；该周已完成或正由其他进程执行时返回None
+        """
+        db = self.session_factory()
+        try:
+            run = self._claim(db, year, week_number)
+            if run is None:
+                return None
+            self._process(db, run)
+            return run.id
+        finally:
+            db.close()
+
+    def _remaining_users(self, db: Session, after_user_id: int) -> int:
+        return db.query(User.id).filter(
+            User.is_active == True,
+            User.id > after_user_id
+        ).count()
+
+    def _claim(self, db: Session, year: int, week_number: int) -> Optional[ReviewFallbackRun]:
+        """获取该周的执行权：新建运行记录，或接管失败/中断的记录"""
+        now = datetime.now()
+        run = db.query(ReviewFallbackRun).filter(
+            ReviewFallbackRun.year == year,
+            ReviewFallbackRun.week_number == week_number
+        ).first()
+
+        if run is None:
+            run = ReviewFallbackRun(
+                year=year,
+                week_number=week_number,
+                status="running",
+                last_user_id=0,
+                total_users=self._remaining_users(db, 0),
+                processed_users=0,
+                processed_chunks=0,
+                created_tasks=0,
+                elapsed_seconds=0.0,
+                started_at=now,
+                updated_at=now
+            )
+            db.add(run)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                logger.info(f"{year}年第{week_number}周兜底已由其他进程启动")
+                return None
+            return run
+
+        if run.status == "completed":
+            return None
+        last_update = run.updated_at.replace(tzinfo=None) if run.updated_at else None
+        if run.status == "running" and last_update and now - last_update < STALE_RUN_TIMEOUT:
+            return None
+
+        # 以 updated_at 作为乐观锁，避免多个进程同时接管
+        claimed = db.query(ReviewFallbackRun).filter(
+            ReviewFallbackRun.id == run.id,
+            ReviewFallbackRun.updated_at == run.updated_at
+        ).update({
+            ReviewFallbackRun.status: "running",
+            ReviewFallbackRun.error: None,
+            ReviewFallbackRun.updated_at: now,
+            ReviewFallbackRun.total_users: run.processed_users + self._remaining_users(db, run.last_user_id),
+        }, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return None
+        db.refresh(run)
+        logger.info(f"{year}年第{week_number}周兜底从用户ID {run.last_user_id} 之后续跑")
+        return run
+
+    def _process(self, db: Session, run: ReviewFallbackRun) -> None:
+        """按用户ID分批处理，每批与断点在同一事务内提交"""
+        service = CarryOverService(db)
+        try:
+            while True:
+                chunk_started = time.monotonic()
+                user_ids = [
+                    user_id for (user_id,) in db.query(User.id).filter(
+                        User.is_active == True,
+                        User.id > run.last_user_id
+                    ).order_by(User.id).limit(self.chunk_size)
+                ]
+                if not user_ids:
+                    break
+
+                outcome = service.apply_review_fallback(user_ids, run.year, run.week_number)
+
+                run.last_user_id = user_ids[-1]
+                run.processed_users += len(user_ids)
+                run.processed_chunks += 1
+                run.created_tasks += len(outcome.created_task_ids)
+                run.elapsed_seconds += time.monotonic() - chunk_started
+                run.updated_at = datetime.now()
+                db.commit()
+
+            run.status = "completed"
+            run.finished_at = datetime.now()
+            run.updated_at = run.finished_at
+            db.commit()
+            logger.info(
+                f"{run.year}年第{run.week_number}周兜底完成：用户 {run.processed_users}，"
+                f"新任务 {run.created_tasks}，耗时 {run.elapsed_seconds:.1f}s"
+            )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"{run.year}年第{run.week_number}周兜底失败: {e}", exc_info=True)
+            run.status = "failed"
+            run.error = str(e)[:2000]
+            run.updated_at = datetime.now()
+            db.commit()
+            raise
+
+
+class ReviewFallbackScheduler:
+    """应用内调度器：定期检查已结束的周并执行兜底（已完成的周直接跳过）"""
+
+    def __init__(self, job: Optional[ReviewFallbackJob] = None, interval: Optional[int] = None):
+        self.job = job or ReviewFallbackJob()
+        self.interval = interval or settings.REVIEW_FALLBACK_CHECK_INTERVAL
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="review-fallback-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("未复盘兜底调度器已启动")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.job.run(*closed_iso_week())
+            except Exception:
+                # 失败原因已记录在运行记录中，下一轮检查时自动续跑
+                pass
+            self._stop.wait(self.interval)
@@ -0,0 +1,105 @@
+"""
+用户-周统计汇总维护
+任务新增、修改、复盘、结转时，在同一事务内按受影响的 (user_id, year, week_number)
+重新聚合该用户该周的任务并覆盖 weekly_user_stats 中对应行；
+rebuild_weekly_stats 用于历史数据回填或校正
+"""
+from collections import defaultdict
+from typing import Iterable, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.task import TaskReview, TaskStatus, WeeklyTask, WeeklyUserStats
+from app.services.archive_service import combined_sources
+from app.utils.iso_week import week_key
+
+# 汇总表各列（聚合表达式见 _stat_columns）
+_STAT_NAMES = (
+    "total_tasks", "todo_tasks", "in_progress_tasks", "completed_tasks", "delayed_tasks", "cancelled_tasks",
+    "key_tasks", "key_completed_tasks", "reviewed_tasks", "planned_duration_total", "actual_duration_total",
+)
+
+
+def _stat_columns(Task, Review) -> tuple:
+    """汇总表各列对应的聚合表达式，顺序与 _STAT_NAMES 一致"""
+    return (
+        func.count(Task.id),
+        func.sum(case((Task.status == TaskStatus.TODO, 1), else_=0)),
+        func.sum(case((Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)),
+        func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0)),
+        func.sum(case((Task.status == TaskStatus.DELAYED, 1), else_=0)),
+        func.sum(case((Task.status == TaskStatus.CANCELLED, 1), else_=0)),
+        func.sum(case((Task.is_key_task == True, 1), else_=0)),
+        func.sum(case((and_(Task.is_key_task == True, Task.status == TaskStatus.COMPLETED), 1), else_=0)),
+        func.count(Review.id),
+        func.coalesce(func.sum(Task.planned_duration), 0),
+        func.coalesce(func.sum(Task.actual_duration), 0),
+    )
+
+
+def _aggregate(*conditions, Task=WeeklyTask, Review=TaskReview):
+    """按 (user_id, year, week_number) 聚合未删除任务的 SELECT"""
+    return select(
+        Task.user_id,
+        Task.year,
+        Task.week_number,
+        *_stat_columns(Task, Review)
+    ).outerjoin(
+        Review, Review.task_id == Task.id
+    ).where(
+        Task.is_deleted == False,
+        *conditions
+    ).group_by(Task.user_id, Task.year, Task.week_number)
+
+
+def _insert_from(aggregate):
+    columns = ["user_id", "year", "week_number", *_STAT_NAMES]
+    return insert(WeeklyUserStats).from_select(columns, aggregate)
+
+
+def refresh_weekly_stats(db: Session, keys: Iterable[Tuple[int, int, int]]) -> None:
+    """
+    重新计算指定 (user_id, year, week_number) 的汇总行（不提交事务）
+
+    每个用户-周的聚合只扫描该用户该周的任务（idx_user_week），
+    同一周的多个用户合并为一条 DELETE 和一条 INSERT ... SELECT
+    """
+    by_week = defaultdict(set)
+    for user_id, year, week_number in keys:
+        by_week[(year, week_number)].add(user_id)
+    if not by_week:
+        return
+
+    # 先写入会话中挂起的任务修改，保证聚合读到最新数据
+    db.flush()
+    for (year, week_number), user_ids in by_week.items():
+        user_ids = sorted(user_ids)
+        # 不晚于归档水位的周，任务可能部分或全部已在归档表中
+        Task, Review = combined_sources(db, week_key(year, week_number))
+        db.execute(delete(WeeklyUserStats).where(
+            WeeklyUserStats.year == year,
+            WeeklyUserStats.week_number == week_number,
+            WeeklyUserStats.user_id.in_(user_ids)
+        ))
+        db.execute(_insert_from(_aggregate(
+            Task.year == year,
+            Task.week_number == week_number,
+            Task.user_id.in_(user_ids),
+            Task=Task,
+            Review=Review
+        )))
+
+
+def rebuild_weekly_stats(db: Session, year: int = None) -> int:
+    """
+    全量重建汇总表（可只重建某一年，含已归档的周），返回重建后的行数（不提交事务）
+    """
+    Task, Review = combined_sources(db, 0)
+    stats_filter, task_filter = [], []
+    if year is not None:
+        stats_filter.append(WeeklyUserStats.year == year)
+        task_filter.append(Task.year == year)
+    db.execute(delete(WeeklyUserStats).where(*stats_filter))
+    db.execute(_insert_from(_aggregate(*task_filter, Task=Task, Review=Review)))
+    return db.query(func.count(WeeklyUserStats.id)).filter(*stats_filter).scalar()
@@ -0,0 +1,32 @@
+"""
+ISO周键
+weekly_tasks.iso_week_key = year * 100 + week_number（如 202447），按数值排序即按周先后排序，
+跨年的多周区间可以用一个 BETWEEN 表达
+"""
+from datetime import date, datetime
+from typing import Tuple, Union
+
+
+def week_key(year: int, week_number: int) -> int:
+    """(ISO年, ISO周) -> 周键"""
+    return year * 100 + week_number
+
+
+def week_key_of(day: Union[date, datetime]) -> int:
+    """日期所在ISO周的周键"""
+    iso_year, iso_week, _ = day.isocalendar()
+    return week_key(iso_year, iso_week)
+
+
+def week_key_range(start_date: str, end_date: str) -> Tuple[int, int]:
+    """
+    "YYYY-MM-DD" 日期区间覆盖的周键区间（含首尾所在周）
+
+    Raises:
+        ValueError: 日期格式错误或开始日期晚于结束日期
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    if start > end:
+        raise ValueError("开始日期不能晚于结束日期")
+    return week_key_of(start), week_key_of(end)
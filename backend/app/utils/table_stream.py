@@ -0,0 +1,175 @@
+"""
+表格流式写出（CSV / XLSX）
+每个工作表为 (名称, 行迭代器)，按行写出并分块产出字节，内存占用与总行数无关；
+XLSX 仅生成最小的 OOXML 包（内联字符串、无样式），不依赖 openpyxl
+"""
+import codecs
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+Sheet = Tuple[str, Iterable[Sequence]]
+
+# 每写出多少行产出一次数据块
+FLUSH_ROWS = 500
+
+# XML 1.0 不允许的控制字符
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Excel 工作表名不允许的字符
+_ILLEGAL_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _text(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_csv(sheets: Iterable[Sheet]) -> Iterator[bytes]:
+    """各工作表依次写成一个 CSV：表名一行、数据行、空行分隔；带 BOM 以便 Excel 识别 UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    yield codecs.BOM_UTF8
+    for index, (name, rows) in enumerate(sheets):
+        if index:
+            writer.writerow([])
+        writer.writerow([name])
+        for count, row in enumerate(rows, 1):
+            writer.writerow(["" if value is None else _text(value) for value in row])
+            if count % FLUSH_ROWS == 0:
+                yield drain()
+        yield drain()
+
+
+class _ChunkSink:
+    """只写、不可 seek 的输出，zipfile 据此使用数据描述符流式写入"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cell(value) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_ILLEGAL_XML_CHARS.sub("", _text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _sheet_name(name: str, used: set) -> str:
+    base = _ILLEGAL_SHEET_CHARS.sub("_", name)[:31] or "Sheet"
+    candidate, suffix = base, 1
+    while candidate.lower() in used:
+        suffix += 1
+        candidate = f"{base[:31 - len(str(suffix)) - 1]}_{suffix}"
+    used.add(candidate.lower())
+    return candidate
+
+
+def stream_xlsx(sheets: Iterable[Sheet]) -> Iterator[bytes]:
+    """逐个工作表流式写出 XLSX，工作簿目录在所有工作表写完后补写"""
+    sink = _ChunkSink()
+    names: List[str] = []
+    used: set = set()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as package:
+        for name, rows in sheets:
+            names.append(_sheet_name(name, used))
+            with package.open(f"xl/worksheets/sheet{len(names)}.xml", "w") as sheet:
+                sheet.write(
+                    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    b"<sheetData>"
+                )
+                for count, row in enumerate(rows, 1):
+                    sheet.write(f"<row>{''.join(_cell(value) for value in row)}</row>".encode("utf-8"))
+                    if count % FLUSH_ROWS == 0:
+                        yield sink.drain()
+                sheet.write(b"</sheetData></worksheet>")
+            yield sink.drain()
+
+        package.writestr("[Content_Types].xml", _content_types(len(names)))
+        package.writestr("_rels/.rels", _ROOT_RELS)
+        package.writestr("xl/workbook.xml", _workbook(names))
+        package.writestr("xl/_rels/workbook.xml.rels", _workbook_rels(len(names)))
+    yield sink.drain()
+
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"'
+    ' Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+
+def _content_types(sheet_count: int) -> str:
+    overrides = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, sheet_count + 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        f"{overrides}</Types>"
+    )
+
+
+def _workbook(names: List[str]) -> str:
+    sheets = "".join(
+        f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+        for i, name in enumerate(names, 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f"<sheets>{sheets}</sheets></workbook>"
+    )
+
+
+def _workbook_rels(sheet_count: int) -> str:
+    relationships = "".join(
+        f'<Relationship Id="rId{i}"'
+        ' Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"'
+        f' Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, sheet_count + 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f"{relationships}</Relationships>"
+    )
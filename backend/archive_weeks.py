@@ -0,0 +1,39 @@
+"""
+冷热数据归档脚本
+把热数据窗口（最近 ARCHIVE_HOT_WEEKS 周）之前的任务及复盘移入归档表，
+也可指定周键（year * 100 + 周次）作为截止周，归档其之前的所有周
+用法: python3 archive_weeks.py [截止周键，如 202601]
+"""
+import sys
+import os
+
+# 添加app目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.base import SessionLocal
+from app.db.migrations import upgrade_database
+from app.services.archive_service import ArchiveService, archive_cutoff_key
+
+
+def main():
+    """主函数"""
+    cutoff_key = int(sys.argv[1]) if len(sys.argv) > 1 else archive_cutoff_key()
+
+    # 确保数据库结构为最新版本（含归档表）
+    upgrade_database()
+
+    db = SessionLocal()
+    try:
+        print(f"归档周键 {cutoff_key} 之前的任务...")
+        moved = ArchiveService(db).archive(cutoff_key)
+        print(f"✓ 归档完成，共移动 {moved} 条任务")
+    except Exception as e:
+        print(f"\n✗ 归档失败（已提交的批次保留，可重新运行继续）: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,22 +8,29 @@ import os
 # 添加app目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.db.base import SessionLocal, Base, engine
+from app.db.base import SessionLocal
+from app.db.migrations import upgrade_database
 from app.utils.init_data import initialize_database
+from app.services.hierarchy_service import rebuild_user_hierarchy
 
 
 def main():
     """主函数"""
-    # 创建所有表
-    print("创建数据库表...")
-    Base.metadata.create_all(bind=engine)
-    print("✓ 数据库表创建完成\n")
+    # 执行数据库迁移
+    print("升级数据库结构...")
+    upgrade_database()
+    print("✓ 数据库结构已升级到最新版本\n")
 
     # 获取数据库会话
     db = SessionLocal()
     try:
         # 初始化数据
         initialize_database(db)
+
+        # 按现有汇报关系回填层级闭包表（已有数据的库升级时同样适用）
+        rows = rebuild_user_hierarchy(db)
+        db.commit()
+        print(f"✓ 汇报关系层级已重建，共 {rows} 条")
     except Exception as e:
         print(f"\n✗ 初始化失败: {e}")
         db.rollback()
@@ -0,0 +1,39 @@
+"""
+用户-周统计汇总重建脚本
+首次上线或数据校正时运行，按 weekly_tasks 全量（或指定年份）重建 weekly_user_stats
+用法: python3 rebuild_weekly_stats.py [年份]
+"""
+import sys
+import os
+
+# 添加app目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.base import SessionLocal
+from app.db.migrations import upgrade_database
+from app.services.weekly_stats_service import rebuild_weekly_stats
+
+
+def main():
+    """主函数"""
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    # 确保数据库结构为最新版本（含汇总表）
+    upgrade_database()
+
+    db = SessionLocal()
+    try:
+        print(f"重建用户-周统计汇总（{year if year else '全部'}年）...")
+        rows = rebuild_weekly_stats(db, year)
+        db.commit()
+        print(f"✓ 重建完成，共 {rows} 行")
+    except Exception as e:
+        print(f"\n✗ 重建失败: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
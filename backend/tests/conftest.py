@@ -1,24 +1,32 @@
 """
 Pytest configuration and fixtures for weekly-plan tests
 """
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.main import app
 from app.core.config import settings
 from app.db.base import Base
-from app.api.deps import get_db
+from app.core.cache import clear_all_caches
+from app.api.deps import get_async_db, get_db
 from app.core.security import get_password_hash
 from app.models.user import User, Department
 from app.models.role import Role, Responsibility, TaskType
+from app.models.task import TaskStatus, WeeklyTask
 from app.utils.init_data import init_roles_and_responsibilities
+from app.services.hierarchy_service import set_manager
 
 
 # Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# 命名的共享缓存内存库：同步引擎（StaticPool 常驻连接保持库存活）与异步路由使用的 aiosqlite 引擎看到同一份数据
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:weekly_plan_test?mode=memory&cache=shared&uri=true"
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///file:weekly_plan_test?mode=memory&cache=shared&uri=true"
 
 from fastapi.testclient import TestClient
 from app.main import app
@@ -47,6 +55,8 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 异步连接每次新建：TestClient 每个测试使用新的事件循环，连接不能跨测试复用
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
 
 
 @pytest.fixture(scope="function")
@@ -54,6 +64,8 @@ def db_session():
     """Create a fresh database session for each test"""
     # 测试模式下关闭限流等副作用
     settings.TESTING = True
+    # 每个测试使用全新数据库，进程内缓存需同步清空
+    clear_all_caches()
     Base.metadata.create_all(bind=engine)
     session = TestingSessionLocal()
     try:
@@ -65,14 +77,19 @@ def db_session():
 
 @pytest.fixture(scope="function")
 def client(db_session):
-    """Create a test client with overridden database dependency"""
+    """Create a test client with overridden database dependencies"""
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
 
+    async def override_get_async_db():
+        async with AsyncSession(async_engine, autoflush=False, expire_on_commit=False) as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -146,6 +163,8 @@ def test_employee_user(db_session, test_department, test_manager_user):
         is_active=True
     )
     db_session.add(employee)
+    db_session.flush()
+    set_manager(db_session, employee.id, test_manager_user.id)
     db_session.commit()
     db_session.refresh(employee)
     return employee
@@ -192,6 +211,35 @@ def init_roles(db_session):
     return db_session.query(Role).all()
 
 
+@pytest.fixture(scope="function")
+def task_type_id(db_session, init_roles):
+    """First task type of the first role (the role linked to test_admin_user)"""
+    return db_session.query(TaskType.id).join(Responsibility).filter(
+        Responsibility.role_id == init_roles[0].id
+    ).order_by(TaskType.id).first()[0]
+
+
+@pytest.fixture(scope="function")
+def make_task(db_session, task_type_id):
+    """Factory adding a one-hour WeeklyTask to the session (the caller commits)"""
+    def _make(user, title="测试任务", year=2026, week_number=1, start=None, **fields):
+        start = start or datetime.now()
+        values = {
+            "status": TaskStatus.TODO,
+            "is_key_task": False,
+            "source_type": "responsibility",
+            "linked_task_type_id": task_type_id,
+            "planned_start_time": start,
+            "planned_end_time": start + timedelta(hours=1),
+            "planned_duration": 60,
+        }
+        values.update(fields)
+        task = WeeklyTask(user_id=user.id, title=title, year=year, week_number=week_number, **values)
+        db_session.add(task)
+        return task
+    return _make
+
+
 @pytest.fixture(scope="function")
 def admin_token(client, test_admin_user):
     """Get authentication token for admin user"""
@@ -0,0 +1,76 @@
+"""
+Tests for AI analysis API endpoints (async routes on AsyncSession)
+"""
+from datetime import datetime
+
+import pytest
+from fastapi import status
+
+from app.models.task import TaskStatus
+from app.services.weekly_stats_service import refresh_weekly_stats
+
+
+@pytest.fixture
+def add_week_tasks(db_session, make_task):
+    """为用户写入 2026 年第 19 周的两条任务并刷新周汇总"""
+    def _add(user):
+        start = datetime(2026, 5, 4, 9, 0)
+        for title, task_status in (("已完成", TaskStatus.COMPLETED), ("已延期", TaskStatus.DELAYED)):
+            make_task(user, title, 2026, 19, start=start, status=task_status)
+        refresh_weekly_stats(db_session, [(user.id, 2026, 19)])
+        db_session.commit()
+    return _add
+
+
+@pytest.mark.api
+class TestAIAnalysisAPI:
+    """Test AI analysis API endpoints"""
+
+    def test_analyze_reads_async_session(self, client, auth_headers, add_week_tasks, test_admin_user):
+        """测试 AI 分析：异步会话读取测试库数据，未配置大模型时回退为统计分析"""
+        add_week_tasks(test_admin_user)
+
+        response = client.post(
+            "/api/ai/analyze",
+            json={"user_id": test_admin_user.id, "start_date": "2026-05-04", "end_date": "2026-05-10"},
+            headers=auth_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["user_name"] == test_admin_user.full_name
+        assert data["statistics"]["total_tasks"] == 2
+        assert data["statistics"]["completed_tasks"] == 1
+        assert data["analysis_result"].startswith("AI分析失败")
+
+    def test_analyze_manager_limited_to_subordinates(
+        self, client, manager_headers, add_week_tasks, test_admin_user, test_employee_user
+    ):
+        """测试管理者只能分析下属"""
+        add_week_tasks(test_employee_user)
+        params = {"start_date": "2026-05-04", "end_date": "2026-05-10"}
+
+        response = client.post(
+            "/api/ai/analyze", json={**params, "user_id": test_admin_user.id}, headers=manager_headers
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        response = client.post(
+            "/api/ai/analyze", json={**params, "user_id": test_employee_user.id}, headers=manager_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["statistics"]["total_tasks"] == 2
+
+    def test_analyze_forbidden_for_employee(self, client, employee_headers):
+        """测试普通员工不能使用 AI 分析"""
+        response = client.post(
+            "/api/ai/analyze",
+            json={"start_date": "2026-05-04", "end_date": "2026-05-10"},
+            headers=employee_headers
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_llm_connection_without_config(self, client, auth_headers):
+        """测试未配置大模型时连接测试返回错误"""
+        response = client.get("/api/ai/analyze/test", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "error"
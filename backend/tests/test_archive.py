@@ -0,0 +1,118 @@
+"""
+冷热数据归档测试
+测试已结束的周移入归档表后，各读取路径仍能读到归档的周
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.task import TaskReview, TaskReviewArchive, TaskStatus, WeeklyTask, WeeklyTaskArchive, WeeklyUserStats
+from app.services.ai_service import prepare_analysis_data
+from app.services.archive_service import ArchiveService, archived_through
+from app.services.data_version import bump_data_version
+from app.services.weekly_stats_service import refresh_weekly_stats
+
+
+@pytest.mark.integration
+class TestArchive:
+    """归档与归档后的读取路由"""
+
+    def test_archive_moves_closed_weeks_and_routes_reads(
+        self, client, auth_headers, db_session, test_admin_user, make_task
+    ):
+        """测试冷热归档：分批移入归档表并保留ID，周报、成员详情与统计报表仍能读到归档的周"""
+        start = datetime(2026, 5, 4, 9, 0)
+        tasks = [
+            make_task(
+                test_admin_user, title, 2026, week, start=start + timedelta(weeks=week - 19),
+                status=TaskStatus.COMPLETED, actual_duration=90
+            )
+            for title, week in (("归档任务1", 19), ("归档任务2", 19), ("热任务", 20))
+        ]
+        db_session.flush()
+        db_session.add(TaskReview(task_id=tasks[0].id, is_completed=True))
+        db_session.commit()
+        archived_ids = [tasks[0].id, tasks[1].id]
+
+        assert ArchiveService(db_session, batch_size=1).archive(202620) == 2
+        db_session.expire_all()
+        assert archived_through(db_session) == 202619
+        assert db_session.query(WeeklyTask.id).filter(WeeklyTask.id.in_(archived_ids)).count() == 0
+        assert [t.id for t in db_session.query(WeeklyTaskArchive).order_by(WeeklyTaskArchive.id)] == archived_ids
+        assert db_session.query(TaskReviewArchive.task_id).scalar() == archived_ids[0]
+        assert db_session.query(TaskReview).count() == 0
+
+        # 新任务不复用已归档的ID
+        new_task = make_task(test_admin_user, "新任务", 2026, 20, start=start)
+        db_session.commit()
+        assert new_task.id > max(archived_ids)
+
+        report = client.get(
+            "/api/tasks/weekly-report", params={"year": 2026, "week_number": 19}, headers=auth_headers
+        ).json()
+        assert report["summary"]["total_tasks"] == 2
+        assert [t["id"] for t in report["completed_tasks"]] == archived_ids
+
+        detail = client.get(
+            f"/api/dashboard/team/member/{test_admin_user.id}",
+            params={"year": 2026, "week_number": 19}, headers=auth_headers
+        ).json()
+        assert [t["id"] for t in detail["tasks"]] == archived_ids
+        assert detail["tasks"][0]["review"]["is_completed"] is True
+
+        params = {"start_date": "2026-05-04", "end_date": "2026-05-17"}
+        summary = client.get("/api/dashboard/reports", params=params, headers=auth_headers).json()["summary"]
+        assert summary["total_tasks"] == 4
+        assert summary["completed_tasks"] == 3
+        durations = client.get("/api/dashboard/reports/durations", params=params, headers=auth_headers).json()
+        assert durations["by_user"][0]["count"] == 3
+
+        data = prepare_analysis_data(db_session, test_admin_user.id, "2026-05-04", "2026-05-10")
+        assert [task["title"] for task in data["task_details"]] == ["归档任务1", "归档任务2"]
+
+    def test_archived_weeks_in_task_lists_and_sync(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试归档后：我的任务（含跨表游标分页）、延期任务、增量同步墓碑与周汇总刷新仍包含归档的周"""
+        start = datetime(2026, 5, 4, 9, 0)
+        tasks = [
+            make_task(test_admin_user, title, 2026, week, start=start, status=task_status, is_key_task=is_key)
+            for title, week, task_status, is_key in (
+                ("归档重点", 19, TaskStatus.COMPLETED, True),
+                ("归档延期", 19, TaskStatus.DELAYED, False),
+                ("归档删除", 19, TaskStatus.TODO, False),
+                ("热任务", 20, TaskStatus.TODO, False),
+            )
+        ]
+        bump_data_version(db_session, [test_admin_user.id])
+        db_session.commit()
+        ids = [t.id for t in tasks]
+
+        cursor = client.get("/api/tasks/changes", headers=auth_headers).json()["cursor"]
+        resp = client.post("/api/tasks/bulk", json={"task_ids": [ids[2]], "operation": "delete"}, headers=auth_headers)
+        assert resp.json()["succeeded_count"] == 1
+        assert ArchiveService(db_session).archive(202620) == 3
+
+        changes = client.get("/api/tasks/changes", params={"since": cursor}, headers=auth_headers).json()
+        assert changes["deleted_ids"] == [ids[2]]
+        full = client.get("/api/tasks/changes", params={"year": 2026, "week_number": 19}, headers=auth_headers).json()
+        assert [t["id"] for t in full["changes"]] == ids[:2]
+
+        week = {"year": 2026, "week_number": 19}
+        assert [t["id"] for t in client.get("/api/tasks/my-tasks", params=week, headers=auth_headers).json()] == ids[:2]
+        delayed = client.get("/api/tasks/delayed-tasks", params=week, headers=auth_headers).json()
+        assert [t["id"] for t in delayed] == [ids[1]]
+
+        # 游标分页跨越热表与归档表，游标行已归档时仍能定位
+        pages, params = [], {"limit": 1, "with_total": True}
+        while True:
+            resp = client.get("/api/tasks/my-tasks", params=params, headers=auth_headers)
+            assert resp.headers["X-Total-Count"] == "3"
+            pages.append([t["id"] for t in resp.json()])
+            if "X-Next-Cursor" not in resp.headers:
+                break
+            params = {**params, "cursor": resp.headers["X-Next-Cursor"]}
+        assert pages == [[ids[0]], [ids[1]], [ids[3]]]
+
+        refresh_weekly_stats(db_session, [(test_admin_user.id, 2026, 19)])
+        db_session.commit()
+        stats = db_session.query(WeeklyUserStats).filter_by(user_id=test_admin_user.id, year=2026, week_number=19).one()
+        assert (stats.total_tasks, stats.delayed_tasks) == (2, 1)
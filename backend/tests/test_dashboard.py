@@ -0,0 +1,364 @@
+"""
+仪表盘与统计报表API测试
+测试团队仪表盘、成员详情、统计报表及其缓存、导出与时长分布
+"""
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.models.role import TaskType
+from app.models.task import ReportComment, TaskReview, TaskStatus
+from app.models.user import User
+from app.services.hierarchy_service import rebuild_user_hierarchy
+from app.services.weekly_stats_service import refresh_weekly_stats
+
+
+@pytest.mark.dashboard
+class TestTeamDashboard:
+    """团队仪表盘与成员详情"""
+
+    def test_team_dashboard_aggregates(
+        self, client, manager_headers, db_session, test_manager_user, test_employee_user, make_task
+    ):
+        """测试团队仪表盘分组统计：任务数、完成率、延期、重点任务和复盘状态"""
+        specs = [
+            (TaskStatus.COMPLETED, True, False),
+            (TaskStatus.DELAYED, True, False),
+            (TaskStatus.TODO, False, False),
+            (TaskStatus.COMPLETED, False, True),  # 已删除，不计入
+        ]
+        tasks = [
+            make_task(test_employee_user, "团队任务", 2026, 6, status=task_status, is_key_task=is_key, is_deleted=deleted)
+            for task_status, is_key, deleted in specs
+        ]
+        db_session.flush()
+        db_session.add(TaskReview(task_id=tasks[0].id, is_completed=True))
+        db_session.add(ReportComment(
+            user_id=test_employee_user.id, manager_id=test_manager_user.id,
+            week_number=6, year=2026, content="不错", is_reviewed=True
+        ))
+        refresh_weekly_stats(db_session, [(test_employee_user.id, 2026, 6)])
+        db_session.commit()
+
+        resp = client.get("/api/dashboard/team", params={"year": 2026, "week_number": 6}, headers=manager_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["team_size"] == 1
+        member = data["team_members"][0]
+        assert member["user_id"] == test_employee_user.id
+        assert member["total_tasks"] == 3
+        assert member["completed_tasks"] == 1
+        assert member["delayed_tasks"] == 1
+        assert round(member["completion_rate"], 2) == 33.33
+        assert member["review_status"] == "已审阅"
+        assert member["key_tasks_summary"] == {"total": 2, "completed": 1}
+
+        # 其他周无任务时统计为0
+        resp = client.get("/api/dashboard/team", params={"year": 2026, "week_number": 7}, headers=manager_headers)
+        member = resp.json()["team_members"][0]
+        assert member["total_tasks"] == 0 and member["review_status"] == "未提交"
+
+        # 评论按周键过滤
+        params = {"user_id": test_employee_user.id, "year": 2026}
+        comments = client.get("/api/dashboard/team/comments/", params={**params, "week_number": 6}, headers=manager_headers)
+        assert [c["content"] for c in comments.json()] == ["不错"]
+        comments = client.get("/api/dashboard/team/comments/", params={**params, "week_number": 7}, headers=manager_headers)
+        assert comments.json() == []
+
+    def test_team_views_full_hierarchy(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试 depth=all：递归解析整个下属树并按子团队汇总"""
+        def add_user(name, manager_id):
+            user = User(
+                username=name, email=f"{name}@test.com", full_name=name,
+                hashed_password="x", user_type="employee", manager_id=manager_id, is_active=True
+            )
+            db_session.add(user)
+            db_session.flush()
+            return user
+
+        lead_a = add_user("lead_a", test_admin_user.id)
+        lead_b = add_user("lead_b", test_admin_user.id)
+        member_a1 = add_user("member_a1", lead_a.id)
+        member_a2 = add_user("member_a2", member_a1.id)  # 第三层
+
+        start = datetime(2026, 5, 4, 9, 0)  # 2026-W19
+        for owner, task_status in [
+            (member_a1, TaskStatus.COMPLETED),
+            (member_a2, TaskStatus.TODO),
+            (lead_b, TaskStatus.DELAYED),
+        ]:
+            make_task(owner, "层级任务", 2026, 19, start=start, status=task_status)
+        refresh_weekly_stats(db_session, [(u.id, 2026, 19) for u in (member_a1, member_a2, lead_b)])
+        rebuild_user_hierarchy(db_session)
+        db_session.commit()
+
+        params = {"year": 2026, "week_number": 19}
+        direct = client.get("/api/dashboard/team", params=params, headers=auth_headers).json()
+        assert direct["depth"] == "direct" and "sub_teams" not in direct
+        assert [m["user_id"] for m in direct["team_members"]] == [lead_a.id, lead_b.id]
+
+        resp = client.get("/api/dashboard/team", params={**params, "depth": "all"}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["division_size"] == 4
+        assert data["division_summary"]["total_tasks"] == 3
+        team_a, team_b = data["sub_teams"]
+        assert (team_a["leader_id"], team_a["member_count"], team_a["total_tasks"], team_a["completed_tasks"]) == \
+            (lead_a.id, 3, 2, 1)
+        assert (team_b["leader_id"], team_b["member_count"], team_b["delayed_tasks"]) == (lead_b.id, 1, 1)
+
+        resp = client.get(
+            "/api/dashboard/reports",
+            params={"start_date": "2026-05-01", "end_date": "2026-05-31", "depth": "all"},
+            headers=auth_headers
+        )
+        report = resp.json()
+        assert report["summary"]["total_tasks"] == 3
+        assert len(report["member_performance"]) == 5  # 本人 + 4 名下属
+        assert [(t["leader_id"], t["member_count"], t["total_tasks"]) for t in report["sub_team_performance"]] == [
+            (lead_a.id, 3, 2), (lead_b.id, 1, 1)
+        ]
+
+        resp = client.get("/api/dashboard/team", params={**params, "depth": "deep"}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_team_views_branch_under_inactive_leader(
+        self, client, auth_headers, db_session, test_admin_user, make_task
+    ):
+        """测试 depth=all：负责人已停用的分支仍列为子团队，各子团队之和与整体汇总一致"""
+        def add_user(name, manager_id, is_active=True):
+            user = User(
+                username=name, email=f"{name}@test.com", full_name=name,
+                hashed_password="x", user_type="employee", manager_id=manager_id, is_active=is_active
+            )
+            db_session.add(user)
+            db_session.flush()
+            return user
+
+        lead_a = add_user("lead_a", test_admin_user.id)
+        lead_d = add_user("lead_d", test_admin_user.id, is_active=False)
+        member_x = add_user("member_x", lead_d.id)
+
+        start = datetime(2026, 5, 4, 9, 0)  # 2026-W19
+        for owner in (lead_a, member_x):
+            make_task(owner, "层级任务", 2026, 19, start=start)
+        refresh_weekly_stats(db_session, [(u.id, 2026, 19) for u in (lead_a, member_x)])
+        rebuild_user_hierarchy(db_session)
+        db_session.commit()
+
+        data = client.get(
+            "/api/dashboard/team", params={"year": 2026, "week_number": 19, "depth": "all"}, headers=auth_headers
+        ).json()
+        assert [m["user_id"] for m in data["team_members"]] == [lead_a.id]
+        assert [(t["leader_id"], t["leader_name"], t["member_count"], t["total_tasks"]) for t in data["sub_teams"]] == [
+            (lead_a.id, "lead_a", 1, 1), (lead_d.id, "lead_d", 1, 1)
+        ]
+        assert data["division_size"] == sum(t["member_count"] for t in data["sub_teams"]) == 2
+        assert data["division_summary"]["total_tasks"] == sum(t["total_tasks"] for t in data["sub_teams"]) == 2
+
+    def test_member_detail_projection(
+        self, client, manager_headers, db_session, test_employee_user, test_role, make_task
+    ):
+        """测试成员详情：按字段投影返回任务及复盘、岗位，并支持按岗位过滤"""
+        role_type_id = test_role.responsibilities[0].task_types[0].id
+        other_type_id = db_session.query(TaskType.id).filter(
+            TaskType.responsibility_id != test_role.responsibilities[0].id
+        ).first()[0]
+        test_employee_user.roles.append(test_role)
+        tasks = [
+            make_task(test_employee_user, title, 2026, 8, status=TaskStatus.COMPLETED, linked_task_type_id=type_id)
+            for title, type_id in (("岗位任务", role_type_id), ("其他任务", other_type_id))
+        ]
+        db_session.flush()
+        db_session.add(TaskReview(task_id=tasks[0].id, is_completed=False, incomplete_reason="资源不足"))
+        db_session.commit()
+
+        url = f"/api/dashboard/team/member/{test_employee_user.id}"
+        resp = client.get(url, params={"year": 2026, "week_number": 8}, headers=manager_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["member"] == {
+            "id": test_employee_user.id,
+            "name": test_employee_user.full_name,
+            "roles": [{"id": test_role.id, "name": test_role.name}]
+        }
+        by_title = {t["title"]: t for t in data["tasks"]}
+        assert set(by_title) == {"岗位任务", "其他任务"}
+        assert "_sa_instance_state" not in by_title["岗位任务"]
+        assert by_title["岗位任务"]["review"]["incomplete_reason"] == "资源不足"
+        assert by_title["岗位任务"]["review"]["task_id"] == tasks[0].id
+        assert by_title["其他任务"]["review"] is None
+
+        # 管理者不能查看汇报链以外的成员
+        outsider = User(
+            username="outsider", email="outsider@test.com", full_name="其他部门员工",
+            hashed_password="x", user_type="employee", is_active=True
+        )
+        db_session.add(outsider)
+        db_session.commit()
+        resp = client.get(
+            f"/api/dashboard/team/member/{outsider.id}",
+            params={"year": 2026, "week_number": 8}, headers=manager_headers
+        )
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+        resp = client.get(url, params={"year": 2026, "week_number": 8, "role_id": test_role.id}, headers=manager_headers)
+        assert [t["title"] for t in resp.json()["tasks"]] == ["岗位任务"]
+
+
+@pytest.mark.dashboard
+class TestReports:
+    """统计报表、缓存、导出与时长分布"""
+
+    def test_reports_grouped_aggregation(self, client, auth_headers, db_session, test_admin_user, task_type_id, make_task):
+        """测试统计报表：汇总、周趋势、成员绩效、任务类型统计"""
+        task_type = db_session.get(TaskType, task_type_id)
+        base = datetime(2026, 3, 2, 9, 0)  # 2026-W10 周一
+        specs = [
+            # (周偏移, 状态, 重点, 实际耗时天数)
+            (0, TaskStatus.COMPLETED, True, 1),
+            (0, TaskStatus.DELAYED, False, None),
+            (1, TaskStatus.COMPLETED, False, 3),
+            (1, TaskStatus.TODO, True, None),
+        ]
+        tasks = []
+        for offset, task_status, is_key, days in specs:
+            start = base + timedelta(days=7 * offset)
+            tasks.append(make_task(
+                test_admin_user, "报表任务", 2026, 10 + offset, start=start,
+                status=task_status, is_key_task=is_key,
+                planned_end_time=start + timedelta(hours=2), planned_duration=120,
+                actual_start_time=start if days else None,
+                actual_end_time=start + timedelta(days=days - 1, hours=1) if days else None
+            ))
+        db_session.flush()
+        db_session.add(TaskReview(task_id=tasks[0].id, is_completed=True))
+        db_session.commit()
+
+        resp = client.get(
+            "/api/dashboard/reports",
+            params={"start_date": "2026-03-02", "end_date": "2026-03-15"},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["summary"] == {
+            "total_tasks": 4, "completed_tasks": 2, "key_tasks": 2, "delayed_tasks": 1,
+            "completion_rate": 50.0, "key_completion_rate": 50.0, "delay_rate": 25.0
+        }
+        assert data["status_distribution"] == {"completed": 2, "in_progress": 0, "todo": 1, "delayed": 1}
+        assert [(w["year"], w["week"], w["total"], w["completed"]) for w in data["weekly_trend"]] == [
+            (2026, 10, 2, 1), (2026, 11, 2, 1)
+        ]
+
+        member = data["member_performance"][0]
+        assert member["member_name"] == test_admin_user.full_name
+        assert member["total_tasks"] == 4 and member["key_tasks"] == 2
+        assert member["avg_completion_days"] == 2.0
+        assert member["reviewed_weeks"] == 1
+
+        assert data["task_type_stats"] == [{
+            "task_type": task_type.name,
+            "responsibility": task_type.responsibility.name,
+            "count": 4, "completed": 2, "in_progress": 0, "todo": 1,
+            "completion_rate": 50.0, "avg_days": 2.0
+        }]
+
+    def test_reports_cache_hit_and_invalidation(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试统计报表缓存：重复请求命中，范围内用户任务变更后失效"""
+        task = make_task(test_admin_user, "缓存报表任务", 2026, 15, start=datetime(2026, 4, 6, 9, 0))
+        db_session.commit()
+
+        params = {"start_date": "2026-04-01", "end_date": "2026-04-30"}
+
+        def report_stats():
+            stats = client.get("/api/dashboard/cache-stats", headers=auth_headers).json()
+            return next(item for item in stats if item["name"] == "report")
+
+        first = client.get("/api/dashboard/reports", params=params, headers=auth_headers).json()
+        second = client.get("/api/dashboard/reports", params=params, headers=auth_headers).json()
+        assert first == second
+        stats = report_stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+        # 范围内用户的任务变更后重新计算
+        client.post("/api/tasks/bulk", json={"task_ids": [task.id], "operation": "set_status", "status": "completed"},
+                    headers=auth_headers)
+        third = client.get("/api/dashboard/reports", params=params, headers=auth_headers).json()
+        assert third["summary"]["completed_tasks"] == 1
+        assert report_stats()["misses"] == 2
+
+    def test_reports_export_streaming(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试报表导出：XLSX 多工作表与 CSV 分段，任务明细逐行写出"""
+        start = datetime(2026, 4, 6, 9, 0)
+        tasks = [
+            make_task(
+                test_admin_user, f"导出任务{i}", 2026, 15, start=start + timedelta(hours=i),
+                status=TaskStatus.COMPLETED if i == 0 else TaskStatus.TODO
+            )
+            for i in range(3)
+        ]
+        db_session.flush()
+        db_session.add(TaskReview(task_id=tasks[0].id, is_completed=True))
+        db_session.commit()
+        params = {"start_date": "2026-04-06", "end_date": "2026-04-12"}
+
+        resp = client.get("/api/dashboard/reports/export", params=params, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.headers["content-type"].startswith("application/vnd.openxmlformats")
+        assert "attachment" in resp.headers["content-disposition"]
+        package = zipfile.ZipFile(io.BytesIO(resp.content))
+        assert package.testzip() is None
+        workbook = package.read("xl/workbook.xml").decode()
+        for name in ("数据概要", "任务类型统计", "团队绩效", "任务明细"):
+            assert f'name="{name}"' in workbook
+        detail = package.read("xl/worksheets/sheet4.xml").decode()
+        assert detail.count("<row>") == 4
+        assert "导出任务2" in detail and "已完成" in detail and "未复盘" in detail
+
+        resp = client.get("/api/dashboard/reports/export", params={**params, "format": "csv"}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        text = resp.content.decode("utf-8-sig")
+        assert "总任务数,3" in text
+        assert text.count("导出任务") == 3
+
+        resp = client.get("/api/dashboard/reports/export", params={**params, "format": "pdf"}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_reports_duration_distribution(
+        self, client, auth_headers, db_session, test_admin_user, task_type_id, make_task
+    ):
+        """测试时长分布：分位数、偏差比直方图与估算偏差比"""
+        start = datetime(2026, 5, 4, 9, 0)
+        for i, actual in enumerate([30, 60, 90, 120, 240, None]):
+            make_task(
+                test_admin_user, "时长任务", 2026, 19, start=start + timedelta(hours=i),
+                status=TaskStatus.COMPLETED if actual else TaskStatus.IN_PROGRESS, actual_duration=actual
+            )
+        db_session.commit()
+
+        resp = client.get(
+            "/api/dashboard/reports/durations",
+            params={"start_date": "2026-05-04", "end_date": "2026-05-10"},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["ratio_bucket_edges"] == [0.5, 0.8, 1.0, 1.25, 1.5, 2.0]
+        by_type = data["by_task_type"]
+        assert [item["task_type_id"] for item in by_type] == [task_type_id]
+        stats = by_type[0]
+        assert stats["count"] == 5
+        assert (stats["planned_p50"], stats["planned_p90"]) == (60.0, 60.0)
+        assert (stats["actual_p50"], stats["actual_p90"]) == (90.0, 192.0)
+        assert (stats["ratio_p50"], stats["ratio_p90"]) == (1.5, 3.2)
+        assert stats["bias_ratio"] == 1.8
+        assert stats["ratio_histogram"] == [0, 1, 0, 1, 0, 1, 2]
+
+        user_stats = data["by_user"][0]
+        assert user_stats["user_id"] == test_admin_user.id
+        assert user_stats["user_name"] == test_admin_user.full_name
+        assert user_stats["actual_p90"] == 192.0
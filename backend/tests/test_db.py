@@ -0,0 +1,110 @@
+"""
+数据库引擎测试
+测试连接池配置与统计、SQLite 文件库 PRAGMA，以及异步会话（aiosqlite）
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import Base, create_async_db_engine, create_db_engine
+from app.db.pool import pool_stats
+from app.db.sqlite import SqliteOptimizeScheduler
+from app.models.llm_config import LLMConfig
+from app.models.task import TaskStatus, WeeklyTask
+from app.models.user import User
+from app.services.ai_service import AIAnalysisService
+
+
+@pytest.mark.db
+class TestDatabaseEngines:
+    """同步/异步引擎与连接池"""
+
+    def test_db_pool_settings_and_stats(self, client, auth_headers, tmp_path, monkeypatch):
+        """测试连接池：按配置创建，统计占用、溢出与取连接超时；管理员接口返回连接池状态"""
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+        monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0)
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        try:
+            first, second = engine.connect(), engine.connect()
+            stats = pool_stats(engine)
+            assert (stats["size"], stats["checked_out"], stats["overflow"]) == (1, 2, 1)
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            first.close()
+            second.close()
+
+            stats = pool_stats(engine)
+            assert stats["pool_class"] == "InstrumentedQueuePool"
+            assert (stats["checked_out"], stats["checkouts"], stats["timeouts"]) == (0, 3, 1)
+        finally:
+            engine.dispose()
+
+        resp = client.get("/api/dashboard/pool-stats", headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        assert "pool_class" in resp.json()
+
+    def test_sqlite_file_engine_pragmas(self, tmp_path):
+        """测试 SQLite 文件库：每个连接启用 WAL 等 PRAGMA，PRAGMA optimize 可定期执行"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+        try:
+            with engine.begin() as writer:
+                writer.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+            with engine.connect() as writer, engine.connect() as reader:
+                pragmas = {
+                    name: reader.exec_driver_sql(f"PRAGMA {name}").scalar()
+                    for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "temp_store")
+                }
+                assert pragmas == {
+                    "journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000,
+                    "cache_size": -65536, "temp_store": 2
+                }
+                # 写事务未提交时读连接不被阻塞，读到提交前的快照
+                writer.execute(text("INSERT INTO t (id) VALUES (1)"))
+                assert reader.execute(text("SELECT COUNT(*) FROM t")).scalar() == 0
+                writer.commit()
+            assert SqliteOptimizeScheduler(engine).run_once() is True
+        finally:
+            engine.dispose()
+
+    def test_ai_service_uses_async_session(self, tmp_path):
+        """测试 AI 分析服务经 AsyncSession（aiosqlite）读取大模型配置与分析数据"""
+        pytest.importorskip("aiosqlite")
+        url = f"sqlite:///{tmp_path / 'ai.db'}"
+        sync_engine = create_engine(url)
+        Base.metadata.create_all(sync_engine)
+        now = datetime(2026, 5, 4, 9, 0)
+        with Session(sync_engine) as db:
+            user = User(username="async_user", email="async@example.com", full_name="异步用户", hashed_password="x")
+            db.add_all([user, LLMConfig(name="测试", provider="openai", api_key="k", model_name="m", is_active=True)])
+            db.flush()
+            db.add(WeeklyTask(
+                user_id=user.id, title="异步任务", year=2026, week_number=19, status=TaskStatus.COMPLETED,
+                source_type="responsibility", linked_task_type_id=1,
+                planned_start_time=now, planned_end_time=now + timedelta(hours=1), planned_duration=60
+            ))
+            db.commit()
+            user_id = user.id
+        sync_engine.dispose()
+
+        async def run():
+            engine = create_async_db_engine(url)
+            try:
+                async with AsyncSession(engine) as db:
+                    service = AIAnalysisService(db)
+                    config = await service.get_active_llm_config()
+                    data = await service.prepare_analysis_data(user_id, "2026-05-04", "2026-05-10")
+                    return config.name, data
+            finally:
+                await engine.dispose()
+
+        config_name, data = asyncio.run(run())
+        assert config_name == "测试"
+        assert data["user_name"] == "异步用户"
+        assert [task["title"] for task in data["task_details"]] == ["异步任务"]
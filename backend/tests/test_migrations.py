@@ -0,0 +1,27 @@
+"""
+数据库迁移测试
+测试 Alembic 迁移升级后的表结构与模型定义一致
+"""
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from app.db.base import Base
+from app.db.migrations import upgrade_database
+
+
+@pytest.mark.db
+class TestMigrations:
+    """Alembic 迁移"""
+
+    def test_migrations_match_models(self, tmp_path):
+        """测试 Alembic 迁移升级后的表结构与模型一致（含新增索引）"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+        upgrade_database(engine)
+        with engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+            indexes = {index["name"] for index in inspect(connection).get_indexes("report_comments")}
+        engine.dispose()
+        assert diff == []
+        assert "idx_comment_user_iso_week_manager" in indexes
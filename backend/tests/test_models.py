@@ -295,3 +295,26 @@ class TestTaskModel:
 
         assert len(key_tasks) == 1
         assert key_tasks[0].title == "重点任务"
+
+    def test_iso_week_key_cross_year_range(self, db_session, test_admin_user, make_task):
+        """测试 ISO 周键：随写入生成，跨年（含第53周）区间一次范围查询"""
+        from app.services.ai_service import prepare_analysis_data
+
+        tasks = {
+            (year, week): make_task(test_admin_user, f"{year}-W{week}", year, week)
+            for year, week in ((2026, 52), (2026, 53), (2027, 1), (2027, 2))
+        }
+        db_session.commit()
+        assert tasks[(2026, 53)].iso_week_key == 202653
+
+        # 批量修改周次后周键同步
+        db_session.query(WeeklyTask).filter(WeeklyTask.id == tasks[(2027, 2)].id).update(
+            {WeeklyTask.week_number: 3}, synchronize_session=False
+        )
+        db_session.commit()
+        db_session.expire_all()
+        assert tasks[(2027, 2)].iso_week_key == 202703
+
+        # 2026-12-28 为 2026-W53 周一，2027-01-10 为 2027-W01 周日
+        data = prepare_analysis_data(db_session, test_admin_user.id, "2026-12-28", "2027-01-10")
+        assert [task["title"] for task in data["task_details"]] == ["2026-W53", "2027-W1"]
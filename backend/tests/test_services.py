@@ -0,0 +1,184 @@
+"""
+服务层测试
+测试用户-周汇总维护、汇报关系闭包表、全员未复盘兜底批处理与 AI 分析数据准备
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.models.task import ReviewFallbackRun, TaskStatus, WeeklyTask, WeeklyUserStats
+from app.models.user import UserHierarchy
+from app.services.ai_service import prepare_analysis_data
+from app.services.hierarchy_service import is_subordinate, rebuild_user_hierarchy
+from app.services.review_fallback_job import ReviewFallbackJob
+from app.services.weekly_stats_service import rebuild_weekly_stats, refresh_weekly_stats
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.mark.integration
+class TestWeeklyUserStats:
+    """用户-周汇总表"""
+
+    def test_weekly_user_stats_maintained(self, client, auth_headers, db_session, test_admin_user, task_type_id):
+        """测试用户-周汇总随任务新增、修改、复盘、删除同步更新，且与全量重建结果一致"""
+        now = datetime.now()
+        task_ids = []
+        for i, is_key in enumerate([True, False, False]):
+            resp = client.post("/api/tasks/", json={
+                "title": f"汇总任务{i}",
+                "year": 2026,
+                "week_number": 8,
+                "is_key_task": is_key,
+                "source_type": "responsibility",
+                "linked_task_type_id": task_type_id,
+                "planned_start_time": now.isoformat(),
+                "planned_end_time": (now + timedelta(hours=1)).isoformat()
+            }, headers=auth_headers)
+            assert resp.status_code == status.HTTP_201_CREATED
+            task_ids.append(resp.json()["id"])
+
+        def stats():
+            db_session.expire_all()
+            return db_session.query(WeeklyUserStats).filter_by(
+                user_id=test_admin_user.id, year=2026, week_number=8
+            ).one()
+
+        row = stats()
+        assert (row.total_tasks, row.todo_tasks, row.key_tasks, row.planned_duration_total) == (3, 3, 1, 180)
+
+        client.put(f"/api/tasks/{task_ids[0]}", json={"status": "completed"}, headers=auth_headers)
+        client.post("/api/tasks/reviews/", json={
+            "task_id": task_ids[1], "is_completed": False,
+            "incomplete_reason": "资源不足", "follow_up_action": "cancel"
+        }, headers=auth_headers)
+        client.post("/api/tasks/bulk", json={"task_ids": [task_ids[2]], "operation": "delete"}, headers=auth_headers)
+
+        row = stats()
+        assert (row.total_tasks, row.todo_tasks, row.completed_tasks, row.cancelled_tasks) == (2, 0, 1, 1)
+        assert (row.key_tasks, row.key_completed_tasks, row.reviewed_tasks) == (1, 1, 1)
+        snapshot = {c.name: getattr(row, c.name) for c in WeeklyUserStats.__table__.columns
+                    if c.name not in ("id", "updated_at")}
+
+        assert rebuild_weekly_stats(db_session) == 1
+        db_session.commit()
+        row = stats()
+        assert {c: getattr(row, c) for c in snapshot} == snapshot
+
+
+@pytest.mark.integration
+class TestUserHierarchy:
+    """汇报关系闭包表"""
+
+    def test_user_hierarchy_closure_maintained(self, client, auth_headers, db_session, test_admin_user):
+        """测试汇报关系闭包表随创建/调整上级同步，并支持跨级判断与防环"""
+        def create(name, manager_id=None):
+            resp = client.post("/api/users/", json={
+                "username": name, "email": f"{name}@test.com", "full_name": name,
+                "password": "secret123", "user_type": "manager", "manager_id": manager_id
+            }, headers=auth_headers)
+            assert resp.status_code == status.HTTP_201_CREATED, resp.text
+            return resp.json()["id"]
+
+        director = create("director")
+        lead = create("lead", director)
+        staff = create("staff", lead)
+        other = create("other_lead")
+
+        def closure():
+            db_session.expire_all()
+            return {(r.ancestor_id, r.descendant_id, r.depth) for r in db_session.query(UserHierarchy)}
+
+        assert closure() == {(director, lead, 1), (lead, staff, 1), (director, staff, 2)}
+        assert is_subordinate(db_session, director, staff)
+        assert not is_subordinate(db_session, staff, director)
+
+        # 整个分支迁移到新上级
+        resp = client.put(f"/api/users/{lead}", json={"manager_id": other}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        assert closure() == {(other, lead, 1), (lead, staff, 1), (other, staff, 2)}
+
+        # 不能把下属设为上级
+        resp = client.put(f"/api/users/{other}", json={"manager_id": staff}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+        # 全量重建与增量维护结果一致
+        expected = closure()
+        rebuild_user_hierarchy(db_session)
+        db_session.commit()
+        assert closure() == expected
+
+
+@pytest.mark.integration
+class TestReviewFallbackJob:
+    """全员未复盘兜底批处理"""
+
+    def test_review_fallback_job_chunks_and_resumes(
+        self, db_session, test_admin_user, test_employee_user, make_task
+    ):
+        """测试全员兜底批处理：分批处理所有在职用户，并可从断点续跑"""
+        now = datetime.now()
+        for owner in (test_admin_user, test_employee_user):
+            make_task(owner, f"{owner.username}未复盘任务", 2025, 10, start=now)
+        # 模拟上次执行在处理完管理员后中断
+        db_session.add(ReviewFallbackRun(
+            year=2025,
+            week_number=10,
+            status="failed",
+            last_user_id=test_admin_user.id,
+            total_users=3,
+            processed_users=1,
+            processed_chunks=1,
+            created_tasks=0,
+            elapsed_seconds=0.5,
+            updated_at=now
+        ))
+        db_session.commit()
+
+        run_id = ReviewFallbackJob(TestingSessionLocal, chunk_size=1).run(2025, 10)
+        assert run_id is not None
+
+        db_session.expire_all()
+        run = db_session.get(ReviewFallbackRun, run_id)
+        assert run.status == "completed"
+        assert run.processed_users == run.total_users
+        assert run.processed_chunks >= 2
+        assert run.created_tasks == 1
+
+        statuses = {
+            t.user_id: t.status
+            for t in db_session.query(WeeklyTask).filter(WeeklyTask.week_number == 10)
+        }
+        # 断点之前的用户不会被重复处理
+        assert statuses[test_admin_user.id] == TaskStatus.TODO
+        assert statuses[test_employee_user.id] == TaskStatus.DELAYED
+        assert db_session.query(WeeklyTask).filter(WeeklyTask.week_number == 11).count() == 1
+
+        # 已完成的周不会再次执行
+        assert ReviewFallbackJob(TestingSessionLocal).run(2025, 10) is None
+
+
+@pytest.mark.ai
+class TestAIAnalysisData:
+    """AI 分析数据准备"""
+
+    def test_ai_analysis_statistics_from_weekly_rollup(self, db_session, test_admin_user, make_task):
+        """测试 AI 分析数据：统计取自用户-周汇总表，任务详情仍按周键区间读取"""
+        start = datetime(2026, 5, 4, 9, 0)
+        for title, task_status, is_key in (
+            ("完成重点", TaskStatus.COMPLETED, True),
+            ("完成普通", TaskStatus.COMPLETED, False),
+            ("延期普通", TaskStatus.DELAYED, False),
+        ):
+            make_task(test_admin_user, title, 2026, 19, start=start, status=task_status, is_key_task=is_key)
+        refresh_weekly_stats(db_session, [(test_admin_user.id, 2026, 19)])
+        db_session.commit()
+
+        data = prepare_analysis_data(db_session, test_admin_user.id, "2026-05-04", "2026-05-10")
+        assert data["statistics"] == {
+            "total_tasks": 3, "completed_tasks": 2, "completion_rate": 66.7,
+            "key_tasks": 1, "key_completed": 1, "key_completion_rate": 100.0,
+            "delayed_tasks": 1, "delay_rate": 33.3
+        }
+        assert [task["title"] for task in data["task_details"]] == ["完成重点", "完成普通", "延期普通"]
+        assert prepare_analysis_data(db_session, test_admin_user.id, "2026-05-11", "2026-05-17")["statistics"]["total_tasks"] == 0
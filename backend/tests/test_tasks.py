@@ -4,7 +4,7 @@
 """
 import pytest
 from fastapi import status
-from app.models.task import TaskStatus, FollowUpAction
+from app.models.task import TaskStatus
 from datetime import datetime, timedelta
 
 
@@ -454,3 +454,378 @@ class TestTasks:
         # 非直属（如 admin）应拒绝
         resp_forbidden = client.post(f"/api/tasks/assign/?user_id={test_admin_user.id}", json=payload, headers=manager_headers)
         assert resp_forbidden.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_bulk_update_tasks(
+        self, client, auth_headers, db_session, test_admin_user, test_employee_user, make_task
+    ):
+        """测试批量操作：状态、重点标记、软删除，并逐项返回结果"""
+        from app.models.task import WeeklyTask
+
+        now = datetime.now()
+        tasks = [
+            make_task(test_admin_user, "批量任务1", 2025, 1, start=now),
+            make_task(test_admin_user, "批量任务2", 2025, 1, start=now, actual_start_time=now - timedelta(minutes=30)),
+            make_task(test_employee_user, "他人任务", 2025, 1, start=now),
+        ]
+        db_session.commit()
+        own_ids = [tasks[0].id, tasks[1].id]
+        other_id = tasks[2].id
+
+        # 批量完成：自己的任务成功，他人任务和不存在的任务逐项失败
+        resp = client.post(
+            "/api/tasks/bulk",
+            json={"task_ids": own_ids + [other_id, 999999], "operation": "set_status", "status": "completed"},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["succeeded_count"] == 2
+        assert data["failed_count"] == 2
+        assert [r["success"] for r in data["results"]] == [True, True, False, False]
+
+        db_session.expire_all()
+        completed = db_session.query(WeeklyTask).filter(WeeklyTask.id.in_(own_ids)).all()
+        assert all(t.status == TaskStatus.COMPLETED and t.completed_at for t in completed)
+        by_id = {t.id: t for t in completed}
+        assert by_id[tasks[0].id].actual_duration is None
+        assert by_id[tasks[1].id].actual_duration >= 30
+        assert db_session.get(WeeklyTask, other_id).status == TaskStatus.TODO
+
+        # 批量标记重点
+        resp = client.post(
+            "/api/tasks/bulk",
+            json={"task_ids": own_ids, "operation": "set_key_task", "is_key_task": True},
+            headers=auth_headers
+        )
+        assert resp.json()["succeeded_count"] == 2
+
+        # 批量删除后不再出现在任务列表中
+        resp = client.post(
+            "/api/tasks/bulk",
+            json={"task_ids": own_ids, "operation": "delete"},
+            headers=auth_headers
+        )
+        assert resp.json()["succeeded_count"] == 2
+        my_tasks = client.get("/api/tasks/my-tasks", headers=auth_headers).json()
+        assert not [t for t in my_tasks if t["id"] in own_ids]
+
+        # 缺少目标状态应拒绝
+        resp = client.post(
+            "/api/tasks/bulk",
+            json={"task_ids": own_ids, "operation": "set_status"},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+        # 单次最多 200 个任务，与整周计划上限一致
+        resp = client.post(
+            "/api/tasks/bulk",
+            json={"task_ids": list(range(1, 202)), "operation": "delete"},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_get_my_tasks_keyset_pagination(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试我的任务游标分页、状态过滤与总数"""
+        now = datetime.now()
+        for i in range(5):
+            make_task(
+                test_admin_user, f"分页任务{i}", 2025, 1, start=now,
+                status=TaskStatus.COMPLETED if i == 4 else TaskStatus.TODO,
+                is_key_task=i in (1, 3)
+            )
+        db_session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "with_total": "true"}
+            if cursor:
+                params["cursor"] = cursor
+            resp = client.get("/api/tasks/my-tasks", params=params, headers=auth_headers)
+            assert resp.status_code == status.HTTP_200_OK
+            assert resp.headers["X-Total-Count"] == "5"
+            page = resp.json()
+            assert len(page) <= 2
+            seen.extend(page)
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        # 重点任务置顶，且分页无重复无遗漏
+        assert [t["title"] for t in seen] == ["分页任务1", "分页任务3", "分页任务0", "分页任务2", "分页任务4"]
+
+        resp = client.get("/api/tasks/my-tasks", params={"status": "completed"}, headers=auth_headers)
+        assert [t["title"] for t in resp.json()] == ["分页任务4"]
+
+        resp = client.get("/api/tasks/my-tasks", params={"limit": 2, "cursor": "invalid"}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_weekly_report_cached_and_invalidated(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试周报缓存：重复读取命中缓存，复盘写入后失效"""
+        from app.core.cache import weekly_report_cache
+        from app.services.data_version import bump_data_version
+
+        task = make_task(test_admin_user, "周报任务", 2025, 3, is_key_task=True)
+        db_session.commit()
+
+        params = {"year": 2025, "week_number": 3}
+        report = client.get("/api/tasks/weekly-report", params=params, headers=auth_headers).json()
+        assert report["summary"]["total_tasks"] == 1
+        assert report["key_tasks"][0]["review"] is None
+        db_session.refresh(test_admin_user)
+        old_key = (test_admin_user.id, test_admin_user.data_version, 2025, 3)
+        assert weekly_report_cache.get(old_key) is not None
+
+        resp = client.post(
+            "/api/tasks/reviews/",
+            json={"task_id": task.id, "is_completed": True},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+
+        report = client.get("/api/tasks/weekly-report", params=params, headers=auth_headers).json()
+        assert report["summary"]["completed_count"] == 1
+        assert report["key_tasks"][0]["review"]["is_completed"] is True
+
+        # 其他worker的写入不会清除本进程缓存，但递增 data_version 后旧key不再命中
+        make_task(test_admin_user, "其他进程写入", 2025, 3)
+        bump_data_version(db_session, [test_admin_user.id])
+        db_session.commit()
+        report = client.get("/api/tasks/weekly-report", params=params, headers=auth_headers).json()
+        assert report["summary"]["total_tasks"] == 2
+
+    def test_review_fallback_skips_reviewed_tasks(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试未复盘兜底批量处理：已复盘任务不重复兜底，新任务按源任务顺序返回"""
+        from app.models.task import WeeklyTask, TaskReview
+
+        tasks = [
+            make_task(
+                test_admin_user, f"兜底任务{i}", 2025, 52,
+                status=TaskStatus.IN_PROGRESS if i == 1 else TaskStatus.TODO
+            )
+            for i in range(3)
+        ]
+        db_session.commit()
+        db_session.add(TaskReview(task_id=tasks[2].id, is_completed=True))
+        db_session.commit()
+
+        resp = client.post(
+            "/api/tasks/reviews/fallback",
+            json={"week_number": 52, "year": 2025},
+            headers=auth_headers
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        created_ids = resp.json()["created_task_ids"]
+        assert len(created_ids) == 2
+
+        db_session.expire_all()
+        created = [db_session.get(WeeklyTask, task_id) for task_id in created_ids]
+        assert [t.title for t in created] == ["兜底任务0", "兜底任务1"]
+        assert all((t.year, t.week_number) == (2026, 1) for t in created)
+        assert db_session.get(WeeklyTask, tasks[2].id).status == TaskStatus.TODO
+        assert db_session.query(TaskReview).count() == 3
+
+        # 再次兜底不应重复处理
+        resp = client.post(
+            "/api/tasks/reviews/fallback",
+            json={"week_number": 52, "year": 2025},
+            headers=auth_headers
+        )
+        assert resp.json()["created_task_ids"] == []
+
+    def test_create_task_allowed_task_type_cache_invalidation(
+        self, client, auth_headers, test_admin_user, test_role, init_roles
+    ):
+        """测试任务类型授权缓存：关联岗位、停用任务类型后立即生效"""
+        from app.core.cache import allowed_task_type_cache
+
+        task_type_id = test_role.responsibilities[0].task_types[0].id
+        now = datetime.now()
+        task_data = {
+            "title": "授权缓存任务",
+            "year": 2025,
+            "week_number": 5,
+            "linked_task_type_id": task_type_id,
+            "planned_start_time": now.isoformat(),
+            "planned_end_time": (now + timedelta(hours=1)).isoformat()
+        }
+
+        # 未关联岗位时拒绝（同时写入缓存）
+        resp = client.post("/api/tasks/", json=task_data, headers=auth_headers)
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+        client.post(f"/api/users/{test_admin_user.id}/roles/{test_role.id}", headers=auth_headers)
+        resp = client.post("/api/tasks/", json=task_data, headers=auth_headers)
+        assert resp.status_code == status.HTTP_201_CREATED
+
+        # 缓存按 data_version 分key：其他worker中的旧条目不会被清除，但也不再命中
+        stale_keys = [key for key, _ in allowed_task_type_cache._data.items() if key[0] == test_admin_user.id]
+
+        client.put(f"/api/roles/task-types/{task_type_id}/deactivate", headers=auth_headers)
+        resp = client.post("/api/tasks/", json=task_data, headers=auth_headers)
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+        assert stale_keys and all(allowed_task_type_cache._data.get(key) is not None for key in stale_keys)
+
+        resp = client.post("/api/tasks/", json={**task_data, "linked_task_type_id": 999999}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_submit_week_plan(self, client, auth_headers, db_session, test_admin_user, test_role, task_type_id):
+        """测试整周计划一次提交：逐条返回错误，atomic模式整体拒绝"""
+        from app.models.task import WeeklyTask
+
+        foreign_type_id = test_role.responsibilities[0].task_types[0].id
+        now = datetime.now()
+        item = {
+            "year": 2025,
+            "week_number": 6,
+            "linked_task_type_id": task_type_id,
+            "planned_start_time": now.isoformat(),
+            "planned_end_time": (now + timedelta(hours=2)).isoformat()
+        }
+        plan = [
+            {**item, "title": "计划1"},
+            {**item, "title": "计划2", "linked_task_type_id": foreign_type_id},
+            {**item, "title": "计划3", "planned_end_time": (now - timedelta(hours=1)).isoformat()},
+            {**item, "title": "计划4", "is_key_task": True},
+        ]
+
+        resp = client.post("/api/tasks/week-plan", json={"tasks": plan, "atomic": True}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert db_session.query(WeeklyTask).count() == 0
+
+        resp = client.post("/api/tasks/week-plan", json={"tasks": plan}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_201_CREATED
+        data = resp.json()
+        assert data["created_count"] == 2
+        assert data["failed_count"] == 2
+        assert [r["success"] for r in data["results"]] == [True, False, False, True]
+        assert data["results"][1]["detail"] == "该任务类型不属于您的岗位职责范围"
+
+        created = db_session.get(WeeklyTask, data["results"][3]["task_id"])
+        assert created.title == "计划4"
+        assert created.planned_duration == 120
+
+    def test_clone_week(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试按周复制计划：时间按周差平移、状态重置、支持过滤"""
+        from app.models.task import WeeklyTask
+
+        start = datetime(2025, 12, 29, 9, 0)  # 2026-W01 周一
+        for i, (is_key, source) in enumerate([(True, "responsibility"), (False, "personal")]):
+            make_task(
+                test_admin_user, f"模板任务{i}", 2026, 1, start=start,
+                status=TaskStatus.COMPLETED, is_key_task=is_key, source_type=source,
+                planned_end_time=start + timedelta(hours=2), planned_duration=120
+            )
+        db_session.commit()
+
+        payload = {"source_year": 2026, "source_week_number": 1, "target_year": 2026, "target_week_number": 3}
+        resp = client.post("/api/tasks/clone-week", json=payload, headers=auth_headers)
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.json() == {"created_count": 2, "day_offset": 14}
+
+        cloned = db_session.query(WeeklyTask).filter(WeeklyTask.week_number == 3).order_by(WeeklyTask.id).all()
+        assert [t.title for t in cloned] == ["模板任务0", "模板任务1"]
+        assert all(t.status == TaskStatus.TODO and t.completed_at is None for t in cloned)
+        assert cloned[0].planned_start_time.replace(tzinfo=None) == start + timedelta(days=14)
+        assert cloned[0].planned_duration == 120
+
+        resp = client.post(
+            "/api/tasks/clone-week",
+            json={**payload, "target_week_number": 4, "only_key_tasks": True},
+            headers=auth_headers
+        )
+        assert resp.json()["created_count"] == 1
+
+        resp = client.post("/api/tasks/clone-week", json={**payload, "target_week_number": 1}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_clone_week_visible_in_reports(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试复制到目标周的任务按计划时间区间可被统计报表读到（SQLite 时间文本格式一致）"""
+        make_task(test_admin_user, "第10周任务", 2026, 10, start=datetime(2026, 3, 2))  # 2026-W10 周一 00:00
+        db_session.commit()
+
+        payload = {"source_year": 2026, "source_week_number": 10, "target_year": 2026, "target_week_number": 11}
+        resp = client.post("/api/tasks/clone-week", json=payload, headers=auth_headers)
+        assert resp.json()["created_count"] == 1
+
+        for start_date, end_date in (("2026-03-02", "2026-03-08"), ("2026-03-09", "2026-03-15")):
+            resp = client.get(
+                "/api/dashboard/reports", params={"start_date": start_date, "end_date": end_date}, headers=auth_headers
+            )
+            assert resp.json()["summary"]["total_tasks"] == 1
+
+    def test_conditional_get_etag(
+        self, client, auth_headers, manager_headers, db_session, test_admin_user, test_employee_user, make_task
+    ):
+        """测试ETag条件请求：未变化返回304，写入后ETag变化"""
+        from app.services.data_version import bump_data_version
+
+        task = make_task(test_admin_user, "ETag任务", 2026, 2)
+        db_session.commit()
+
+        url = "/api/tasks/my-tasks?year=2026&week_number=2"
+        resp = client.get(url, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        etag = resp.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        resp = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+        assert resp.content == b""
+
+        # 不同查询参数对应不同ETag
+        resp = client.get("/api/tasks/my-tasks?year=2026&week_number=3", headers={**auth_headers, "If-None-Match": etag})
+        assert resp.status_code == status.HTTP_200_OK
+
+        resp = client.put(f"/api/tasks/{task.id}", json={"title": "ETag任务-改"}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        resp = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.headers["ETag"] != etag
+        assert resp.json()[0]["title"] == "ETag任务-改"
+
+        # 团队仪表盘：下属数据变化时ETag失效
+        team_url = "/api/dashboard/team?year=2026&week_number=2"
+        team_etag = client.get(team_url, headers=manager_headers).headers["ETag"]
+        resp = client.get(team_url, headers={**manager_headers, "If-None-Match": team_etag})
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+        bump_data_version(db_session, [test_employee_user.id])
+        db_session.commit()
+        resp = client.get(team_url, headers={**manager_headers, "If-None-Match": team_etag})
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_task_changes_delta_sync(self, client, auth_headers, db_session, test_admin_user, make_task):
+        """测试增量同步：只返回游标之后新增/修改的任务，删除以墓碑ID返回"""
+        from app.services.data_version import bump_data_version
+
+        tasks = [make_task(test_admin_user, f"同步任务{i}", 2026, 5) for i in range(3)]
+        bump_data_version(db_session, [test_admin_user.id])
+        db_session.commit()
+        ids = [t.id for t in tasks]
+
+        resp = client.get("/api/tasks/changes", params={"year": 2026, "week_number": 5}, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        full = resp.json()
+        assert [t["id"] for t in full["changes"]] == ids
+        assert full["deleted_ids"] == [] and full["reset"] is False
+        cursor = full["cursor"]
+
+        # 无变化时增量为空
+        resp = client.get("/api/tasks/changes", params={"since": cursor}, headers=auth_headers)
+        assert resp.json()["changes"] == [] and resp.json()["cursor"] == cursor
+
+        client.put(f"/api/tasks/{ids[0]}", json={"title": "同步任务0-改"}, headers=auth_headers)
+        client.post("/api/tasks/bulk", json={"task_ids": [ids[1]], "operation": "delete"}, headers=auth_headers)
+
+        resp = client.get("/api/tasks/changes", params={"since": cursor}, headers=auth_headers)
+        delta = resp.json()
+        assert [t["title"] for t in delta["changes"]] == ["同步任务0-改"]
+        assert delta["deleted_ids"] == [ids[1]]
+        assert delta["cursor"] > cursor
+
+        # 游标超前（数据重置）时退回全量
+        resp = client.get("/api/tasks/changes", params={"since": delta["cursor"] + 100}, headers=auth_headers)
+        assert resp.json()["reset"] is True
+        assert sorted(t["id"] for t in resp.json()["changes"]) == [ids[0], ids[2]]
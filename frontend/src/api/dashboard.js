@@ -43,3 +43,14 @@ export function markAsReviewed(commentId) {
     method: 'put'
   })
 }
+
+// 导出统计报表（服务端流式生成 xlsx / csv）
+export function exportReports(params) {
+  return request({
+    url: '/dashboard/reports/export',
+    method: 'get',
+    params,
+    responseType: 'blob',
+    timeout: 0
+  })
+}
@@ -9,6 +9,24 @@ export function createTask(data) {
   })
 }
 
+// 整周计划一次提交
+export function submitWeekPlan(data) {
+  return request({
+    url: '/tasks/week-plan',
+    method: 'post',
+    data
+  })
+}
+
+// 按周复制计划
+export function cloneWeek(data) {
+  return request({
+    url: '/tasks/clone-week',
+    method: 'post',
+    data
+  })
+}
+
 // 获取我的任务列表
 export function getMyTasks(params) {
   return request({
@@ -18,6 +36,15 @@ export function getMyTasks(params) {
   })
 }
 
+// 任务增量同步：不传 since 时返回全量
+export function getTaskChanges(params) {
+  return request({
+    url: '/tasks/changes',
+    method: 'get',
+    params
+  })
+}
+
 // 获取延期任务
 export function getDelayedTasks(params = {}) {
   return request({
@@ -36,11 +63,17 @@ export function updateTask(taskId, data) {
   })
 }
 
-// 删除任务
+// 删除任务（软删除）
 export function deleteTask(taskId) {
+  return bulkUpdateTasks({ task_ids: [taskId], operation: 'delete' })
+}
+
+// 批量操作任务（set_status / set_key_task / delete）
+export function bulkUpdateTasks(data) {
   return request({
-    url: `/tasks/${taskId}`,
-    method: 'delete'
+    url: '/tasks/bulk',
+    method: 'post',
+    data
   })
 }
 
@@ -24,6 +24,9 @@ export const useCacheStore = defineStore('cache', () => {
   // 任务列表缓存（按周缓存）
   const tasksCache = ref({})
 
+  // 按周的任务增量同步缓存：{ [year_wWeek]: { tasks: { [id]: task }, cursor, timestamp } }
+  const weekTasksCache = ref({})
+
   // 仪表盘数据缓存
   const dashboardCache = ref({
     data: null,
@@ -102,6 +105,38 @@ export const useCacheStore = defineStore('cache', () => {
     return data
   }
 
+  /**
+   * 获取某周的全部任务，过期或被标记失效后通过增量同步接口只拉取变化部分
+   * @param {number} year 年份
+   * @param {number} weekNumber 周次
+   * @param {Function} fetchChangesFn 增量同步函数，参数为 { since, year, week_number }
+   * @returns {Promise<Array>} 按重点任务优先、创建顺序排列的任务列表
+   */
+  const getWeekTasks = async(year, weekNumber, fetchChangesFn) => {
+    const key = `${year}_w${weekNumber}`
+    let cache = weekTasksCache.value[key]
+
+    if (!cache || !isCacheValid(cache.timestamp)) {
+      const params = { year, week_number: weekNumber }
+      if (cache) {
+        params.since = cache.cursor
+      }
+      console.log(`[Cache] Syncing tasks for ${key} since ${cache ? cache.cursor : 'full'}`)
+      const result = await fetchChangesFn(params)
+
+      const tasks = cache && !result.reset ? { ...cache.tasks } : {}
+      result.deleted_ids.forEach(id => { delete tasks[id] })
+      result.changes.forEach(task => { tasks[task.id] = task })
+
+      cache = { tasks, cursor: result.cursor, timestamp: Date.now() }
+      weekTasksCache.value[key] = cache
+    }
+
+    return Object.values(cache.tasks).sort((a, b) =>
+      Number(b.is_key_task) - Number(a.is_key_task) || a.id - b.id
+    )
+  }
+
   /**
    * 获取或设置仪表盘缓存
    * @param {Function} fetchFn 获取数据的函数
@@ -156,6 +191,8 @@ export const useCacheStore = defineStore('cache', () => {
       console.log('[Cache] Invalidating all tasks cache')
       tasksCache.value = {}
     }
+    // 按周缓存保留数据和游标，下次读取时走增量同步
+    Object.values(weekTasksCache.value).forEach(cache => { cache.timestamp = null })
   }
 
   /**
@@ -177,6 +214,7 @@ export const useCacheStore = defineStore('cache', () => {
     rolesCache.value = { data: null, timestamp: null }
     teamMembersCache.value = { data: null, timestamp: null }
     tasksCache.value = {}
+    weekTasksCache.value = {}
     dashboardCache.value = { data: null, timestamp: null }
   }
 
@@ -209,6 +247,7 @@ export const useCacheStore = defineStore('cache', () => {
     getRolesCache,
     getTeamMembersCache,
     getTasksCache,
+    getWeekTasks,
     getDashboardCache,
 
     // Invalidators